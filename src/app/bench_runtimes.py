@@ -0,0 +1,136 @@
+"""
+런타임별 정확도 vs 지연시간 리포트 (eager 대비 MAE drift, batch 1/32 ms/image)
+
+실행 예시 (src/app 에서, model_runtime.py 로 내보낸 뒤)
+    python bench_runtimes.py --rows 128 --image-root ../../data/total_images
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+from PIL import Image
+
+from model_runtime import EXPORT_DIR, RUNTIMES, load_runtime_model
+from price_model import (
+    WEIGHT_PATH, build_tab_batch, city_options, condition_options, model_options, model_type_options,
+)
+
+CSV_PATH = "../../csv/data_regression_clean.csv"
+
+# csv 의 사용감 표기 -> 앱 선택지 표기
+CONDITION_ALIASES = {"새 상품": "새 상품", "사용감 적음": "거의 새 것", "사용감 많음": "사용감 있음"}
+
+def load_rows(csv_path: str, n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """
+    앱 선택지로 인코딩 가능한 행만 골라 n_rows 개 샘플링합니다.
+    """
+    df = pd.read_csv(csv_path, usecols=["id", "condition", "location", "model", "model_type", "price"])
+    # 전처리 파일이 있으면 선택지가 csv 표기 그대로이므로 모를 때만 앱 표기로 바꿈
+    df["condition"] = df["condition"].where(df["condition"].isin(condition_options),
+                                            df["condition"].map(CONDITION_ALIASES))
+    df["model"] = df["model"].str.split(",").str[0].str.strip()
+
+    ok = (
+        df["condition"].isin(condition_options)
+        & df["location"].isin(city_options)
+        & df["model"].isin(model_options)
+        & df["model_type"].isin(model_type_options)
+        & df["price"].notna()
+    )
+    df = df[ok]
+    return df.sample(n=min(n_rows, len(df)), random_state=seed).reset_index(drop=True)
+
+def load_images(df: pd.DataFrame, image_root: str | None, preprocess) -> tuple[torch.Tensor, pd.DataFrame]:
+    """
+    id 폴더의 첫 이미지를 전처리해 (N,3,224,224) 로 쌓습니다.
+    image_root 가 없으면 임의 이미지로 대신합니다 (drift/지연시간만 의미 있음).
+    """
+    if not image_root or not os.path.isdir(image_root):
+        print(f"이미지 폴더가 없어 임의 이미지를 사용합니다: {image_root}")
+        gen = torch.Generator().manual_seed(0)
+        return torch.randn(len(df), 3, 224, 224, generator=gen), df
+
+    tensors, keep = [], []
+    for i, uid in enumerate(df["id"]):
+        folder = os.path.join(image_root, str(uid))
+        files = sorted(os.listdir(folder)) if os.path.isdir(folder) else []
+        if not files:
+            continue
+        with Image.open(os.path.join(folder, files[0])) as img:
+            tensors.append(preprocess(img.convert("RGB")))
+        keep.append(i)
+
+    return torch.stack(tensors), df.iloc[keep].reset_index(drop=True)
+
+def predict_all(model, images: torch.Tensor, tabs: torch.Tensor, batch_size: int = 32) -> np.ndarray:
+    preds = []
+    with torch.inference_mode():
+        for s in range(0, len(images), batch_size):
+            preds.append(model(images[s:s + batch_size], tabs[s:s + batch_size]).reshape(-1))
+    return torch.cat(preds).numpy()
+
+def ms_per_image(model, images: torch.Tensor, tabs: torch.Tensor, batch_size: int, repeat: int) -> float:
+    img, tab = images[:batch_size], tabs[:batch_size]
+    if len(img) < batch_size:
+        reps = -(-batch_size // len(img))
+        img, tab = img.repeat(reps, 1, 1, 1)[:batch_size], tab.repeat(reps, 1)[:batch_size]
+
+    with torch.inference_mode():
+        model(img, tab)  # 워밍업
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            model(img, tab)
+            times.append(time.perf_counter() - start)
+
+    return float(np.median(times)) * 1000.0 / batch_size
+
+def main():
+    parser = argparse.ArgumentParser(description="런타임별 정확도 vs 지연시간 리포트")
+    parser.add_argument("--weights", default=WEIGHT_PATH)
+    parser.add_argument("--export-dir", default=EXPORT_DIR)
+    parser.add_argument("--csv", default=CSV_PATH)
+    parser.add_argument("--image-root", default="../../data/total_images")
+    parser.add_argument("--rows", type=int, default=128)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--runtimes", nargs="+", default=list(RUNTIMES), choices=RUNTIMES)
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    runtimes = ["eager"] + [r for r in args.runtimes if r != "eager"]
+    eager, preprocess, tab_size = load_runtime_model("eager", args.weights, args.export_dir)
+
+    df = load_rows(args.csv, args.rows)
+    images, df = load_images(df, args.image_root, preprocess)
+    tabs = build_tab_batch(df["condition"], df["location"], df["model"], df["model_type"], tab_size)
+    listed = df["price"].to_numpy(dtype=np.float64)
+    print(f"평가 행 수: {len(df)}")
+
+    report = []
+    eager_preds = None
+    for runtime in runtimes:
+        model = eager if runtime == "eager" else load_runtime_model(runtime, args.weights, args.export_dir,
+                                                                    num_threads=args.threads)[0]
+        preds = predict_all(model, images, tabs).astype(np.float64)
+        if eager_preds is None:
+            eager_preds = preds
+
+        report.append({
+            "runtime": runtime,
+            "mae_drift_vs_eager": float(np.mean(np.abs(preds - eager_preds))),
+            "max_drift_vs_eager": float(np.max(np.abs(preds - eager_preds))),
+            "mae_vs_listed": float(np.mean(np.abs(np.clip(preds, 0, None) - listed))),
+            "ms_per_image_b1": ms_per_image(model, images, tabs, 1, args.repeat),
+            "ms_per_image_b32": ms_per_image(model, images, tabs, 32, max(1, args.repeat // 4)),
+        })
+
+    print(pd.DataFrame(report).set_index("runtime").round(3).to_string())
+
+if __name__ == "__main__":
+    main()
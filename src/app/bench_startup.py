@@ -0,0 +1,59 @@
+"""
+콜드 스타트 시간 측정: import / build / load / 첫 추론을 따로 기록
+
+import 시간이 의미 있으려면 새 프로세스에서 실행해야 합니다.
+실행 예시 (src/app 에서)
+    python bench_startup.py --weights ../training/model/convnext_best.pt
+"""
+import time
+
+_t0 = time.perf_counter()
+
+import argparse
+
+import torch
+from torchvision import models
+
+from price_model import WEIGHT_PATH, build_model_from_state, build_tab_tensor, read_checkpoint
+
+_t_import = time.perf_counter() - _t0
+
+def main():
+    parser = argparse.ArgumentParser(description="콜드 스타트 시간 측정")
+    parser.add_argument("--weights", default=WEIGHT_PATH)
+    parser.add_argument("--no-mmap", action="store_true")
+    args = parser.parse_args()
+
+    timings = {"import": _t_import}
+
+    # 1) 체크포인트 읽기 + 뼈대 만들기
+    start = time.perf_counter()
+    state, meta = read_checkpoint(args.weights, mmap=not args.no_mmap)
+    timings["read_checkpoint"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model = build_model_from_state(state, meta).eval()
+    preprocess = models.ConvNeXt_Small_Weights.DEFAULT.transforms()
+    timings["build"] = time.perf_counter() - start
+
+    # 2) 가중치 로드
+    start = time.perf_counter()
+    model.load_state_dict(state, strict=True, assign=True)
+    timings["load_state_dict"] = time.perf_counter() - start
+
+    # 3) 첫 추론 (mmap 페이지 폴트 포함)
+    tab_size = model.tab_head[0].in_features
+    img = preprocess(torch.zeros(3, 300, 300))
+    start = time.perf_counter()
+    with torch.inference_mode():
+        model(img.unsqueeze(0), build_tab_tensor("새 상품", "서울특별시", "yoyo", "디럭스", tab_size))
+    timings["first_inference"] = time.perf_counter() - start
+
+    total = 0.0
+    for name, sec in timings.items():
+        total += sec
+        print(f"{name:<16} {sec * 1000:9.1f} ms")
+    print(f"{'total':<16} {total * 1000:9.1f} ms")
+
+if __name__ == "__main__":
+    main()
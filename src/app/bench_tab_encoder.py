@@ -0,0 +1,81 @@
+"""
+탭 인코딩 마이크로 벤치마크: 기존 build_tab_tensor(행마다 list.index + 파이썬 루프) vs TabularEncoder
+
+실행 예시 (src/app 에서)
+    python bench_tab_encoder.py --rows 10000 --size 21
+"""
+import argparse
+import random
+import time
+
+import torch
+
+from price_model import (
+    OPTION_VOCABULARIES, condition_options, city_options, model_options, model_type_options,
+)
+from tab_encoder import TAB_FIELDS, TabularEncoder
+
+def legacy_build_tab_tensor(condition, city, model_name, model_type, expected_size: int):
+    """
+    TabularEncoder 도입 전 build_tab_tensor (비교용 원본)
+    """
+    c_idx = condition_options.index(condition)
+    s_idx = city_options.index(city)
+    m_idx = model_options.index(model_name)
+    t_idx = model_type_options.index(model_type)
+
+    if expected_size == 21:
+        vec = []
+        for opt in condition_options: vec.append(1.0 if condition==opt else 0.0)
+        for opt in city_options: vec.append(1.0 if city==opt else 0.0)
+        for opt in model_options: vec.append(1.0 if model_name==opt else 0.0)
+        for opt in model_type_options: vec.append(1.0 if model_type==opt else 0.0)
+        return torch.tensor(vec, dtype=torch.float32).unsqueeze(0)
+
+    vec = [float(c_idx), float(s_idx), float(m_idx), float(t_idx)]
+    if expected_size == 5:
+        vec.append(1.0)
+    return torch.tensor(vec, dtype=torch.float32).unsqueeze(0)
+
+def timeit(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="탭 인코딩 벤치마크")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--size", type=int, default=21, choices=[4, 5, 21])
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    rows = [
+        (rng.choice(condition_options), rng.choice(city_options), rng.choice(model_options), rng.choice(model_type_options))
+        for _ in range(args.rows)
+    ]
+    columns = [list(col) for col in zip(*rows)]
+    # 예전 4 필드 레이아웃끼리 비교 (전처리 파일이 있는 5 입력 체크포인트는 TRAIN_IDS 순서라 원본과 다름)
+    encoder = TabularEncoder.for_expected_size(OPTION_VOCABULARIES, args.size, fields=TAB_FIELDS)
+    buffer = torch.empty(args.rows, encoder.width)
+
+    # 결과 동일성 확인
+    expected = torch.cat([legacy_build_tab_tensor(*r, args.size) for r in rows])
+    assert torch.equal(expected, encoder.encode_columns(columns)), "인코딩 결과가 다릅니다"
+
+    results = {
+        "legacy (행 단위)": timeit(lambda: torch.cat([legacy_build_tab_tensor(*r, args.size) for r in rows])),
+        "encoder.encode_one (행 단위)": timeit(lambda: torch.cat([encoder.encode_one(*r) for r in rows])),
+        "encoder.encode_columns (배치)": timeit(lambda: encoder.encode_columns(columns)),
+        "encoder.encode_columns (버퍼 재사용)": timeit(lambda: encoder.encode_columns(columns, out=buffer)),
+    }
+
+    base = results["legacy (행 단위)"]
+    print(f"rows={args.rows}, width={encoder.width}")
+    for name, sec in results.items():
+        print(f"{name:<36} {sec * 1000:9.2f} ms  ({sec / args.rows * 1e6:7.2f} us/row, x{base / sec:6.1f})")
+
+if __name__ == "__main__":
+    main()
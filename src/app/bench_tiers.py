@@ -0,0 +1,133 @@
+"""
+서빙 계층별 처리량 / 정확도 비교: ConvNeXt(사진 + 탭) vs 탭 전용 LightGBM 가격표
+
+- 학습 스크립트들과 같은 분할(test_size=0.2, random_state=42)의 검증 행으로 MAE 계산
+- ConvNeXt 는 앱 선택지로 인코딩 가능하고 사진이 있는 행만 평가하고, 탭 모델도 같은 행으로 한 번 더 계산
+- 처리량: 요청 1건 지연(µs) / 배치 처리량(rows/s)
+  ConvNeXt 요청 1건은 이미지 디코딩 + 전처리 + forward(batch 1), 탭 모델은 predict_row
+- 가중치나 이미지 폴더가 없으면 ConvNeXt 는 건너뜀
+
+실행 예시 (src/app 에서, train_tabular.py / train_convnext.py 로 모델을 만든 뒤)
+    python bench_tiers.py
+    python bench_tiers.py --image-root ../../data/total_images --threads 4
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+from sklearn.model_selection import train_test_split
+
+from bench_runtimes import CONDITION_ALIASES, CSV_PATH, load_images, ms_per_image, predict_all
+from model_runtime import EXPORT_DIR, RUNTIMES, load_runtime_model
+from price_model import (
+    WEIGHT_PATH, build_tab_batch, condition_options, city_options, load_listing_image, model_options,
+    model_type_options,
+)
+from tabular_model import TABULAR_MODEL_PATH, TabularPriceModel
+
+def load_val_rows(csv_path: str) -> pd.DataFrame:
+    df = pd.read_csv(csv_path, usecols=["id", "condition", "is_completed", "location", "model", "model_type", "price"])
+    _, val_df = train_test_split(df.dropna(subset=["price"]).reset_index(drop=True), test_size=0.2, random_state=42)
+    return val_df.reset_index(drop=True)
+
+def app_encodable(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    앱 선택지로 인코딩 가능한 행 (전처리 파일이 없으면 csv 사용감 표기를 앱 표기로 바꿔서)
+    """
+    df = df.copy()
+    df["condition"] = df["condition"].where(df["condition"].isin(condition_options),
+                                            df["condition"].map(CONDITION_ALIASES))
+    ok = (
+        df["condition"].isin(condition_options)
+        & df["location"].isin(city_options)
+        & df["model"].isin(model_options)
+        & df["model_type"].isin(model_type_options)
+    )
+    return df[ok].reset_index(drop=True)
+
+def mae(pred, price) -> float:
+    return float(np.mean(np.abs(np.clip(pred, 0, None) - np.asarray(price, dtype=np.float64))))
+
+def time_per_call(fn, items, min_calls: int = 20000) -> float:
+    # 호출 1회 평균 시간 (초)
+    reps = max(1, -(-min_calls // len(items)))
+    start = time.perf_counter()
+    for _ in range(reps):
+        for item in items:
+            fn(item)
+    return (time.perf_counter() - start) / (reps * len(items))
+
+def bench_tabular(model: TabularPriceModel, df: pd.DataFrame, bulk_rows: int) -> dict:
+    rows = df.to_dict("records")
+    big = pd.concat([df] * max(1, -(-bulk_rows // len(df))), ignore_index=True)
+    start = time.perf_counter()
+    model.predict_frame(big)
+    bulk_seconds = time.perf_counter() - start
+
+    # 가격표 없이 booster 를 직접 부르면 (비교용)
+    codes = np.zeros((1, len(model.features)))
+    booster_seconds = time_per_call(lambda _: model.booster.predict(codes), [None], min_calls=2000)
+
+    single = time_per_call(model.predict_row, rows)
+    return {
+        "rows": len(df), "mae": mae(model.predict_frame(df), df["price"]),
+        "us_per_request": single * 1e6, "requests_per_sec": 1.0 / single,
+        "bulk_rows_per_sec": len(big) / bulk_seconds, "booster_us_per_row": booster_seconds * 1e6,
+    }
+
+def bench_convnext(args, df: pd.DataFrame) -> tuple[dict, pd.DataFrame] | None:
+    if not os.path.exists(args.weights) or not os.path.isdir(args.image_root):
+        print(f"ConvNeXt 건너뜀: 가중치({args.weights}) 또는 이미지 폴더({args.image_root})가 없습니다.")
+        return None
+
+    model, preprocess, tab_size = load_runtime_model(args.runtime, args.weights, args.export_dir,
+                                                     num_threads=args.threads)
+    images, df = load_images(df, args.image_root, preprocess)
+    tabs = build_tab_batch(df["condition"], df["location"], df["model"], df["model_type"], tab_size)
+
+    # 요청 1건: 사진 디코딩 + 전처리 + batch 1 forward
+    paths = [os.path.join(args.image_root, str(uid), sorted(os.listdir(os.path.join(args.image_root, str(uid))))[0])
+             for uid in df["id"][:16]]
+    decode = time_per_call(lambda p: preprocess(load_listing_image(p)), paths, min_calls=len(paths))
+    single = decode + ms_per_image(model, images, tabs, 1, args.repeat) / 1000.0
+    batch = ms_per_image(model, images, tabs, 32, max(1, args.repeat // 4)) / 1000.0
+
+    return {
+        "rows": len(df), "mae": mae(predict_all(model, images, tabs), df["price"]),
+        "us_per_request": single * 1e6, "requests_per_sec": 1.0 / single,
+        "bulk_rows_per_sec": 1.0 / (decode + batch), "booster_us_per_row": np.nan,
+    }, df
+
+def main():
+    parser = argparse.ArgumentParser(description="ConvNeXt vs 탭 모델 처리량 / MAE")
+    parser.add_argument("--csv", default=CSV_PATH)
+    parser.add_argument("--tabular-model", default=TABULAR_MODEL_PATH)
+    parser.add_argument("--weights", default=WEIGHT_PATH)
+    parser.add_argument("--runtime", default="eager", choices=RUNTIMES)
+    parser.add_argument("--export-dir", default=EXPORT_DIR)
+    parser.add_argument("--image-root", default="../../data/total_images")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--bulk-rows", type=int, default=1_000_000, help="탭 모델 대량 처리량 측정 행 수")
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    val_df = load_val_rows(args.csv)
+    tabular = TabularPriceModel.load(args.tabular_model)
+    report = {"tabular (검증 전체)": bench_tabular(tabular, val_df, args.bulk_rows)}
+
+    result = bench_convnext(args, app_encodable(val_df))
+    if result is not None:
+        report["convnext"], subset = result
+        report["tabular (같은 행)"] = bench_tabular(tabular, val_df[val_df["id"].isin(subset["id"])], args.bulk_rows)
+
+    print(f"검증 행 {len(val_df)} | 학습 때 기록한 탭 모델 val MAE {tabular.metrics.get('val_mae', float('nan')):,.0f} 원")
+    print(pd.DataFrame(report).T.round(1).to_string())
+
+if __name__ == "__main__":
+    main()
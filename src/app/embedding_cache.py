@@ -0,0 +1,106 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import torch
+
+def image_key(img_tensor: torch.Tensor) -> str:
+    """
+    디코딩 + 전처리된 이미지 텐서의 바이트로 캐시 키(blake2b)를 만듭니다.
+    전처리가 결정적이므로 같은 사진이면 같은 키가 나옵니다.
+    """
+    data = img_tensor.detach().contiguous().cpu().numpy().tobytes()
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+class EmbeddingCache:
+    """
+    백본(conv_part) 출력 특징 벡터 캐시
+    - 메모리: LRU, max_bytes 초과 시 오래된 항목부터 제거
+    - spill_dir 지정 시 제거된 항목을 디스크(.pt)에 내려두고 다음 조회 때 다시 올림
+    """
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, spill_dir: str | None = None):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _spill_path(self, key: str) -> str:
+        return os.path.join(self.spill_dir, f"{key}.pt")
+
+    def get(self, key: str) -> torch.Tensor | None:
+        with self._lock:
+            feat = self._entries.get(key)
+            if feat is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return feat
+
+        if self.spill_dir and os.path.exists(self._spill_path(key)):
+            try:
+                feat = torch.load(self._spill_path(key), map_location="cpu")
+            except Exception:
+                feat = None
+            if feat is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                self.put(key, feat)
+                return feat
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, feat: torch.Tensor):
+        # 배치 텐서의 view 를 그대로 잡고 있지 않도록 복사
+        feat = feat.detach().cpu().clone()
+        size = feat.element_size() * feat.numel()
+        if size > self.max_bytes:
+            return
+
+        evicted = []
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.element_size() * old.numel()
+
+            self._entries[key] = feat
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                old_key, old_feat = self._entries.popitem(last=False)
+                self._bytes -= old_feat.element_size() * old_feat.numel()
+                self.evictions += 1
+                evicted.append((old_key, old_feat))
+
+        # 디스크 쓰기는 락 밖에서
+        if self.spill_dir:
+            for old_key, old_feat in evicted:
+                path = self._spill_path(old_key)
+                if not os.path.exists(path):
+                    torch.save(old_feat, path)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
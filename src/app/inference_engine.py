@@ -0,0 +1,186 @@
+import contextlib
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import torch
+
+from embedding_cache import image_key
+from price_model import MAX_LISTING_IMAGES, pool_model_features
+
+class InferenceEngine:
+    """
+    동시에 들어온 예측 요청을 모아 한 번의 백본 + head 호출로 처리하는 엔진
+    - 사진 기준 최대 max_batch_size 장 또는 max_wait_ms 가 지나면 배치를 확정
+    - 각 호출자는 Future 로 자기 결과(float)를 돌려받음
+    - embedding_cache 지정 시 같은 사진은 백본을 건너뛰고 head 만 실행
+    - submit_listing: 매물 1건의 사진 여러 장을 같은 백본 배치에 넣고 특징을 합쳐 가격 1개를 계산
+    - metrics(instrumentation.Metrics) 지정 시 배치마다 backbone / head 단계 시간을 기록,
+      profiler(ProfileCapture) 가 arm 되어 있으면 그 배치를 torch.profiler 로 기록
+    torch intra-op 스레드 수는 프로세스 전체 설정이라 엔진마다 두지 않음 (호출 측에서 한 번 torch.set_num_threads)
+    """
+    def __init__(self, model, max_batch_size: int = 16, max_wait_ms: float = 5.0,
+                 embedding_cache=None, metrics=None, profiler=None):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.embedding_cache = embedding_cache
+        self.metrics = metrics
+        self.profiler = profiler
+
+        self._queue = queue.Queue()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="inference-engine", daemon=True)
+        self._worker.start()
+
+    def _put(self, img_tensor, tab_tensor, listing: bool) -> Future:
+        if self._closed:
+            raise RuntimeError("이미 종료된 추론 엔진입니다.")
+
+        # 해시는 호출자 스레드에서 계산해 워커 부담을 줄임 (사진 1장당 키 1개)
+        keys = None
+        if self.embedding_cache is not None:
+            keys = [image_key(img_tensor[i:i + 1]) for i in range(img_tensor.shape[0])]
+
+        fut = Future()
+        self._queue.put((img_tensor, tab_tensor, fut, keys, listing))
+        return fut
+
+    def submit(self, img_tensor: torch.Tensor, tab_tensor: torch.Tensor) -> Future:
+        """
+        (1,3,H,W) 이미지 텐서와 (1,T) 탭 텐서를 큐에 넣고 Future 를 반환합니다.
+        """
+        return self._put(img_tensor, tab_tensor, listing=False)
+
+    def submit_listing(self, img_stack: torch.Tensor, tab_tensor: torch.Tensor) -> Future:
+        """
+        매물 1건의 사진 (N,3,H,W) 와 탭 (1,T) 를 큐에 넣고 Future(가격 1개) 를 반환합니다.
+        사진은 앞에서부터 MAX_LISTING_IMAGES 장까지만 사용합니다.
+        """
+        return self._put(img_stack[:MAX_LISTING_IMAGES], tab_tensor, listing=True)
+
+    def predict(self, img_tensor: torch.Tensor, tab_tensor: torch.Tensor, timeout: float | None = None) -> float:
+        return self.submit(img_tensor, tab_tensor).result(timeout=timeout)
+
+    def predict_listing(self, img_stack: torch.Tensor, tab_tensor: torch.Tensor, timeout: float | None = None) -> float:
+        return self.submit_listing(img_stack, tab_tensor).result(timeout=timeout)
+
+    def predict_many(self, items, timeout: float | None = None) -> list[float]:
+        """
+        [(img_tensor, tab_tensor), ...] 를 한꺼번에 넣고 순서대로 결과를 반환합니다.
+        """
+        futures = [self.submit(img, tab) for img, tab in items]
+        return [f.result(timeout=timeout) for f in futures]
+
+    def pending(self) -> int:
+        """
+        아직 배치에 들어가지 않은 요청 수 (대략값, 과부하 판단용)
+        """
+        return self._queue.qsize()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join()
+
+    # 내부: 배치 수집 (백본 비용 기준이므로 사진 장수로 셈)
+    def _collect_batch(self, first):
+        batch = [first]
+        images = first[0].shape[0]
+        deadline = time.monotonic() + self.max_wait
+
+        while images < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # 종료 신호는 이번 배치를 처리한 뒤 반영
+                self._queue.put(None)
+                break
+            batch.append(item)
+            images += item[0].shape[0]
+
+        return batch
+
+    # 내부: 배치 안 모든 사진의 백본 특징 (캐시 미스만 한 번에 백본 통과)
+    def _image_features(self, batch):
+        if self.embedding_cache is None:
+            return self.model.extract_features(torch.cat([img for img, _, _, _, _ in batch], dim=0))
+
+        cache = self.embedding_cache
+        images = [img[i:i + 1] for img, _, _, _, _ in batch for i in range(img.shape[0])]
+        keys = [key for _, _, _, item_keys, _ in batch for key in item_keys]
+        feats = [cache.get(key) for key in keys]
+        miss = [i for i, f in enumerate(feats) if f is None]
+
+        # 같은 배치 안의 중복 사진은 한 번만 계산
+        first_of = {}
+        for i in miss:
+            first_of.setdefault(keys[i], i)
+        unique = list(first_of.values())
+
+        if unique:
+            out = self.model.extract_features(torch.cat([images[i] for i in unique], dim=0))
+            for row, i in enumerate(unique):
+                feats[i] = out[row:row + 1]
+                cache.put(keys[i], feats[i])
+            for i in miss:
+                feats[i] = feats[first_of[keys[i]]]
+
+        return torch.cat(feats, dim=0)
+
+    # 내부: 사진 특징을 요청 단위로 나누고 매물 요청은 1행으로 합치기
+    def _request_features(self, batch, feats):
+        blocks = torch.split(feats, [img.shape[0] for img, _, _, _, _ in batch])
+        out = []
+        for (_, _, _, _, listing), block in zip(batch, blocks):
+            out.append(pool_model_features(self.model, block, [block.shape[0]]) if listing else block)
+        return torch.cat(out, dim=0)
+
+    def _stage(self, name: str):
+        return self.metrics.stage(name) if self.metrics is not None else contextlib.nullcontext()
+
+    # 내부: 배치 실행
+    def _run_batch(self, batch):
+        batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        futures = [fut for _, _, fut, _, _ in batch]
+
+        try:
+            tab_batch = torch.cat([tab for _, tab, _, _, _ in batch], dim=0)
+
+            capture = self.profiler.capture(len(batch)) if self.profiler is not None else contextlib.nullcontext()
+            with capture, torch.inference_mode():
+                with self._stage("backbone"):
+                    feats = self._request_features(batch, self._image_features(batch))
+                with self._stage("head"):
+                    preds = self.model.head(feats, tab_batch).reshape(-1).tolist()
+            if self.metrics is not None:
+                self.metrics.inc("price_engine_batches_total")
+                self.metrics.inc("price_engine_images_total", sum(img.shape[0] for img, _, _, _, _ in batch))
+        except Exception as e:
+            for fut in futures:
+                fut.set_exception(e)
+            return
+
+        # 요청 하나가 여러 행을 가질 수 있으므로 탭 행 수만큼 잘라서 돌려줌
+        offset = 0
+        for _, tab, fut, _, _ in batch:
+            n = tab.shape[0]
+            fut.set_result(preds[offset] if n == 1 else preds[offset:offset + n])
+            offset += n
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+            self._run_batch(self._collect_batch(first))
@@ -0,0 +1,149 @@
+"""
+예측 경로 계측: 단계별 지연시간 히스토그램 / 카운터 / 게이지 (Prometheus 텍스트 형식) + torch.profiler 스위치
+
+- Metrics.stage("backbone") 같은 with 블록으로 단계 시간을 잼 (스레드 안전)
+- Metrics.text()    : /metrics 응답용 텍스트 (price_stage_seconds 히스토그램 등)
+- Metrics.summary() : 단계별 건수 / 평균 / p50 / p95 (ms, 버킷 기준 근사) - 디버그 화면용
+- ProfileCapture.arm(n) 후 다음 n 건 요청을 torch.profiler 로 기록해 out_dir 에 chrome trace(json) 저장
+  (chrome://tracing 또는 https://ui.perfetto.dev 에서 열기)
+
+단계 이름 (앱 / 서비스 공통)
+    save, decode, preprocess : 업로드 저장 / 이미지 디코딩 / 텐서 변환 (요청 스레드)
+    backbone, head           : InferenceEngine 배치 1회 (워커 스레드)
+    tabular, grid, total     : 탭 모델 / 가격표 / 요청 전체
+"""
+import bisect
+import contextlib
+import os
+import threading
+import time
+
+# 초 단위 버킷 상한 (+Inf 는 자동)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in sorted(labels.items())) + "}"
+
+class LatencyHistogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """
+        q 분위가 들어 있는 버킷의 상한 (마지막 버킷이면 평균으로 대신)
+        """
+        if not self.count:
+            return 0.0
+        target, seen = q * self.count, 0
+        for upper, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= target:
+                return upper
+        return self.sum / self.count
+
+class Metrics:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.stages = {}    # 단계 이름 -> LatencyHistogram
+        self.counters = {}  # (이름, 라벨 튜플) -> 값
+        self.gauges = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            hist = self.stages.get(stage)
+            if hist is None:
+                hist = self.stages[stage] = LatencyHistogram(self.buckets)
+            hist.observe(seconds)
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def summary(self) -> list[dict]:
+        with self._lock:
+            return [
+                {"stage": name, "count": h.count, "mean_ms": h.sum / h.count * 1000 if h.count else 0.0,
+                 "p50_ms": h.quantile(0.5) * 1000, "p95_ms": h.quantile(0.95) * 1000}
+                for name, h in self.stages.items()
+            ]
+
+    def text(self) -> str:
+        lines = []
+        with self._lock:
+            if self.stages:
+                lines.append("# TYPE price_stage_seconds histogram")
+            for name, h in self.stages.items():
+                cumulative = 0
+                for upper, n in zip(h.buckets, h.counts):
+                    cumulative += n
+                    lines.append(f'price_stage_seconds_bucket{{stage="{name}",le="{upper}"}} {cumulative}')
+                lines.append(f'price_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {h.count}')
+                lines.append(f'price_stage_seconds_sum{{stage="{name}"}} {h.sum}')
+                lines.append(f'price_stage_seconds_count{{stage="{name}"}} {h.count}')
+
+            typed = set()
+            for kind, values in (("counter", self.counters), ("gauge", self.gauges)):
+                for (name, labels), value in sorted(values.items()):
+                    if name not in typed:
+                        lines.append(f"# TYPE {name} {kind}")
+                        typed.add(name)
+                    lines.append(f"{name}{_labels(dict(labels))} {value}")
+        return "\n".join(lines) + "\n"
+
+class ProfileCapture:
+    """
+    arm(n) 이후 capture() 블록 n 건을 torch.profiler 로 기록합니다 (기본은 아무것도 안 함).
+    """
+    def __init__(self, out_dir: str = "profiles"):
+        self.out_dir = out_dir
+        self.remaining = 0
+        self.traces = []
+        self._lock = threading.Lock()
+
+    def arm(self, n_requests: int):
+        with self._lock:
+            self.remaining = max(0, int(n_requests))
+
+    @contextlib.contextmanager
+    def capture(self, n_requests: int = 1):
+        with self._lock:
+            active = self.remaining > 0
+            if active:
+                self.remaining = max(0, self.remaining - n_requests)
+        if not active:
+            yield None
+            return
+
+        from torch.profiler import ProfilerActivity, profile
+
+        with profile(activities=[ProfilerActivity.CPU], record_shapes=True) as prof:
+            yield prof
+        os.makedirs(self.out_dir, exist_ok=True)
+        path = os.path.join(self.out_dir, f"trace_{time.strftime('%Y%m%d_%H%M%S')}_{time.time_ns() % 10**6:06d}.json")
+        prof.export_chrome_trace(path)
+        with self._lock:
+            self.traces.append(path)
@@ -0,0 +1,80 @@
+"""
+가격 예측 서비스 부하 테스트 (p50/p99 지연시간, 초당 요청 수)
+
+실행 예시 (src/app 에서, 서비스가 떠 있는 상태)
+    python load_test.py --image sample.jpg --requests 200 --concurrency 16
+    python load_test.py --image sample.jpg --bulk 32 --requests 20
+"""
+import argparse
+import base64
+import json
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+def build_item(image_path: str) -> dict:
+    with open(image_path, "rb") as f:
+        image_b64 = base64.b64encode(f.read()).decode("ascii")
+
+    return {
+        "image": image_b64,
+        "condition": "사용감 있음",
+        "city": "서울특별시",
+        "model": "crusi",
+        "model_type": "디럭스",
+    }
+
+def post_json(url: str, payload: dict, timeout: float = 60.0) -> float:
+    """
+    요청 한 건을 보내고 지연시간(초)을 반환합니다.
+    """
+    body = json.dumps(payload).encode("utf-8")
+    req = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+
+    start = time.perf_counter()
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        resp.read()
+    return time.perf_counter() - start
+
+def run_load(url: str, payload: dict, n_requests: int, concurrency: int):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(lambda _: post_json(url, payload), range(n_requests)))
+    elapsed = time.perf_counter() - start
+
+    return np.array(latencies) * 1000.0, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="가격 예측 서비스 부하 테스트")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--image", required=True)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--bulk", type=int, default=0, help="0 이면 /predict, N 이면 N 건씩 /predict/bulk")
+    args = parser.parse_args()
+
+    item = build_item(args.image)
+    if args.bulk > 0:
+        url = args.url.rstrip("/") + "/predict/bulk"
+        payload = {"items": [item] * args.bulk}
+        items_per_request = args.bulk
+    else:
+        url = args.url.rstrip("/") + "/predict"
+        payload = item
+        items_per_request = 1
+
+    # 워밍업
+    post_json(url, payload)
+
+    lat_ms, elapsed = run_load(url, payload, args.requests, args.concurrency)
+
+    print(f"요청 수        : {args.requests} (동시성 {args.concurrency}, 요청당 {items_per_request}건)")
+    print(f"p50 지연시간   : {np.percentile(lat_ms, 50):.1f} ms")
+    print(f"p99 지연시간   : {np.percentile(lat_ms, 99):.1f} ms")
+    print(f"초당 요청 수   : {args.requests / elapsed:.1f} req/s")
+    print(f"초당 예측 수   : {args.requests * items_per_request / elapsed:.1f} items/s")
+
+if __name__ == "__main__":
+    main()
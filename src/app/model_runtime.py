@@ -0,0 +1,231 @@
+"""
+CPU 추론용 모델 런타임 (eager / scripted / onnx / quantized)
+
+내보내기 실행 예시 (src/app 에서)
+    python model_runtime.py --weights ../training/model/convnext_best.pt --out-dir ../training/model/export
+
+내보낸 파일
+    scripted.ts       : torch.jit.trace_module (forward, extract_features, head, attention 모델이면 pool_scores)
+    quantized.ts      : nn.Linear 동적 INT8 양자화 후 trace_module
+    features.onnx     : 백본 (images -> features)
+    head.onnx         : head (features, tabular -> price)
+    pool.onnx         : 사진별 attention 점수 (features -> scores, image_pool="attention" 모델만)
+    export_meta.json  : tab_size, image_pool 등 로드에 필요한 정보
+학습 스케일과 log1p 타깃의 expm1 은 head 안에 있으므로 내보낸 그래프에도 그대로 포함됩니다.
+매물 여러 장 합치기도 eager 와 같은 방식(attention / 평균)이어야 하므로, attention 모델인데
+점수 계산이 빠진 내보내기는 load_runtime_model 이 RuntimeError 로 거부합니다.
+"""
+import argparse
+import copy
+import json
+import os
+
+import torch
+import torch.nn as nn
+from torchvision import models
+
+from price_model import WEIGHT_PATH, load_model_and_preprocess
+
+RUNTIMES = ("eager", "scripted", "onnx", "quantized")
+EXPORT_DIR = "../training/model/export"
+
+def export_paths(export_dir: str = EXPORT_DIR) -> dict:
+    return {
+        "scripted": os.path.join(export_dir, "scripted.ts"),
+        "quantized": os.path.join(export_dir, "quantized.ts"),
+        "onnx_features": os.path.join(export_dir, "features.onnx"),
+        "onnx_head": os.path.join(export_dir, "head.onnx"),
+        "onnx_pool": os.path.join(export_dir, "pool.onnx"),
+        "meta": os.path.join(export_dir, "export_meta.json"),
+    }
+
+class _FeaturePart(nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, images):
+        return self.model.extract_features(images)
+
+class _HeadPart(nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, features, tabular_data):
+        return self.model.head(features, tabular_data)
+
+class _PoolPart(nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, features):
+        return self.model.pool_scores(features)
+
+def image_pool_of(model) -> str:
+    return "attention" if getattr(model, "img_pool", None) is not None else "mean"
+
+def _trace(model, img, tab):
+    with torch.no_grad():
+        feat = model.extract_features(img)
+        methods = {
+            "forward": (img, tab),
+            "extract_features": (img,),
+            "head": (feat, tab),
+        }
+        if image_pool_of(model) == "attention":
+            methods["pool_scores"] = (feat,)
+        return torch.jit.trace_module(model, methods)
+
+def quantize_dynamic_int8(model):
+    """
+    nn.Linear(ConvNeXt 블록의 pointwise conv 포함)를 동적 INT8 로 양자화한 복사본
+    """
+    return torch.ao.quantization.quantize_dynamic(copy.deepcopy(model), {nn.Linear}, dtype=torch.qint8)
+
+def export_model(model, tab_size: int, export_dir: str = EXPORT_DIR, with_onnx: bool = True, source: str = "") -> dict:
+    os.makedirs(export_dir, exist_ok=True)
+    paths = export_paths(export_dir)
+    model = model.eval()
+
+    img = torch.randn(2, 3, 224, 224)
+    tab = torch.zeros(2, tab_size)
+
+    # 1) TorchScript (FP32)
+    _trace(model, img, tab).save(paths["scripted"])
+
+    # 2) 동적 INT8 양자화 + TorchScript
+    _trace(quantize_dynamic_int8(model), img, tab).save(paths["quantized"])
+
+    # 3) ONNX (백본/head 분리 - 임베딩 캐시, 가격표 API 와 호환)
+    if with_onnx:
+        with torch.no_grad():
+            feat = model.extract_features(img)
+            torch.onnx.export(
+                _FeaturePart(model), (img,), paths["onnx_features"], dynamo=False,
+                input_names=["images"], output_names=["features"],
+                dynamic_axes={"images": {0: "batch"}, "features": {0: "batch"}},
+            )
+            torch.onnx.export(
+                _HeadPart(model), (feat, tab), paths["onnx_head"], dynamo=False,
+                input_names=["features", "tabular"], output_names=["price"],
+                dynamic_axes={"features": {0: "batch"}, "tabular": {0: "batch"}, "price": {0: "batch"}},
+            )
+            if image_pool_of(model) == "attention":
+                torch.onnx.export(
+                    _PoolPart(model), (feat,), paths["onnx_pool"], dynamo=False,
+                    input_names=["features"], output_names=["scores"],
+                    dynamic_axes={"features": {0: "batch"}, "scores": {0: "batch"}},
+                )
+
+    with open(paths["meta"], "w", encoding="utf-8") as f:
+        json.dump({"tab_size": tab_size, "source": source, "onnx": with_onnx,
+                   "target": getattr(model, "target", "price"), "image_pool": image_pool_of(model)},
+                  f, ensure_ascii=False, indent=2)
+
+    return paths
+
+class OnnxCombinedModel:
+    """
+    ONNX Runtime 세션 2개(백본, head)를 CombinedModel 과 같은 인터페이스로 감싼 모델
+    pool_path(attention 점수)를 주면 pool_scores 도 제공 (없으면 None -> 평균으로 합침)
+    """
+    def __init__(self, features_path: str, head_path: str, num_threads: int | None = None,
+                 pool_path: str | None = None):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise RuntimeError("onnx 런타임을 쓰려면 onnxruntime 패키지가 필요합니다.") from e
+
+        opts = ort.SessionOptions()
+        if num_threads:
+            opts.intra_op_num_threads = num_threads
+        providers = ["CPUExecutionProvider"]
+        self._features = ort.InferenceSession(features_path, opts, providers=providers)
+        self._head = ort.InferenceSession(head_path, opts, providers=providers)
+        self._pool = ort.InferenceSession(pool_path, opts, providers=providers) if pool_path else None
+        self.pool_scores = self._pool_scores if self._pool is not None else None
+
+    def eval(self):
+        return self
+
+    def extract_features(self, images):
+        out = self._features.run(None, {"images": images.detach().cpu().numpy()})[0]
+        return torch.from_numpy(out)
+
+    def head(self, features, tabular_data):
+        out = self._head.run(None, {
+            "features": features.detach().cpu().numpy(),
+            "tabular": tabular_data.detach().cpu().numpy(),
+        })[0]
+        return torch.from_numpy(out)
+
+    def _pool_scores(self, features):
+        out = self._pool.run(None, {"features": features.detach().cpu().numpy()})[0]
+        return torch.from_numpy(out)
+
+    def forward(self, images, tabular_data):
+        return self.head(self.extract_features(images), tabular_data)
+
+    __call__ = forward
+
+def load_runtime_model(runtime: str = "eager", weight_path: str = WEIGHT_PATH, export_dir: str = EXPORT_DIR,
+                       num_threads: int | None = None):
+    """
+    runtime 에 맞는 (model, preprocess, tab_size) 를 반환합니다.
+    eager 외에는 export_model 로 미리 만든 파일을 읽습니다.
+    """
+    if runtime not in RUNTIMES:
+        raise ValueError(f"runtime must be one of {RUNTIMES}")
+
+    if runtime == "eager":
+        return load_model_and_preprocess(weight_path)
+
+    paths = export_paths(export_dir)
+    try:
+        with open(paths["meta"], encoding="utf-8") as f:
+            meta = json.load(f)
+    except OSError as e:
+        raise RuntimeError(f"내보낸 모델 정보를 읽을 수 없습니다 (model_runtime.py 로 먼저 내보내세요): {e}") from e
+
+    # 예전 내보내기는 합치기 방식을 기록하지 않아 attention 모델이 평균으로 바뀔 수 있음
+    image_pool = meta.get("image_pool")
+    if image_pool is None:
+        raise RuntimeError("내보낸 모델에 사진 합치기 방식(image_pool) 정보가 없습니다. model_runtime.py 로 다시 내보내세요.")
+
+    preprocess = models.ConvNeXt_Small_Weights.DEFAULT.transforms()
+
+    try:
+        if runtime == "onnx":
+            pool_path = paths["onnx_pool"] if image_pool == "attention" else None
+            if pool_path and not os.path.exists(pool_path):
+                raise RuntimeError(f"attention 합치기 모델인데 {pool_path} 가 없습니다. 다시 내보내세요.")
+            model = OnnxCombinedModel(paths["onnx_features"], paths["onnx_head"], num_threads=num_threads,
+                                      pool_path=pool_path)
+        else:
+            model = torch.jit.load(paths[runtime], map_location="cpu").eval()
+            if image_pool == "attention" and getattr(model, "pool_scores", None) is None:
+                raise RuntimeError(f"attention 합치기 모델인데 {paths[runtime]} 에 pool_scores 가 없습니다. 다시 내보내세요.")
+    except RuntimeError:
+        raise
+    except Exception as e:
+        raise RuntimeError(f"{runtime} 모델을 불러올 수 없습니다: {e}") from e
+
+    return model, preprocess, meta["tab_size"]
+
+def main():
+    parser = argparse.ArgumentParser(description="CombinedModel 을 TorchScript / INT8 / ONNX 로 내보내기")
+    parser.add_argument("--weights", default=WEIGHT_PATH)
+    parser.add_argument("--out-dir", default=EXPORT_DIR)
+    parser.add_argument("--no-onnx", action="store_true")
+    args = parser.parse_args()
+
+    model, _, tab_size = load_model_and_preprocess(args.weights)
+    paths = export_model(model, tab_size, args.out_dir, with_onnx=not args.no_onnx, source=args.weights)
+    for name, path in paths.items():
+        if os.path.exists(path):
+            print(f"{name:<14} {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+import contextlib
+import functools
+import itertools
+import json
+import os
+
+import numpy as np
+import torch
+import torch.nn as nn
+from PIL import Image
+from torchvision import models
+
+from embedding_cache import image_key
+from tab_encoder import TAB_FIELDS, TRAIN_IDS, TabularEncoder
+from tabular_model import CONDITION_ALIASES
+
+# 화면 선택지 후보 (이 순서로 표시). 인코딩 어휘는 전처리 파일의 라벨 classes 를 따름
+condition_options = ['새 상품', '거의 새 것', '사용감 있음']
+city_options = [
+    '서울특별시','부산광역시','경기도','인천광역시','대구광역시',
+    '대전광역시','광주광역시','세종특별자치시','울산광역시','제주특별자치도'
+]
+model_options = ['yoyo','explori','trailz','beat','crusi','scoot']
+model_type_options = ['절충형','디럭스']
+
+WEIGHT_PATH = "../training/model/convnext_best.pt"
+# 학습 때 가중치 옆에 저장한 전처리 규칙 (PreprocessPipeline.save)
+PREPROCESS_PATH = "../training/model/preprocess.json"
+
+def load_preprocess_artifact(path: str = PREPROCESS_PATH) -> dict | None:
+    """
+    PreprocessPipeline.save 로 저장한 내용 (파일이 없으면 None)
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        raise RuntimeError(f"전처리 파일 로드 실패: {e}") from e
+
+def load_option_vocabularies(artifact: dict | None) -> dict:
+    """
+    전처리 파일의 라벨 classes(학습 때 인코딩 순서)를 옵션 어휘로 사용합니다.
+    파일이 없거나 필드가 빠져 있으면 위의 기본 목록을 씁니다.
+    """
+    vocabularies = {
+        "condition": condition_options,
+        "location": city_options,
+        "model": model_options,
+        "model_type": model_type_options,
+    }
+    classes = (artifact or {}).get("label_classes", {})
+    for field in TAB_FIELDS:
+        if classes.get(field):
+            vocabularies[field] = list(classes[field])
+    return vocabularies
+
+def load_ui_options(vocabularies: dict, field: str, candidates: list) -> list:
+    """
+    화면 선택지 = 후보 목록 중 학습 어휘에 있는 값 (후보 순서 유지)
+    - 라벨 classes 의 'nan', 행정동 이름, 'explori, crusi' 같은 복수 모델 값은 보이지 않음
+    - 사용감은 표기가 달라도(거의 새 것 <-> 사용감 적음) 어휘 쪽 표기로 바꿔서 남김
+    - 겹치는 값이 없으면 어휘에서 'nan' 만 뺀 목록
+    """
+    vocabulary = vocabularies[field]
+    known = set(vocabulary)
+    options = []
+    for option in candidates:
+        if field == "condition" and option not in known:
+            option = CONDITION_ALIASES.get(option, option)
+        if option in known and option not in options:
+            options.append(option)
+    return options or [value for value in vocabulary if value != "nan"]
+
+PREPROCESS_ARTIFACT = load_preprocess_artifact()
+# 인코딩용 전체 어휘 (학습 때 라벨 순서 그대로)
+OPTION_VOCABULARIES = load_option_vocabularies(PREPROCESS_ARTIFACT)
+condition_options = load_ui_options(OPTION_VOCABULARIES, "condition", condition_options)
+city_options = load_ui_options(OPTION_VOCABULARIES, "location", city_options)
+model_options = load_ui_options(OPTION_VOCABULARIES, "model", model_options)
+model_type_options = load_ui_options(OPTION_VOCABULARIES, "model_type", model_type_options)
+
+# 매물 1건당 사진 최대 장수 / 스택 전 긴 변 최대 크기 (메모리 상한)
+MAX_LISTING_IMAGES = 10
+MAX_IMAGE_SIDE = 512
+
+def pool_image_features(features, counts, pool_layer=None):
+    """
+    매물별로 이어붙인 특징 (sum(counts), D) 를 매물 단위 (len(counts), D) 로 합칩니다.
+    - pool_layer 없음: 평균
+    - pool_layer 있음: 사진별 점수(Linear(D,1))의 softmax 가중합 (attention)
+    """
+    counts = [int(c) for c in counts]
+    if pool_layer is None:
+        seg = torch.repeat_interleave(torch.arange(len(counts)), torch.tensor(counts))
+        summed = torch.zeros(len(counts), features.shape[1], dtype=features.dtype).index_add_(0, seg, features)
+        return summed / torch.tensor(counts, dtype=features.dtype).unsqueeze(1)
+
+    pooled = []
+    for block in torch.split(features, counts):
+        weights = torch.softmax(pool_layer(block), dim=0)
+        pooled.append((weights * block).sum(dim=0))
+    return torch.stack(pooled)
+
+# 모델 출력 단위: price(원 그대로) / log1p(log1p(가격)으로 학습, train_convnext.py)
+TARGETS = ("price", "log1p")
+
+# 모델 정의 (학습 구조와 동일)
+class CombinedModel(nn.Module):
+    """
+    ConvNeXt-Small image + csv -> 회귀 출력(가격)
+    conv_out_dim 을 주면 백본 출력 크기를 재기 위한 더미 forward 를 생략합니다.
+    image_pool="attention" 이면 매물 여러 장을 합칠 때 쓰는 img_pool 레이어를 추가합니다 (기본은 평균).
+    target="log1p" 면 log1p(가격)으로 학습한 모델이므로 head 에서 expm1 로 원 단위로 되돌립니다
+    (head 안에서 처리하므로 eager / scripted / onnx / quantized 가 같은 값을 냄).
+    """
+    def __init__(self, tabular_data_size, backbone, img_dim=64, tab_dim=256, tab_scale=1.0, img_scale=1.0,
+                 conv_out_dim=None, image_pool="mean", target="price"):
+        super().__init__()
+        if target not in TARGETS:
+            raise ValueError(f"target must be one of {TARGETS}: {target!r}")
+        self.tab_scale = tab_scale
+        self.img_scale = img_scale
+        self.target = target
+        self.conv_part = backbone
+
+        if conv_out_dim is None:
+            with torch.no_grad():
+                dummy = torch.randn(1, 3, 224, 224)
+                out = self.conv_part(dummy)
+                conv_out_dim = out.shape[-1] if out.ndim == 2 else out.numel()
+
+        self.img_head = nn.Sequential(nn.Linear(conv_out_dim, img_dim), nn.ReLU())
+        self.img_pool = nn.Linear(conv_out_dim, 1) if image_pool == "attention" else None
+        self.tab_head = nn.Sequential(nn.Linear(tabular_data_size, tab_dim), nn.ReLU())
+
+        combined_features_size = img_dim + tab_dim
+
+        self.reg_part = nn.Sequential(
+            nn.Linear(combined_features_size, 512), nn.ReLU(),
+            nn.Linear(512, 128), nn.ReLU(),
+            nn.Linear(128, 1)
+        )
+
+    def extract_features(self, images):
+        """
+        백본만 통과시킨 pooled 특징 벡터 (B, conv_out_dim) - 캐시/재사용 대상
+        """
+        return self.conv_part(images)
+
+    def head(self, image_features, tabular_data):
+        """
+        extract_features 결과와 탭 입력으로 가격을 계산하는 가벼운 부분
+        """
+        image_features = image_features * self.img_scale
+        tab_features   = tabular_data * self.tab_scale
+        image_features = self.img_head(image_features)
+        tab_features   = self.tab_head(tab_features)
+        combined = torch.cat([image_features, tab_features], dim=1)
+
+        out = self.reg_part(combined)
+        # ONNX 에 expm1 연산이 없어서 exp - 1 (원 단위 가격에서는 정밀도 차이 없음)
+        return torch.exp(out) - 1 if self.target == "log1p" else out
+
+    def pool_features(self, features, counts):
+        return pool_image_features(features, counts, self.img_pool)
+
+    def pool_scores(self, features):
+        # 사진별 attention 점수 (image_pool="attention" 일 때만). 내보낸 모델에도 이 메서드를 함께 넣음
+        return self.img_pool(features)
+
+    def forward(self, images, tabular_data):
+        return self.head(self.extract_features(images), tabular_data)
+
+    def forward_listing(self, images, counts, tabular_data):
+        """
+        매물 여러 건의 사진을 한 번에 백본에 통과시키고 매물별로 합쳐서 가격을 계산합니다.
+        images: (sum(counts),3,H,W), counts: 매물별 사진 수, tabular_data: (len(counts), T)
+        """
+        return self.head(self.pool_features(self.extract_features(images), counts), tabular_data)
+
+def _extract_state_dict(obj):
+    if isinstance(obj, dict):
+        if "state_dict" in obj and isinstance(obj["state_dict"], dict):
+            return obj["state_dict"]
+
+        for k in ["model_state_dict", "net", "model"]:
+            if k in obj and isinstance(obj[k], dict):
+                return obj[k]
+
+    return obj
+
+def _strip_module_prefix(state):
+    if not isinstance(state, dict):
+        return state
+
+    need_strip = any(k.startswith("module.") for k in state.keys())
+
+    if not need_strip:
+        return state
+
+    return {k.replace("module.", "", 1): v for k, v in state.items()}
+
+def read_checkpoint(weight_path: str = WEIGHT_PATH, mmap: bool = True) -> tuple[dict, dict]:
+    """
+    체크포인트를 (state dict, checkpoint_meta) 로 읽습니다.
+    - .safetensors 는 safetensors 로, 그 외는 torch.load(mmap=True) 로 읽고
+      mmap 이 안 되는 예전 형식이면 일반 로드로 다시 시도
+    """
+    try:
+        if weight_path.endswith(".safetensors"):
+            from safetensors.torch import load_file
+            raw = load_file(weight_path, device="cpu")
+        else:
+            try:
+                raw = torch.load(weight_path, map_location="cpu", mmap=mmap)
+            except RuntimeError:
+                if not mmap:
+                    raise
+                raw = torch.load(weight_path, map_location="cpu")
+    except Exception as e:
+        raise RuntimeError(f"가중치 파일을 불러올 수 없습니다: {e}") from e
+
+    state = _extract_state_dict(raw)
+    return _strip_module_prefix(state), checkpoint_meta(raw)
+
+def checkpoint_meta(raw) -> dict:
+    """
+    체크포인트의 학습 설정 (backbone, tab_scale, img_scale, target)
+    - train_convnext.py 는 최상위 키로 저장 (예전 파일은 "args" 에서 복원, 이 스크립트는 항상 log1p 타깃)
+    - 메타데이터가 없는 노트북 체크포인트는 스케일 1.0, 원 단위 타깃
+    """
+    raw = raw if isinstance(raw, dict) else {}
+    args = raw.get("args") if isinstance(raw.get("args"), dict) else {}
+    return {
+        "backbone": raw.get("backbone", args.get("backbone", "convnext_small")),
+        "tab_scale": float(raw.get("tab_scale", args.get("tab_scale", 1.0))),
+        "img_scale": float(raw.get("img_scale", args.get("img_scale", 1.0))),
+        "target": raw.get("target", "log1p" if args else "price"),
+    }
+
+def build_model_from_state(state: dict, meta: dict | None = None, on_meta: bool = True) -> CombinedModel:
+    """
+    state dict 의 레이어 모양만으로 (가중치 없이) 모델 뼈대를 만듭니다.
+    meta(checkpoint_meta 결과)의 스케일 / 타깃을 학습 때와 같게 복원합니다.
+    ImageNet 가중치 다운로드와 더미 forward 가 없습니다.
+    on_meta=True 면 파라미터 초기화까지 건너뛰므로 load_state_dict(..., assign=True) 로 채워야 합니다.
+    """
+    meta = meta or checkpoint_meta(None)
+    if meta["backbone"] != "convnext_small":
+        raise RuntimeError(f"앱은 convnext_small 백본만 지원합니다: {meta['backbone']}")
+    try:
+        conv_out_dim, tab_size = state["img_head.0.weight"].shape[1], state["tab_head.0.weight"].shape[1]
+        img_dim, tab_dim = state["img_head.0.weight"].shape[0], state["tab_head.0.weight"].shape[0]
+    except Exception as e:
+        raise RuntimeError(f"체크포인트에서 레이어 모양을 읽을 수 없습니다: {e}") from e
+
+    with torch.device("meta") if on_meta else contextlib.nullcontext():
+        backbone = models.convnext_small(weights=None)
+        backbone.classifier[2] = nn.Identity()
+
+        return CombinedModel(
+            tabular_data_size=tab_size,
+            backbone=backbone,
+            img_dim=img_dim,   # ex) 32
+            tab_dim=tab_dim,
+            conv_out_dim=conv_out_dim,
+            image_pool="attention" if "img_pool.weight" in state else "mean",
+            tab_scale=meta["tab_scale"],
+            img_scale=meta["img_scale"],
+            target=meta["target"],
+        )
+
+def load_model_and_preprocess(weight_path: str = WEIGHT_PATH):
+    """
+    체크포인트를 읽어 (model, preprocess, tab_size) 를 반환합니다.
+    실패 시 RuntimeError 를 던지므로 화면 표시는 호출 측(Streamlit, 서비스)이 담당합니다.
+    """
+    # 1) 체크포인트 읽기 (mmap)
+    state, meta = read_checkpoint(weight_path)
+
+    # 2) 체크포인트 모양 + 학습 설정대로 뼈대 만들기
+    model = build_model_from_state(state, meta)
+    model.eval()
+
+    # 3) 가중치 로드 (assign=True 로 mmap 텐서를 복사 없이 사용)
+    try:
+        model.load_state_dict(state, strict=True, assign=True)
+    except Exception as e:
+        raise RuntimeError(f"가중치 로드 실패: {e}") from e
+
+    # 4) 전처리 (가중치 파일 없이 설정만 사용)
+    preprocess = models.ConvNeXt_Small_Weights.DEFAULT.transforms()
+
+    return model, preprocess, model.tab_head[0].in_features
+
+@functools.lru_cache(maxsize=None)
+def get_tab_encoder(expected_size: int) -> TabularEncoder:
+    """
+    체크포인트 기대 크기에 맞는 인코더 (크기별로 한 번만 생성)
+    - 전처리 파일이 있고 입력 폭이 모델 입력 칼럼 수면 학습과 같은 순서/값
+      (저장된 model_inputs 순서, 없으면 TRAIN_IDS. PreprocessPipeline.transform_one(row, columns=같은 순서) 과 같은 값)
+    - 그 외(전처리 파일 없는 예전 체크포인트)는 크기로 레이아웃 추론
+    """
+    classes = (PREPROCESS_ARTIFACT or {}).get("label_classes", {})
+    fields = (PREPROCESS_ARTIFACT or {}).get("model_inputs") or TRAIN_IDS
+    if expected_size == len(fields) and all(f in classes for f in fields):
+        return TabularEncoder.from_pipeline(PREPROCESS_ARTIFACT, fields=fields)
+    return TabularEncoder.for_expected_size(OPTION_VOCABULARIES, expected_size, fields=TAB_FIELDS)
+
+# 탭 인코딩 (여러 행을 한 번에, 체크포인트 기대 크기에 맞춤)
+def build_tab_batch(conditions, cities, model_names, model_types, expected_size: int, is_completed=False):
+    """
+    같은 길이의 값 리스트 4개를 받아 (N, expected_size) float32 텐서를 만듭니다.
+    is_completed: 값 1개(전체 공통) 또는 같은 길이 리스트 (예측 요청은 보통 판매 중 = False)
+    """
+    if np.ndim(is_completed) == 0:
+        is_completed = [is_completed] * len(conditions)
+    return get_tab_encoder(expected_size).encode_columns({
+        "condition": conditions, "location": cities, "model": model_names, "model_type": model_types,
+        "is_completed": is_completed,
+    })
+
+# 탭 인코딩 (단일 요청)
+def build_tab_tensor(condition, city, model_name, model_type, expected_size: int, is_completed=False):
+    encoder = get_tab_encoder(expected_size)
+    row = {"condition": condition, "location": city, "model": model_name, "model_type": model_type,
+           "is_completed": is_completed}
+    return encoder.encode_one(*(row[f] for f in encoder.fields))
+
+def pool_model_features(model, features, counts):
+    # scripted/onnx 모델은 함께 내보낸 pool_scores 로 attention, 없으면 평균 모델
+    # (attention 모델인데 pool_scores 가 빠진 내보내기는 load_runtime_model 이 거부)
+    pool = getattr(model, "pool_features", None)
+    if pool is not None:
+        return pool(features, counts)
+    return pool_image_features(features, counts, getattr(model, "pool_scores", None))
+
+def load_listing_image(file, max_side: int = MAX_IMAGE_SIDE) -> Image.Image:
+    """
+    업로드 이미지를 긴 변 max_side 이하로 줄여서 엽니다.
+    JPEG 은 draft() 로 축소 디코딩하므로 12MP 사진도 전체 해상도로 풀지 않습니다.
+    """
+    img = Image.open(file)
+    img.draft("RGB", (max_side, max_side))
+    img = img.convert("RGB")
+    img.thumbnail((max_side, max_side))
+    return img
+
+def predict_price_grid(model, img_tensor, model_name, expected_size: int,
+                       conditions=None, cities=None, model_types=None, embedding_cache=None, is_completed=False):
+    """
+    사진 1장에 대해 condition x city x model_type 전체 조합 가격을 한 번의 head 호출로 계산합니다.
+    - 백본은 1회만 실행(embedding_cache 가 있으면 캐시 재사용)
+    - img_tensor 에 사진이 여러 장이면 매물 1건으로 보고 특징을 합침
+    - 반환: [{"condition", "city", "model", "model_type", "price"}, ...]
+    """
+    conditions = conditions or condition_options
+    cities = cities or city_options
+    model_types = model_types or model_type_options
+
+    combos = list(itertools.product(conditions, cities, model_types))
+    tab_batch = build_tab_batch(
+        [c for c, _, _ in combos], [s for _, s, _ in combos],
+        [model_name] * len(combos), [t for _, _, t in combos],
+        expected_size, is_completed=is_completed,
+    )
+
+    with torch.inference_mode():
+        feats = None
+        if embedding_cache is not None:
+            key = image_key(img_tensor)
+            feats = embedding_cache.get(key)
+        if feats is None:
+            feats = model.extract_features(img_tensor)
+            if feats.shape[0] > 1:
+                feats = pool_model_features(model, feats, [feats.shape[0]])
+            if embedding_cache is not None:
+                embedding_cache.put(key, feats)
+
+        preds = model.head(feats.expand(len(combos), -1), tab_batch).reshape(-1).tolist()
+
+    return [
+        {"condition": c, "city": s, "model": model_name, "model_type": t, "price": max(0, round(float(p)))}
+        for (c, s, t), p in zip(combos, preds)
+    ]
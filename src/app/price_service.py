@@ -0,0 +1,315 @@
+"""
+Streamlit 없이 가격 예측을 제공하는 HTTP 서비스
+
+실행 예시 (src/app 에서)
+    python price_service.py --port 8000 --workers 2 --threads 4
+    python price_service.py --runtime quantized   # model_runtime.py 로 미리 내보낸 모델 사용
+    python price_service.py --overload-queue 32    # 대기 요청이 32개 이상이면 탭 모델로 응답
+
+응답 계층 (응답의 "tier")
+    convnext : 사진 + 탭 입력 (InferenceEngine)
+    tabular  : 탭 입력만 (train_tabular.py 로 만든 LightGBM 가격표, 수 µs)
+               사진이 없는 요청, "tier": "tabular" 로 지정한 요청,
+               ConvNeXt 대기열이 --overload-queue 이상일 때 사용 (모델 파일이 있을 때만)
+
+엔드포인트
+    GET  /health          : 상태 확인
+    GET  /metrics         : 단계별 지연시간 히스토그램, 계층별 예측 / 요청·항목 오류 카운터, 모델 로드 시간,
+                            임베딩 캐시 카운터 (Prometheus 텍스트 형식)
+    POST /debug/profile   : {"requests": N} -> 다음 N 건 추론 배치를 torch.profiler 로 기록 (--profile-dir)
+    POST /predict         : {"image": <base64>, "condition", "city", "model", "model_type"} -> {"price", "tier"}
+                            ("images": [<base64>, ...] 로 매물 사진 여러 장(최대 MAX_LISTING_IMAGES) 전달 가능)
+                            (선택: "is_completed" - 기본 false(판매 중), "tier": "convnext" | "tabular")
+    POST /predict/bulk    : {"items": [위 형식, ...]} -> {"prices": [...], "tiers": [...], "errors": [...]}
+                            (잘못된 항목은 그 항목만 price / tier 가 null, errors 에 사유 - 나머지는 정상 응답)
+"""
+import argparse
+import base64
+import io
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import torch
+
+from embedding_cache import EmbeddingCache
+from inference_engine import InferenceEngine
+from instrumentation import Metrics, ProfileCapture
+from model_runtime import EXPORT_DIR, RUNTIMES, load_runtime_model
+from price_model import MAX_LISTING_IMAGES, WEIGHT_PATH, build_tab_tensor, load_listing_image
+from tabular_model import TABULAR_MODEL_PATH, TabularPriceModel
+
+REQUIRED_FIELDS = ("condition", "city", "model", "model_type")
+TIERS = ("convnext", "tabular")
+# 범주 조회(dict / 라벨 인덱스)에 그대로 쓰는 항목은 문자열·숫자·bool 만 허용
+SCALAR_FIELDS = (*REQUIRED_FIELDS, "is_completed", "tier")
+
+def check_fields(item: dict):
+    """
+    항목 값 형식 확인. 리스트/객체 값은 조회에서 TypeError(unhashable) 가 나서 500 이 되므로 ValueError 로 거름
+    """
+    bad = [k for k in SCALAR_FIELDS if item.get(k) is not None and not isinstance(item[k], (str, int, float, bool))]
+    if bad:
+        raise ValueError(f"문자열/숫자 값이어야 하는 항목입니다: {bad}")
+    images = item.get("images")
+    if images and (not isinstance(images, list) or not all(isinstance(b, str) for b in images)):
+        raise ValueError("images 는 base64 문자열 리스트여야 합니다.")
+    if item.get("image") is not None and not isinstance(item["image"], str):
+        raise ValueError("image 는 base64 문자열이어야 합니다.")
+
+class PricePredictor:
+    """
+    모델 1개를 공유하는 추론 엔진 workers 개를 라운드로빈으로 사용합니다.
+    엔진들이 배치를 병렬로 돌리고, forward 는 torch intra-op 스레드 풀을 공유합니다.
+    threads 는 프로세스 전체 설정이므로 여기서 한 번만 torch.set_num_threads 합니다 (onnx 는 세션 intra_op 에도 사용).
+    tabular_path 에 탭 모델이 있으면 사진 없는 요청 / 과부하 시 fallback 계층으로 사용합니다.
+    """
+    def __init__(self, weight_path: str = WEIGHT_PATH, workers: int = 1, threads: int | None = None,
+                 max_batch_size: int = 16, max_wait_ms: float = 5.0,
+                 cache_mb: float = 64, cache_dir: str | None = None,
+                 runtime: str = "eager", export_dir: str = EXPORT_DIR,
+                 tabular_path: str | None = TABULAR_MODEL_PATH, overload_queue: int = 64,
+                 profile_dir: str = "profiles"):
+        self.runtime = runtime
+        self.metrics = Metrics()
+        self.profiler = ProfileCapture(profile_dir)
+        self.overload_queue = overload_queue
+
+        if threads:
+            torch.set_num_threads(threads)
+
+        start = time.perf_counter()
+        self.model, self.preprocess, self.tab_expect = load_runtime_model(runtime, weight_path, export_dir,
+                                                                          num_threads=threads)
+        self.metrics.set_gauge("price_model_load_seconds", time.perf_counter() - start, model=runtime)
+        start = time.perf_counter()
+        self.tabular = TabularPriceModel.load_if_exists(tabular_path)
+        if self.tabular is not None:
+            self.metrics.set_gauge("price_model_load_seconds", time.perf_counter() - start, model="tabular")
+
+        self.embedding_cache = EmbeddingCache(int(cache_mb * 1024 * 1024), spill_dir=cache_dir) if cache_mb > 0 else None
+        self.engines = [
+            InferenceEngine(self.model, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms,
+                            embedding_cache=self.embedding_cache, metrics=self.metrics, profiler=self.profiler)
+            for _ in range(max(1, workers))
+        ]
+        self._next = itertools.cycle(self.engines)
+        self._lock = threading.Lock()
+
+    def _engine(self) -> InferenceEngine:
+        with self._lock:
+            return next(self._next)
+
+    def _choose_tier(self, item: dict, engine: InferenceEngine) -> str:
+        tier = item.get("tier")
+        if tier is not None and tier not in TIERS:
+            raise ValueError(f"tier 는 {list(TIERS)} 중 하나여야 합니다: {tier!r}")
+        if tier == "tabular" and self.tabular is None:
+            raise ValueError("탭 모델이 로드되지 않았습니다.")
+        if self.tabular is None or tier == "convnext":
+            return "convnext"
+
+        # 사진 없음 / 지정 / ConvNeXt 대기열 과부하 -> 탭 모델
+        if tier == "tabular" or ("image" not in item and not item.get("images")):
+            return "tabular"
+        if self.overload_queue and engine.pending() >= self.overload_queue:
+            return "tabular"
+        return "convnext"
+
+    def _predict_tabular(self, item: dict) -> float:
+        missing = [k for k in REQUIRED_FIELDS if k not in item]
+        if missing:
+            raise ValueError(f"필수 항목이 없습니다: {missing}")
+        with self.metrics.stage("tabular"):
+            return self.tabular.predict_row(item)
+
+    def _to_tensors(self, item: dict):
+        missing = [k for k in REQUIRED_FIELDS if k not in item]
+        if "image" not in item and not item.get("images"):
+            missing.insert(0, "image")
+        if missing:
+            raise ValueError(f"필수 항목이 없습니다: {missing}")
+
+        # "images" 가 있으면 매물 1건의 사진 여러 장 (앞에서부터 최대 MAX_LISTING_IMAGES 장)
+        encoded = item["images"][:MAX_LISTING_IMAGES] if item.get("images") else [item["image"]]
+        try:
+            with self.metrics.stage("decode"):
+                images = [load_listing_image(io.BytesIO(base64.b64decode(b))) for b in encoded]
+        except Exception as e:
+            raise ValueError(f"이미지를 읽을 수 없습니다: {e}") from e
+
+        with self.metrics.stage("preprocess"):
+            img_tensor = torch.stack([self.preprocess(image) for image in images])
+        tab_tensor = build_tab_tensor(item["condition"], item["city"], item["model"], item["model_type"],
+                                      expected_size=self.tab_expect, is_completed=item.get("is_completed", False))
+        return img_tensor, tab_tensor
+
+    def predict(self, item: dict) -> dict:
+        result = self.predict_bulk([item])[0]
+        if "error" in result:
+            raise ValueError(result["error"])
+        return result
+
+    def predict_bulk(self, items: list[dict]) -> list[dict]:
+        """
+        [{"price", "tier"} 또는 {"error"}, ...] - 탭 계층은 바로 계산하고 나머지는 엔진 배치로 보냄
+        입력이 잘못된 항목(ValueError)은 그 항목만 {"error": 사유} 로 돌려줌
+        """
+        start = time.perf_counter()
+        engine = self._engine()
+        n = len(items)
+        tiers, preds, errors = [None] * n, [None] * n, [None] * n
+        pairs = {}
+        for i, item in enumerate(items):
+            try:
+                if not isinstance(item, dict):
+                    raise ValueError("항목은 JSON 객체여야 합니다.")
+                check_fields(item)
+                tier = self._choose_tier(item, engine)
+                if tier == "tabular":
+                    preds[i] = self._predict_tabular(item)
+                else:
+                    pairs[i] = self._to_tensors(item)
+                tiers[i] = tier
+            except ValueError as e:
+                errors[i] = str(e)
+
+        futures = {i: engine.submit_listing(img, tab) if img.shape[0] > 1 else engine.submit(img, tab)
+                   for i, (img, tab) in pairs.items()}
+        for i, fut in futures.items():
+            preds[i] = fut.result()
+
+        self.metrics.observe("total", time.perf_counter() - start)
+        for tier in TIERS:
+            self.metrics.inc("price_predictions_total", tiers.count(tier), tier=tier)
+        failed = n - errors.count(None)
+        if failed:
+            self.metrics.inc("price_item_errors_total", failed)
+        return [{"error": err} if err is not None else {"price": max(0, round(float(p))), "tier": tier}
+                for p, tier, err in zip(preds, tiers, errors)]
+
+    def metrics_text(self) -> str:
+        lines = [self.metrics.text().rstrip("\n")]
+        if self.embedding_cache is not None:
+            stats = self.embedding_cache.stats()
+            for name in ("hits", "disk_hits", "misses", "evictions"):
+                lines.append(f"# TYPE embedding_cache_{name}_total counter")
+                lines.append(f"embedding_cache_{name}_total {stats[name]}")
+            for name in ("entries", "bytes"):
+                lines.append(f"# TYPE embedding_cache_{name} gauge")
+                lines.append(f"embedding_cache_{name} {stats[name]}")
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        for engine in self.engines:
+            engine.close()
+
+def make_handler(predictor: PricePredictor):
+    class PriceRequestHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status: int, payload: dict):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_text(self, status: int, text: str):
+            body = text.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_json(self) -> dict:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("요청 본문은 JSON 객체여야 합니다.")
+            return payload
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json(200, {"status": "ok", "workers": len(predictor.engines), "runtime": predictor.runtime,
+                                      "tabular": predictor.tabular is not None})
+            elif self.path == "/metrics":
+                self._send_text(200, predictor.metrics_text())
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            try:
+                payload = self._read_json()
+                if self.path == "/predict":
+                    self._send_json(200, predictor.predict(payload))
+                elif self.path == "/debug/profile":
+                    n = int(payload.get("requests", 1))
+                    predictor.profiler.arm(n)
+                    self._send_json(200, {"armed": n, "out_dir": predictor.profiler.out_dir,
+                                          "traces": predictor.profiler.traces[-10:]})
+                elif self.path == "/predict/bulk":
+                    items = payload.get("items")
+                    if not isinstance(items, list):
+                        raise ValueError("items 리스트가 필요합니다.")
+                    results = predictor.predict_bulk(items)
+                    self._send_json(200, {"prices": [r.get("price") for r in results],
+                                          "tiers": [r.get("tier") for r in results],
+                                          "errors": [r.get("error") for r in results]})
+                else:
+                    self._send_json(404, {"error": "not found"})
+            except (ValueError, json.JSONDecodeError) as e:
+                predictor.metrics.inc("price_request_errors_total", status=400)
+                self._send_json(400, {"error": str(e)})
+            except Exception as e:
+                predictor.metrics.inc("price_request_errors_total", status=500)
+                self._send_json(500, {"error": str(e)})
+
+        def log_message(self, format, *args):
+            # 요청마다 stderr 에 찍지 않음
+            pass
+
+    return PriceRequestHandler
+
+def main():
+    parser = argparse.ArgumentParser(description="유모차 가격 예측 HTTP 서비스")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--weights", default=WEIGHT_PATH)
+    parser.add_argument("--runtime", default="eager", choices=RUNTIMES, help="추론 실행 방식")
+    parser.add_argument("--export-dir", default=EXPORT_DIR, help="eager 외 런타임의 내보낸 모델 위치")
+    parser.add_argument("--workers", type=int, default=1, help="추론 엔진 개수")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op 스레드 수")
+    parser.add_argument("--max-batch", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--cache-mb", type=float, default=64, help="임베딩 캐시 메모리 예산 (0 이면 끔)")
+    parser.add_argument("--cache-dir", default=None, help="캐시에서 밀려난 임베딩을 저장할 디렉토리")
+    parser.add_argument("--tabular-model", default=TABULAR_MODEL_PATH, help="탭 전용 fallback 모델 (없으면 사용 안 함)")
+    parser.add_argument("--profile-dir", default="profiles", help="/debug/profile trace 저장 위치")
+    parser.add_argument("--overload-queue", type=int, default=64,
+                        help="엔진 대기 요청이 이 수 이상이면 탭 모델로 응답 (0 이면 끔)")
+    args = parser.parse_args()
+
+    predictor = PricePredictor(args.weights, workers=args.workers, threads=args.threads,
+                               max_batch_size=args.max_batch, max_wait_ms=args.max_wait_ms,
+                               cache_mb=args.cache_mb, cache_dir=args.cache_dir,
+                               runtime=args.runtime, export_dir=args.export_dir,
+                               tabular_path=args.tabular_model, overload_queue=args.overload_queue,
+                               profile_dir=args.profile_dir)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(predictor))
+    print(f"가격 예측 서비스 시작: http://{args.host}:{args.port} "
+          f"(runtime={args.runtime}, workers={args.workers}, threads={args.threads}, "
+          f"tabular={'on' if predictor.tabular is not None else 'off'})")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        predictor.close()
+
+if __name__ == "__main__":
+    main()
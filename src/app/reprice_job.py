@@ -0,0 +1,322 @@
+"""
+크롤링 CSV 전체 매물을 오프라인으로 가격 재산정 (예측가 vs 등록가 -> 저가/고가 매물 찾기)
+
+- CSV 를 --chunk-rows 행씩 스트리밍으로 읽음 (전체를 메모리에 올리지 않음)
+- id -> image_root/<id>/ 사진 (이름순 앞에서 --max-images 장)
+- 다음 청크 사진 디코딩/전처리는 스레드 풀에서, 그동안 현재 청크는 모델(백본 배치 -> 매물별 특징 합치기 -> head)
+  -> 메모리에 있는 사진 텐서는 최대 2청크 (약 2 x chunk_rows x max_images x 0.6MB)
+- 사진이 없거나 읽을 수 없는 매물은 탭 모델(tabular_lgbm.json)이 있으면 그걸로, 없으면 error 만 기록
+- 결과는 --out 폴더에 청크마다 part-00000.parquet ... (임시 파일 -> os.replace)
+  _job.json 에 입력/설정을 기록하고, 다시 실행하면 이미 쓴 청크는 건너뜀 (중단된 작업 이어서)
+  설정이 바뀌었으면 --restart 로 처음부터
+
+출력 칼럼
+    id, condition, location, model, model_type, listed_price, predicted_price,
+    diff(예측 - 등록), ratio(등록 / 예측), tier("convnext" | "tabular"), n_images, error
+
+실행 예시 (src/app 에서)
+    python reprice_job.py --csv ../../csv/daangn_clean.csv --image-root ../../data/total_images \\
+        --out ../../data/reprice/daangn
+    python reprice_job.py --csv ../../csv/bungaejangter_clean.csv --normalize-location --decode-threads 8
+    결과 읽기: pd.read_parquet("../../data/reprice/daangn")
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import torch
+
+from model_runtime import EXPORT_DIR, RUNTIMES, load_runtime_model
+from price_model import (
+    MAX_LISTING_IMAGES, WEIGHT_PATH, build_tab_batch, get_tab_encoder, load_listing_image, pool_model_features,
+)
+from tab_encoder import TAB_FIELDS
+from tabular_model import CONDITION_ALIASES, TABULAR_MODEL_PATH, TabularPriceModel
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg")
+# "_" / "." 로 시작하는 파일은 pd.read_parquet(폴더) 가 무시함
+JOB_NAME = "_job.json"
+INPUT_COLUMNS = ["id", "condition", "is_completed", "location", "model", "model_type", "price"]
+
+def listing_image_paths(image_root: str, image_id: str, max_images: int) -> list[str]:
+    folder = os.path.join(image_root, str(image_id))
+    if not os.path.isdir(folder):
+        return []
+    files = sorted(f for f in os.listdir(folder) if f.lower().endswith(IMAGE_EXTS))
+    return [os.path.join(folder, f) for f in files[:max_images]]
+
+def _decode_listing(paths: list[str], preprocess) -> torch.Tensor | None:
+    # 스레드 풀에서 실행 (PIL 디코딩 / torchvision 변환은 GIL 을 대부분 놓음)
+    tensors = []
+    for path in paths:
+        try:
+            tensors.append(preprocess(load_listing_image(path)))
+        except Exception:
+            continue
+    return torch.stack(tensors) if tensors else None
+
+def _as_str(values: pd.Series) -> pd.Series:
+    # 학습 때 라벨 classes 와 같은 문자열 (결측은 "nan")
+    return values.astype(object).where(values.notna(), "nan").astype(str)
+
+def to_vocabulary(chunk: pd.DataFrame, vocabularies: dict) -> pd.DataFrame:
+    """
+    어휘에 없는 값을 맞출 수 있으면 맞춘 사본 (사용감 표기 변환, "explori, crusi" -> 첫 모델명)
+    """
+    out = chunk.copy()
+    for field, vocab in vocabularies.items():
+        if field not in out.columns:
+            continue
+        values = out[field]
+        known = values.isin(vocab)
+        if field == "condition":
+            values = values.where(known, values.map(CONDITION_ALIASES))
+        elif field == "model":
+            values = values.where(known, values.str.split(",").str[0].str.strip())
+        out[field] = values
+    return out
+
+class RepriceJob:
+    """
+    청크 1개 = (원본 행, 사진 디코딩 Future 목록). start -> finish 순서로 파이프라인을 만듭니다.
+    """
+    def __init__(self, model, preprocess, tab_size: int, image_root: str, tabular: TabularPriceModel | None = None,
+                 max_images: int = 3, batch_size: int = 32, decode_threads: int = 4):
+        self.model = model
+        self.preprocess = preprocess
+        self.tab_size = tab_size
+        self.image_root = image_root
+        self.tabular = tabular
+        self.max_images = max_images
+        self.batch_size = batch_size
+        self.pool = ThreadPoolExecutor(max_workers=decode_threads, thread_name_prefix="reprice-decode")
+
+    def start(self, chunk: pd.DataFrame):
+        """
+        청크의 사진 디코딩을 스레드 풀에 넣고 바로 반환합니다.
+        """
+        chunk = chunk.reset_index(drop=True)
+        futures = [self.pool.submit(_decode_listing, listing_image_paths(self.image_root, i, self.max_images),
+                                    self.preprocess)
+                   for i in chunk["id"]]
+        return chunk, futures
+
+    def _encodable(self, chunk: pd.DataFrame) -> np.ndarray:
+        # 체크포인트 탭 입력 칼럼 전부 (전처리 파일이 있으면 is_completed 포함)
+        encoder = get_tab_encoder(self.tab_size)
+        ok = np.ones(len(chunk), dtype=bool)
+        for field in encoder.fields:
+            ok &= _as_str(chunk[field]).isin(encoder.vocabularies[field]).to_numpy()
+        return ok
+
+    def _run_model(self, images: list[torch.Tensor], tabs: torch.Tensor) -> np.ndarray:
+        # 사진을 batch_size 장씩 백본에 통과시킨 뒤 매물별로 합쳐서 head 한 번
+        counts = [img.shape[0] for img in images]
+        stacked = torch.cat(images)
+        with torch.inference_mode():
+            feats = torch.cat([self.model.extract_features(stacked[s:s + self.batch_size])
+                               for s in range(0, len(stacked), self.batch_size)])
+            if max(counts) > 1:
+                feats = pool_model_features(self.model, feats, counts)
+            return self.model.head(feats, tabs).reshape(-1).numpy()
+
+    def finish(self, job) -> pd.DataFrame:
+        """
+        디코딩 결과를 기다려 모델을 돌리고 결과 프레임을 만듭니다.
+        """
+        chunk, futures = job
+        images = [f.result() for f in futures]
+        for col in TAB_FIELDS:
+            chunk[col] = _as_str(chunk[col])
+
+        n = len(chunk)
+        pred = np.full(n, np.nan)
+        tier = np.full(n, None, dtype=object)
+        error = np.full(n, None, dtype=object)
+        n_images = np.array([0 if img is None else img.shape[0] for img in images])
+
+        # 1) 사진 있고 앱 어휘로 인코딩 가능한 행 -> ConvNeXt
+        app_chunk = to_vocabulary(chunk, get_tab_encoder(self.tab_size).vocabularies)
+        rows = np.flatnonzero(self._encodable(app_chunk) & (n_images > 0))
+        if len(rows):
+            sub = app_chunk.iloc[rows]
+            tabs = build_tab_batch(sub["condition"], sub["location"], sub["model"], sub["model_type"], self.tab_size,
+                                   is_completed=_as_str(sub["is_completed"]).to_numpy())
+            pred[rows] = self._run_model([images[i] for i in rows], tabs)
+            tier[rows] = "convnext"
+
+        # 2) 나머지 -> 탭 모델 (있으면, 남은 행 전체를 한 번에 / 모르는 값이 있는 행은 NaN)
+        rest = np.flatnonzero(np.isnan(pred))
+        if self.tabular is None:
+            error[rest] = np.where(n_images[rest] == 0, "no_image", "unknown_category")
+        elif len(rest):
+            tab_chunk = to_vocabulary(chunk.iloc[rest], self.tabular.label_classes)
+            tab_pred = self.tabular.predict_frame(tab_chunk, errors="coerce")
+            ok = ~np.isnan(tab_pred)
+            pred[rest[ok]] = tab_pred[ok]
+            tier[rest[ok]] = "tabular"
+            error[rest[~ok]] = "unknown_category"
+
+        listed = pd.to_numeric(chunk["price"], errors="coerce").to_numpy(dtype=np.float64)
+        pred = np.clip(pred, 0, None)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = listed / pred
+        return pd.DataFrame({
+            "id": chunk["id"].astype(str), **{c: chunk[c] for c in TAB_FIELDS},
+            "listed_price": listed, "predicted_price": pred, "diff": pred - listed, "ratio": ratio,
+            "tier": tier, "n_images": n_images, "error": error,
+        })
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+def part_path(out_dir: str, index: int) -> str:
+    return os.path.join(out_dir, f"part-{index:05d}.parquet")
+
+def write_part(df: pd.DataFrame, out_dir: str, index: int):
+    path = part_path(out_dir, index)
+    tmp = os.path.join(out_dir, f".part-{index:05d}.tmp")
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+def completed_parts(out_dir: str, params: dict, restart: bool) -> int:
+    """
+    이미 쓴 청크 수 (_job.json 설정이 같을 때만 이어서, 다르면 ValueError)
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    job_path = os.path.join(out_dir, JOB_NAME)
+    if os.path.exists(job_path) and not restart:
+        with open(job_path, encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved != params:
+            raise ValueError(f"{out_dir} 의 이전 작업 설정이 다릅니다. --restart 로 처음부터 다시 실행하세요.")
+    else:
+        for name in os.listdir(out_dir):
+            if name.startswith("part-") and name.endswith(".parquet"):
+                os.remove(os.path.join(out_dir, name))
+        tmp = job_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(params, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, job_path)
+
+    # 청크는 순서대로 쓰므로 앞에서부터 연속된 part 수
+    done = 0
+    while os.path.exists(part_path(out_dir, done)):
+        done += 1
+    return done
+
+def peak_rss_mb() -> float:
+    # Linux 는 KB 단위
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def run(args) -> dict:
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    # 결과를 바꾸는 입력은 모두 기록 (탭 모델은 파일이 없으면 쓰지 않으므로 None)
+    tabular_path = args.tabular_model if args.tabular_model and os.path.exists(args.tabular_model) else None
+    params = {"csv": os.path.abspath(args.csv), "chunk_rows": args.chunk_rows, "max_images": args.max_images,
+              "weights": os.path.abspath(args.weights), "runtime": args.runtime,
+              "normalize_location": args.normalize_location, "image_root": os.path.abspath(args.image_root),
+              "tabular_model": os.path.abspath(tabular_path) if tabular_path else None}
+    done = completed_parts(args.out, params, args.restart)
+
+    model, preprocess, tab_size = load_runtime_model(args.runtime, args.weights, args.export_dir,
+                                                     num_threads=args.threads)
+    tabular = TabularPriceModel.load_if_exists(tabular_path)
+    job = RepriceJob(model, preprocess, tab_size, args.image_root, tabular,
+                     max_images=args.max_images, batch_size=args.batch_size, decode_threads=args.decode_threads)
+
+    normalize = None
+    if args.normalize_location:
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "preprocessed"))
+        from location_normalizer import normalize_locations as normalize
+
+    stats = {"rows": 0, "convnext": 0, "tabular": 0, "failed": 0, "skipped_chunks": done}
+    if done:
+        print(f"이어서 실행: 완료된 청크 {done}개 건너뜀")
+
+    start = time.perf_counter()
+    reader = pd.read_csv(args.csv, usecols=INPUT_COLUMNS, chunksize=args.chunk_rows)
+    pending = None
+    try:
+        for index, chunk in enumerate(reader):
+            if index < done:
+                continue
+            if normalize is not None:
+                chunk["location"] = normalize(chunk["location"]).fillna(chunk["location"])
+
+            # 1) 이번 청크 사진 디코딩 시작 -> 2) 그동안 이전 청크 모델 실행 / 저장
+            current = (index, job.start(chunk))
+            if pending is not None:
+                _finish(job, pending, args.out, stats, start)
+            pending = current
+        if pending is not None:
+            _finish(job, pending, args.out, stats, start)
+    finally:
+        job.close()
+
+    stats["seconds"] = time.perf_counter() - start
+    stats["rows_per_sec"] = stats["rows"] / stats["seconds"] if stats["rows"] else 0.0
+    stats["peak_rss_mb"] = peak_rss_mb()
+    return stats
+
+def _finish(job: RepriceJob, pending, out_dir: str, stats: dict, start: float):
+    index, chunk_job = pending
+    result = job.finish(chunk_job)
+    write_part(result, out_dir, index)
+
+    stats["rows"] += len(result)
+    stats["convnext"] += int((result["tier"] == "convnext").sum())
+    stats["tabular"] += int((result["tier"] == "tabular").sum())
+    stats["failed"] += int(result["error"].notna().sum())
+    elapsed = time.perf_counter() - start
+    print(f"[청크 {index}] 누적 {stats['rows']} 행 | {stats['rows'] / elapsed:.1f} rows/s"
+          f" | 최대 메모리 {peak_rss_mb():.0f} MB")
+
+def summarize(out_dir: str, low: float = 0.7, high: float = 1.3):
+    """
+    등록가 / 예측가 비율로 저가(low 미만) / 고가(high 초과) 매물 수
+    """
+    df = pd.read_parquet(out_dir, columns=["ratio"])
+    ratio = df["ratio"].replace([np.inf, -np.inf], np.nan).dropna()
+    print(f"예측 {len(ratio)} 건 | 저가(등록/예측 < {low}) {(ratio < low).sum()} 건"
+          f" | 고가(> {high}) {(ratio > high).sum()} 건 | 비율 중앙값 {ratio.median():.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="크롤링 CSV 오프라인 가격 재산정")
+    parser.add_argument("--csv", default="../../csv/daangn_clean.csv")
+    parser.add_argument("--image-root", default="../../data/total_images")
+    parser.add_argument("--out", default="../../data/reprice/daangn", help="part-*.parquet 를 쓸 폴더")
+    parser.add_argument("--weights", default=WEIGHT_PATH)
+    parser.add_argument("--runtime", default="eager", choices=RUNTIMES)
+    parser.add_argument("--export-dir", default=EXPORT_DIR)
+    parser.add_argument("--tabular-model", default=TABULAR_MODEL_PATH, help="사진 없는 매물용 (없으면 error 만 기록)")
+    parser.add_argument("--chunk-rows", type=int, default=64, help="청크당 매물 수 (메모리 상한)")
+    parser.add_argument("--max-images", type=int, default=3, choices=range(1, MAX_LISTING_IMAGES + 1),
+                        metavar=f"1..{MAX_LISTING_IMAGES}", help="매물당 사진 수")
+    parser.add_argument("--batch-size", type=int, default=32, help="백본 배치 크기 (사진 장수)")
+    parser.add_argument("--decode-threads", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op 스레드 수")
+    parser.add_argument("--normalize-location", action="store_true", help="동 이름 location 을 시/도로 변환")
+    parser.add_argument("--restart", action="store_true", help="이전 결과를 지우고 처음부터")
+    args = parser.parse_args()
+
+    try:
+        stats = run(args)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"완료: {stats['rows']} 행 (ConvNeXt {stats['convnext']} / 탭 {stats['tabular']} / 실패 {stats['failed']})"
+          f" | 건너뛴 청크 {stats['skipped_chunks']} | {stats['seconds']:.1f}s | {stats['rows_per_sec']:.1f} rows/s"
+          f" | 최대 메모리 {stats['peak_rss_mb']:.0f} MB")
+    if os.path.exists(part_path(args.out, 0)):
+        summarize(args.out)
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,24 @@ import os
 import time
 from datetime import datetime
 
+import pandas as pd
 import streamlit as st
 import torch
-import torch.nn as nn
-from torchvision import models
-from PIL import Image
+
+from embedding_cache import EmbeddingCache
+from inference_engine import InferenceEngine
+from instrumentation import Metrics, ProfileCapture
+from model_runtime import EXPORT_DIR, load_runtime_model
+from price_model import (
+    MAX_LISTING_IMAGES, WEIGHT_PATH, condition_options, city_options, model_options, model_type_options,
+    build_tab_tensor, load_listing_image, predict_price_grid,
+)
+from tabular_model import CONDITION_ALIASES, TabularPriceModel
+
+# 추론 방식: eager / scripted / onnx / quantized (eager 외에는 model_runtime.py 로 먼저 내보내기)
+RUNTIME = os.environ.get("PRICE_RUNTIME", "eager")
+# PRICE_DEBUG=1 이면 화면 아래에 단계별 지연시간 / 프로파일러 패널 표시
+DEBUG = os.environ.get("PRICE_DEBUG") == "1"
 
 # 페이지 & 스타일
 st.set_page_config(page_title="유모차 중고거래 가격 추천", page_icon="🍼", layout="centered")
@@ -40,195 +53,136 @@ st.markdown(
 
 st.markdown("<h1>🍼 유모차 중고거래 가격 추천</h1>", unsafe_allow_html=True)
 
-# 옵션 (학습 때 사용한 순서와 동일해야 함)
-condition_options = ['새 상품', '거의 새 것', '사용감 있음']
-city_options = [
-    '서울특별시','부산광역시','경기도','인천광역시','대구광역시',
-    '대전광역시','광주광역시','세종특별자치시','울산광역시','제주특별자치도'
-]
-model_options = ['yoyo','explori','trailz','beat','crusi','scoot']
-model_type_options = ['절충형','디럭스']
-
 # 이미지 업로드
 st.markdown("<div>이미지를 업로드 해주세요</div>", unsafe_allow_html=True)
-uploaded = st.file_uploader("이미지를 업로드 해주세요", type=["jpg", "jpeg", "png"], label_visibility="collapsed")
-if uploaded is not None:
-    st.image(uploaded, use_column_width=True, caption="업로드한 이미지 미리보기")
+uploaded = st.file_uploader("이미지를 업로드 해주세요", type=["jpg", "jpeg", "png"], accept_multiple_files=True,
+                            label_visibility="collapsed")
+if len(uploaded) > MAX_LISTING_IMAGES:
+    st.warning(f"사진은 최대 {MAX_LISTING_IMAGES}장까지 사용합니다. 앞의 {MAX_LISTING_IMAGES}장만 반영됩니다.")
+    uploaded = uploaded[:MAX_LISTING_IMAGES]
+if uploaded:
+    st.image(uploaded, width=160 if len(uploaded) > 1 else None, use_column_width=len(uploaded) == 1,
+             caption=[f"업로드한 이미지 {i + 1}" for i in range(len(uploaded))])
 
 st.divider()
 
-# 입력 UI
+# 입력 UI (옵션 목록은 전처리 파일 어휘를 따르므로 기본값은 값으로 찾음)
+def default_index(options, value):
+    # 사용감은 어휘 표기가 다를 수 있음 (사용감 있음 <-> 사용감 많음)
+    for candidate in (value, CONDITION_ALIASES.get(value)):
+        if candidate in options:
+            return options.index(candidate)
+    return 0
+
 col = st.container()
 with col:
-    condition = st.selectbox("사용감", condition_options, index=2, key="condition")
-    city = st.selectbox('도시명', city_options, index=9, key="location")
-    model_name = st.selectbox('모델명', model_options, index=4, key="model")
-    model_type = st.selectbox('모델 등급', model_type_options, index=1, key="model_type")
+    condition = st.selectbox("사용감", condition_options, index=default_index(condition_options, "사용감 있음"), key="condition")
+    city = st.selectbox('도시명', city_options, index=default_index(city_options, "제주특별자치도"), key="location")
+    model_name = st.selectbox('모델명', model_options, index=default_index(model_options, "crusi"), key="model")
+    model_type = st.selectbox('모델 등급', model_type_options, index=default_index(model_type_options, "디럭스"), key="model_type")
+    show_grid = st.checkbox("사용감 x 도시 x 등급 전체 가격표 함께 보기", key="show_grid")
 
-# 모델 정의 (학습 구조와 동일)
-class CombinedModel(nn.Module):
-    """
-    ConvNeXt-Small image + csv -> 회귀 출력(가격)
-    """
-    def __init__(self, tabular_data_size, backbone, img_dim=64, tab_dim=256, tab_scale=1.0, img_scale=1.0):
-        super().__init__()
-        self.tab_scale = tab_scale
-        self.img_scale = img_scale
-        self.conv_part = backbone
-
-        with torch.no_grad():
-            dummy = torch.randn(1, 3, 224, 224)
-            out = self.conv_part(dummy)
-            conv_out_dim = out.shape[-1] if out.ndim == 2 else out.numel()
-
-        self.img_head = nn.Sequential(nn.Linear(conv_out_dim, img_dim), nn.ReLU())
-        self.tab_head = nn.Sequential(nn.Linear(tabular_data_size, tab_dim), nn.ReLU())
-
-        combined_features_size = img_dim + tab_dim
-        
-        self.reg_part = nn.Sequential(
-            nn.Linear(combined_features_size, 512), nn.ReLU(),
-            nn.Linear(512, 128), nn.ReLU(),
-            nn.Linear(128, 1)
-        )
+# 단계별 지연시간 / 카운터, torch.profiler 스위치 (세션 간 공유)
+@st.cache_resource(show_spinner=False)
+def get_instrumentation():
+    return Metrics(), ProfileCapture("profiles")
 
-    def forward(self, images, tabular_data):
-        image_features = self.conv_part(images) * self.img_scale
-        tab_features   = tabular_data * self.tab_scale
-        image_features = self.img_head(image_features)   
-        tab_features   = self.tab_head(tab_features)     
-        combined = torch.cat([image_features, tab_features], dim=1)
-        
-        return self.reg_part(combined)                   
-
-WEIGHT_PATH = "../training/model/convnext_best.pt"
-
-def _extract_state_dict(obj):
-    if isinstance(obj, dict):
-        if "state_dict" in obj and isinstance(obj["state_dict"], dict):
-            return obj["state_dict"]
-        
-        for k in ["model_state_dict", "net", "model"]:
-            if k in obj and isinstance(obj[k], dict):
-                return obj[k]
-            
-    return obj  
-
-def _strip_module_prefix(state):
-    if not isinstance(state, dict):
-        return state
-    
-    need_strip = any(k.startswith("module.") for k in state.keys())
-    
-    if not need_strip:
-        return state
-    
-    return {k.replace("module.", "", 1): v for k, v in state.items()}
+metrics, profiler = get_instrumentation()
 
+# 모델 & 추론 엔진 (세션 간 공유)
 @st.cache_resource(show_spinner=False)
-def load_model_and_preprocess(weight_path: str = WEIGHT_PATH):
-    # 1) 체크포인트 읽기
+def get_inference_engine(runtime: str = RUNTIME, weight_path: str = WEIGHT_PATH):
+    start = time.perf_counter()
     try:
-        raw = torch.load(weight_path, map_location="cpu")
-    except Exception as e:
-        st.error(f"가중치 파일을 불러올 수 없습니다: {e}")
+        model, preprocess, tab_expect = load_runtime_model(runtime, weight_path, EXPORT_DIR)
+    except (RuntimeError, ValueError) as e:
+        st.error(str(e))
         st.stop()
+    metrics.set_gauge("price_model_load_seconds", time.perf_counter() - start, model=runtime)
 
-    state = _extract_state_dict(raw)
-    state = _strip_module_prefix(state)
+    # 같은 사진으로 조건만 바꿔 보는 경우 백본을 건너뜀
+    engine = InferenceEngine(model, embedding_cache=EmbeddingCache(), metrics=metrics, profiler=profiler)
+    return engine, preprocess, tab_expect
 
-    # 2) 체크포인트에서 기대 차원 읽기
-    try:
-        img_dim_from_ckpt = state["img_head.0.weight"].shape[0]   
-        tab_size_from_ckpt = state["tab_head.0.weight"].shape[1]  
-    except Exception as e:
-        st.error(f"체크포인트에서 레이어 모양을 읽을 수 없습니다: {e}")
-        st.stop()
+engine, preprocess, TAB_EXPECT = get_inference_engine()
 
-    # 3) 백본 & 전처리
-    weights = models.ConvNeXt_Small_Weights.DEFAULT
-    backbone = models.convnext_small(weights=weights)
-    backbone.classifier[2] = nn.Identity()
-    backbone.eval()
-    preprocess = weights.transforms()
-
-    # 4) 모델 인스턴스 (체크포인트 모양에 맞추기)
-    model = CombinedModel(
-        tabular_data_size=tab_size_from_ckpt,
-        backbone=backbone,
-        img_dim=img_dim_from_ckpt,   # ex) 32
-        tab_dim=256
-    )
-    model.eval()
-
-    # 5) 가중치 로드(모양이 이미 맞아서 strict=True 가능)
+# 사진 없이 예측하는 탭 모델 (train_tabular.py 결과가 있을 때만)
+@st.cache_resource(show_spinner=False)
+def get_tabular_model():
+    start = time.perf_counter()
     try:
-        model.load_state_dict(state, strict=True)
-    except Exception as e:
-        st.error(f"가중치 로드 실패: {e}")
-        st.stop()
-
-    return model, preprocess, tab_size_from_ckpt
-
-model, preprocess, TAB_EXPECT = load_model_and_preprocess()
-
-
-# 탭 인코딩 (체크포인트 기대 크기에 맞춤)
-def build_tab_tensor(condition, city, model_name, model_type, expected_size: int):
-    c_idx = condition_options.index(condition)
-    s_idx = city_options.index(city)
-    m_idx = model_options.index(model_name)
-    t_idx = model_type_options.index(model_type)
-
-    if expected_size == 21:
-        vec = []
-        # condition (3)
-        for opt in condition_options: vec.append(1.0 if condition==opt else 0.0)
-        # city (10)
-        for opt in city_options: vec.append(1.0 if city==opt else 0.0)
-        # model (6)
-        for opt in model_options: vec.append(1.0 if model_name==opt else 0.0)
-        # model_type (2)
-        for opt in model_type_options: vec.append(1.0 if model_type==opt else 0.0)
-        return torch.tensor(vec, dtype=torch.float32).unsqueeze(0)
-
-    elif expected_size in (4, 5):
-        vec = [float(c_idx), float(s_idx), float(m_idx), float(t_idx)]
-        if expected_size == 5:
-            vec.append(1.0)  
-        return torch.tensor(vec, dtype=torch.float32).unsqueeze(0)
-
-    else:
-        st.error(f"지원되지 않는 탭 입력 크기입니다: {expected_size}")
-        st.stop()
-
-def save_uploaded_image(file):
+        model = TabularPriceModel.load_if_exists()
+    except RuntimeError as e:
+        st.warning(str(e))
+        return None
+    if model is not None:
+        metrics.set_gauge("price_model_load_seconds", time.perf_counter() - start, model="tabular")
+    return model
+
+tabular_model = get_tabular_model()
+
+def save_uploaded_image(file, idx: int = 0):
+    # 업로드 원본 바이트를 그대로 저장 (디코딩은 추론용 load_listing_image 에서 한 번만)
     os.makedirs("sent_data", exist_ok=True)
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    path = f"sent_data/{ts}.jpg"
-    Image.open(file).convert("RGB").save(path)
+    ext = os.path.splitext(file.name)[1].lower() or ".jpg"
+    path = f"sent_data/{ts}{ext}" if idx == 0 else f"sent_data/{ts}_{idx}{ext}"
+    with open(path, "wb") as f:
+        f.write(file.getvalue())
     return path
 
 # 버튼 & 추론
 clicked = st.button("가격 예측하기")
 
 if clicked:
-    if uploaded is None:
+    if not uploaded and tabular_model is None:
         st.warning("이미지를 먼저 업로드해 주세요.")
         st.stop()
 
-    with st.spinner("🔮 모델이 가격을 예측 중입니다..."):
-        saved_path = save_uploaded_image(uploaded)
-
-        image = Image.open(uploaded).convert("RGB")
-        img_tensor = preprocess(image).unsqueeze(0)  # (1,3,224,224)
-        tab_tensor = build_tab_tensor(condition, city, model_name, model_type, expected_size=TAB_EXPECT)
-
-        with torch.no_grad():
-            pred = model(img_tensor, tab_tensor).squeeze().item()
-
-        rec_price = max(0, round(float(pred)))
-        time.sleep(0.4)
+    request_start = time.perf_counter()
+    if not uploaded:
+        # 사진 없음 -> 탭 모델 (미리 계산한 조합별 가격 조회, 사진 가격표는 생략)
+        try:
+            with metrics.stage("tabular"):
+                rec_price = max(0, round(tabular_model.predict_row(
+                    {"condition": condition, "location": city, "model": model_name, "model_type": model_type,
+                     "is_completed": False})))
+        except ValueError as e:
+            st.error(str(e))
+            st.stop()
+        tier, saved_paths, show_grid = "tabular", [], False
+    else:
+        with st.spinner("🔮 모델이 가격을 예측 중입니다..."):
+            with metrics.stage("save"):
+                saved_paths = [save_uploaded_image(f, i) for i, f in enumerate(uploaded)]
+
+            # 사진마다 축소 디코딩 후 전처리해서 (N,3,224,224) 로 쌓기
+            with metrics.stage("decode"):
+                images = [load_listing_image(f) for f in uploaded]
+            with metrics.stage("preprocess"):
+                img_tensor = torch.stack([preprocess(image) for image in images])
+            try:
+                # 판매할 매물 가격이므로 is_completed=False (학습 입력 칼럼)
+                tab_tensor = build_tab_tensor(condition, city, model_name, model_type, expected_size=TAB_EXPECT,
+                                              is_completed=False)
+            except ValueError as e:
+                st.error(str(e))
+                st.stop()
+
+            if len(uploaded) > 1:
+                pred = engine.predict_listing(img_tensor, tab_tensor)
+            else:
+                pred = engine.predict(img_tensor, tab_tensor)
+            if show_grid:
+                with metrics.stage("grid"):
+                    grid = predict_price_grid(engine.model, img_tensor, model_name, TAB_EXPECT,
+                                              embedding_cache=engine.embedding_cache, is_completed=False)
+
+            rec_price = max(0, round(float(pred)))
+            tier = "convnext"
+
+    metrics.observe("total", time.perf_counter() - request_start)
+    metrics.inc("price_predictions_total", tier=tier)
 
     st.success("예측이 완료되었습니다 ✅")
     st.markdown("<div>", unsafe_allow_html=True)
@@ -240,7 +194,18 @@ if clicked:
     with c2:
         st.text_input("추천 가격", f"{rec_price:,} 원", key="predict_price", disabled=True, label_visibility="collapsed")
 
-    st.caption(f"이미지 저장 위치: {saved_path}")
+    if show_grid:
+        # 행: 도시, 열: (사용감, 등급)
+        grid_df = pd.DataFrame(grid).pivot_table(
+            index="city", columns=["condition", "model_type"], values="price", sort=False
+        )
+        st.markdown(f"**{model_name} 조건별 추천 가격 (원)**")
+        st.dataframe(grid_df.style.format("{:,.0f}").background_gradient(cmap="Oranges", axis=None),
+                     use_container_width=True)
+
+    st.caption("예측 모델: " + ("ConvNeXt (사진 + 입력값)" if tier == "convnext" else "LightGBM (입력값만, 사진 없음)"))
+    if saved_paths:
+        st.caption(f"이미지 저장 위치: {', '.join(saved_paths)}")
 else:
     st.markdown(
         """
@@ -250,4 +215,20 @@ else:
         </div>
         """,
         unsafe_allow_html=True
-    )
\ No newline at end of file
+    )
+
+# 디버그 패널: 단계별 지연시간, 카운터, 다음 N 건 torch.profiler 기록
+if DEBUG:
+    with st.expander("성능 정보 (디버그)"):
+        stages = pd.DataFrame(metrics.summary())
+        if len(stages):
+            st.dataframe(stages.set_index("stage").round(2), use_container_width=True)
+        # 히스토그램 버킷은 위 표로 대신하고 카운터 / 게이지만
+        st.code("\n".join(l for l in metrics.text().splitlines() if "price_stage_seconds" not in l), language="text")
+
+        n_profile = st.number_input("다음 N 건 프로파일", min_value=1, max_value=20, value=1, key="n_profile")
+        if st.button("torch.profiler 켜기", key="arm_profiler"):
+            profiler.arm(int(n_profile))
+            st.info(f"다음 {int(n_profile)} 건을 기록합니다 -> {profiler.out_dir}/ (chrome://tracing 으로 열기)")
+        if profiler.traces:
+            st.caption("저장된 trace: " + ", ".join(profiler.traces[-5:]))
@@ -0,0 +1,207 @@
+import json
+
+import numpy as np
+import pandas as pd
+import torch
+
+# 탭 입력 필드 순서 (csv 칼럼명 기준, 학습 때와 동일해야 함)
+TAB_FIELDS = ["condition", "location", "model", "model_type"]
+# train_convnext.py 로 학습한 체크포인트의 탭 입력 순서 (TRAIN_IDS, 라벨 코드 5개)
+TRAIN_IDS = ["is_completed", "location", "model", "model_type", "condition"]
+
+def _label_key(value) -> str:
+    # PreprocessPipeline 라벨 classes 와 같은 문자열 (결측은 "nan")
+    return "nan" if value is None or value != value else str(value)
+
+class TabularEncoder:
+    """
+    범주형 탭 입력 인코더 - 어휘(vocabulary)로 한 번 만들고 재사용
+    - layout="onehot" : 필드별 one-hot 을 이어붙임 (폭 = 어휘 크기 합)
+    - layout="index"  : 필드별 정수 인덱스 (bias=True 면 마지막에 1.0 추가)
+    - 어휘에 없는 값은 즉시 ValueError
+    - label_keys=True : 값을 라벨 classes 문자열로 바꾼 뒤 조회 (False -> "False", NaN -> "nan")
+    - scale           : index 레이아웃에서 필드별 (곱, 더할 값) - 코드 * 곱 + 더할 값
+    """
+    def __init__(self, vocabularies: dict, layout: str = "onehot", bias: bool = False, fields: list | None = None,
+                 label_keys: bool = False, scale: dict | None = None):
+        if layout not in ("onehot", "index"):
+            raise ValueError("layout must be 'onehot' or 'index'")
+        if scale and layout != "index":
+            raise ValueError("scale 은 index 레이아웃에서만 사용할 수 있습니다.")
+
+        self.fields = list(fields or vocabularies.keys())
+        self.vocabularies = {f: list(vocabularies[f]) for f in self.fields}
+        self.layout = layout
+        self.bias = bias
+        self.label_keys = label_keys
+        self._scale = None
+        if scale:
+            coef = [scale.get(f, (1.0, 0.0)) for f in self.fields]
+            self._scale = (torch.tensor([k for k, _ in coef], dtype=torch.float32),
+                           torch.tensor([c for _, c in coef], dtype=torch.float32))
+
+        # 값 -> 인덱스 (단일 행용) / pandas Index (배치용, C 레벨 조회)
+        self._index_maps = [{v: i for i, v in enumerate(self.vocabularies[f])} for f in self.fields]
+        self._pd_index = [pd.Index(self.vocabularies[f]) for f in self.fields]
+
+        sizes = [len(self.vocabularies[f]) for f in self.fields]
+        self._offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+
+        if layout == "onehot":
+            self.width = int(sum(sizes))
+        else:
+            self.width = len(self.fields) + (1 if bias else 0)
+
+        # 단일 행 fast path 용: (값 튜플) -> 인코딩된 (1, width) 텐서
+        self._row_cache = {}
+
+    @classmethod
+    def for_expected_size(cls, vocabularies: dict, expected_size: int, fields: list | None = None):
+        """
+        체크포인트의 tab_head 입력 폭으로 레이아웃을 추론합니다.
+        """
+        fields = list(fields or vocabularies.keys())
+        onehot_width = sum(len(vocabularies[f]) for f in fields)
+
+        if expected_size == onehot_width:
+            return cls(vocabularies, layout="onehot", fields=fields)
+        if expected_size == len(fields):
+            return cls(vocabularies, layout="index", fields=fields)
+        if expected_size == len(fields) + 1:
+            return cls(vocabularies, layout="index", bias=True, fields=fields)
+
+        raise ValueError(f"지원되지 않는 탭 입력 크기입니다: {expected_size}")
+
+    @classmethod
+    def from_artifacts(cls, artifacts: dict, expected_size: int | None = None, fields: list | None = None):
+        """
+        preprocess_pipeline 의 artifacts["label_encoders"] 또는
+        PreprocessPipeline 저장 파일의 "label_classes" 에서 어휘를 읽어 만듭니다.
+        """
+        if "label_classes" in artifacts:
+            classes = artifacts["label_classes"]
+        else:
+            classes = {f: le.classes_ for f, le in artifacts.get("label_encoders", {}).items()}
+        fields = list(fields or TAB_FIELDS)
+        missing = [f for f in fields if f not in classes]
+        if missing:
+            raise ValueError(f"artifacts 에 라벨 인코더가 없습니다: {missing}")
+
+        vocabularies = {f: list(classes[f]) for f in fields}
+        if expected_size is None:
+            return cls(vocabularies, fields=fields)
+        return cls.for_expected_size(vocabularies, expected_size, fields=fields)
+
+    @classmethod
+    def from_pipeline(cls, data: dict, fields: list | None = None):
+        """
+        PreprocessPipeline 저장 내용(preprocess.json)으로 transform_one(row, columns=fields) 과 같은 값을 만드는 인코더
+        (라벨 코드 -> 저장된 scale 계수, fields 순서대로). fields 기본값은 저장된 model_inputs, 없으면 TRAIN_IDS
+        원핫 / 숫자 입력 칼럼은 지원하지 않음 (ValueError)
+        """
+        fields = list(fields or data.get("model_inputs") or TRAIN_IDS)
+        classes = data.get("label_classes") or {}
+        missing = [f for f in fields if f not in classes]
+        if missing:
+            raise ValueError(f"전처리 파일에 라벨 classes 가 없는 입력 칼럼입니다: {missing}")
+        if data.get("onehot"):
+            raise ValueError("원핫 전처리 파일은 지원하지 않습니다.")
+
+        scale = {}
+        sc = data.get("scale")
+        if sc:
+            for i, c in enumerate(sc["cols"]):
+                if sc["method"] == "minmax":
+                    scale[c] = (sc["scale_"][i], sc["min_"][i])
+                else:
+                    # (x - center) / scale
+                    center = sc["mean_" if sc["method"] == "standard" else "center_"][i]
+                    scale[c] = (1.0 / sc["scale_"][i], -center / sc["scale_"][i])
+        return cls({f: classes[f] for f in fields}, layout="index", fields=fields, label_keys=True,
+                   scale={f: scale[f] for f in fields if f in scale})
+
+    @classmethod
+    def from_artifact_file(cls, path: str, expected_size: int | None = None, fields: list | None = None):
+        """
+        학습 때 저장한 preprocess.json (PreprocessPipeline.save) 에서 만듭니다.
+        """
+        with open(path, encoding="utf-8") as f:
+            return cls.from_artifacts(json.load(f), expected_size, fields=fields)
+
+    def _codes(self, j: int, values) -> np.ndarray:
+        if self.label_keys:
+            values = pd.Series(values, dtype=object)
+            values = values.where(values.notna(), "nan").astype(str)
+        codes = self._pd_index[j].get_indexer(pd.Index(values))
+        if (codes < 0).any():
+            bad = pd.Index(values)[codes < 0].unique().tolist()
+            raise ValueError(f"알 수 없는 {self.fields[j]} 값입니다: {bad}")
+        return codes
+
+    def encode_columns(self, columns, out: torch.Tensor | None = None) -> torch.Tensor:
+        """
+        필드 순서대로 값 배열을 받아 (N, width) float32 텐서로 인코딩합니다.
+        columns: [values_field0, values_field1, ...] 또는 {field: values}
+        out: 재사용할 (N, width) 버퍼 (없으면 새로 할당)
+        """
+        if isinstance(columns, dict):
+            columns = [columns[f] for f in self.fields]
+        if len(columns) != len(self.fields):
+            raise ValueError(f"필드 {len(self.fields)}개가 필요합니다: {self.fields}")
+
+        n = len(columns[0])
+        codes = np.empty((n, len(self.fields)), dtype=np.int64)
+        for j, values in enumerate(columns):
+            codes[:, j] = self._codes(j, values)
+
+        if out is None:
+            out = torch.empty(n, self.width, dtype=torch.float32)
+
+        if self.layout == "onehot":
+            out.zero_()
+            out.scatter_(1, torch.from_numpy(codes + self._offsets), 1.0)
+        else:
+            out[:, :len(self.fields)] = torch.from_numpy(codes)
+            if self._scale is not None:
+                out[:, :len(self.fields)].mul_(self._scale[0]).add_(self._scale[1])
+            if self.bias:
+                out[:, -1] = 1.0
+        return out
+
+    def encode_frame(self, df: pd.DataFrame, out: torch.Tensor | None = None) -> torch.Tensor:
+        return self.encode_columns([df[f].to_numpy() for f in self.fields], out=out)
+
+    def encode_one(self, *values) -> torch.Tensor:
+        """
+        단일 요청 fast path - (1, width) 텐서
+        조합별 결과를 캐시하므로 반환 텐서는 공유됩니다 (in-place 수정 금지).
+        """
+        if self.label_keys:
+            values = tuple(_label_key(v) for v in values)
+        row = self._row_cache.get(values)
+        if row is not None:
+            return row
+
+        if len(values) != len(self.fields):
+            raise ValueError(f"필드 {len(self.fields)}개가 필요합니다: {self.fields}")
+
+        try:
+            codes = [index[v] for index, v in zip(self._index_maps, values)]
+        except KeyError as e:
+            raise ValueError(f"알 수 없는 범주 값입니다: {e.args[0]}") from None
+
+        if self.layout == "onehot":
+            vec = [0.0] * self.width
+            for c, o in zip(codes, self._offsets):
+                vec[int(c + o)] = 1.0
+        else:
+            vec = [float(c) for c in codes]
+            if self._scale is not None:
+                vec = [x * float(k) + float(c) for x, k, c in zip(vec, *self._scale)]
+            if self.bias:
+                vec.append(1.0)
+
+        # 조합 수는 어휘 크기의 곱으로 유한
+        row = torch.tensor([vec], dtype=torch.float32)
+        self._row_cache[values] = row
+        return row
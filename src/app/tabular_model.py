@@ -0,0 +1,145 @@
+"""
+탭 전용 LightGBM 가격 모델 (사진 없는 요청 / 대량 재산정 / ConvNeXt 과부하 시 fallback 계층)
+
+입력 칼럼이 전부 범주형이라 가능한 조합 수가 유한합니다 (condition x is_completed x location x model x model_type).
+로드할 때 모든 조합을 booster.predict 한 번으로 계산해 두고,
+- predict_row     : 값 튜플 -> 가격 dict 조회 (요청 1건, 수 µs)
+- predict_columns : 칼럼별 코드 -> 혼합 기수 인덱스로 가격표 조회 (대량, 파이썬 루프 없음)
+                    errors="coerce" 면 모르는 값이 있는 행만 NaN (대량 재산정에서 배치 1번으로 처리)
+booster 는 조합 수가 MAX_TABLE_ROWS 를 넘을 때만 직접 호출합니다.
+
+모델 파일은 src/training/train_tabular.py 가 만듭니다.
+"""
+import itertools
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+TABULAR_MODEL_PATH = "../training/model/tabular_lgbm.json"
+
+# 미리 계산할 최대 조합 수
+MAX_TABLE_ROWS = 1_000_000
+
+# 크롤링 소스마다 사용감 표기가 달라서 (당근·앱 기본 선택지: 거의 새 것·있음 / 번개장터·학습 csv: 적음·많음) 양방향으로 맞춤
+CONDITION_ALIASES = {"사용감 적음": "거의 새 것", "사용감 많음": "사용감 있음",
+                     "거의 새 것": "사용감 적음", "사용감 있음": "사용감 많음"}
+
+def _key(value) -> str:
+    # 학습 때 라벨 classes 와 같은 문자열 (결측은 "nan")
+    return "nan" if value is None or value != value else str(value)
+
+class TabularPriceModel:
+    """
+    features    : 학습 입력 칼럼 순서
+    label_classes: 칼럼별 라벨 classes (PreprocessPipeline 저장 형식)
+    defaults    : 요청에 없으면 쓸 값 (예: is_completed=False, 판매 중 매물 기준)
+    """
+    def __init__(self, booster, features: list, label_classes: dict, defaults: dict | None = None,
+                 metrics: dict | None = None):
+        missing = [f for f in features if f not in label_classes]
+        if missing:
+            raise ValueError(f"라벨 classes 가 없는 입력 칼럼입니다: {missing}")
+
+        self.booster = booster
+        self.features = list(features)
+        self.label_classes = {f: list(label_classes[f]) for f in self.features}
+        self.defaults = {"is_completed": False, **(defaults or {})}
+        self.metrics = metrics or {}
+
+        self._pd_index = [pd.Index(self.label_classes[f]) for f in self.features]
+        sizes = [len(self.label_classes[f]) for f in self.features]
+        # 혼합 기수: 마지막 칼럼이 가장 빠르게 변함 (itertools.product 순서)
+        self._radix = np.concatenate([np.cumprod(sizes[::-1])[::-1][1:], [1]]).astype(np.int64)
+
+        self.table = None
+        self._row_table = None
+        if int(np.prod(sizes)) <= MAX_TABLE_ROWS:
+            codes = np.array(list(itertools.product(*[range(s) for s in sizes])), dtype=np.float64)
+            self.table = booster.predict(codes)
+            self._row_table = {
+                key: float(p) for key, p in zip(itertools.product(*self.label_classes.values()), self.table)
+            }
+
+    @classmethod
+    def load(cls, path: str = TABULAR_MODEL_PATH):
+        """
+        train_tabular.py 가 저장한 JSON 파일에서 만듭니다. 실패 시 RuntimeError.
+        """
+        try:
+            import lightgbm as lgb
+
+            with open(path, encoding="utf-8") as f:
+                artifact = json.load(f)
+            booster = lgb.Booster(model_str=artifact["booster"])
+            return cls(booster, artifact["features"], artifact["pipeline"]["label_classes"],
+                       defaults=artifact.get("defaults"), metrics=artifact.get("metrics"))
+        except Exception as e:
+            raise RuntimeError(f"탭 모델 로드 실패: {e}") from e
+
+    @classmethod
+    def load_if_exists(cls, path: str | None = TABULAR_MODEL_PATH):
+        return cls.load(path) if path and os.path.exists(path) else None
+
+    def _value(self, row: dict, field: str):
+        # 앱/서비스 요청은 location 대신 city 로 들어옴
+        if field in row:
+            return row[field]
+        if field == "location" and "city" in row:
+            return row["city"]
+        return self.defaults.get(field)
+
+    def predict_row(self, row: dict) -> float:
+        """
+        {"condition", "location"(또는 "city"), "model", "model_type", ["is_completed"]} -> 가격
+        학습 때 없던 값이면 ValueError
+        """
+        key = tuple(_key(self._value(row, f)) for f in self.features)
+        if self._row_table is not None:
+            price = self._row_table.get(key)
+            if price is not None:
+                return price
+        price = float(self.predict_columns({f: [v] for f, v in zip(self.features, key)})[0])
+        if self._row_table is not None:
+            # 별칭으로 찾은 조합도 다음부터는 바로 조회 (모르는 값은 위에서 ValueError)
+            self._row_table[key] = price
+        return price
+
+    def _aliased(self, field: str, values: pd.Series) -> pd.Series:
+        if field != "condition":
+            return values
+        known = values.isin(self.label_classes[field])
+        return values.where(known, values.map(CONDITION_ALIASES).fillna(values))
+
+    def predict_columns(self, columns: dict, errors: str = "raise") -> np.ndarray:
+        """
+        {칼럼: 값 배열} -> (N,) 가격 배열. 빠진 칼럼은 defaults 로 채웁니다.
+        errors: "raise" 면 학습 때 없던 값이 하나라도 있을 때 ValueError, "coerce" 면 그 행만 NaN
+        """
+        if errors not in ("raise", "coerce"):
+            raise ValueError(f"errors 는 'raise' 또는 'coerce' 입니다: {errors}")
+        n = len(next(iter(columns.values())))
+        codes = np.empty((n, len(self.features)), dtype=np.int64)
+        for j, f in enumerate(self.features):
+            values = columns.get(f, columns.get("city") if f == "location" else None)
+            if values is None:
+                values = [self.defaults.get(f)] * n
+            values = pd.Series(values, dtype=object)
+            values = self._aliased(f, values.where(values.notna(), "nan").astype(str))
+            codes[:, j] = self._pd_index[j].get_indexer(values)
+            if errors == "raise" and (codes[:, j] < 0).any():
+                bad = values[codes[:, j] < 0].unique().tolist()
+                raise ValueError(f"알 수 없는 {f} 값입니다: {bad}")
+
+        ok = (codes >= 0).all(axis=1)
+        out = np.full(n, np.nan)
+        if self.table is not None:
+            out[ok] = self.table[codes[ok] @ self._radix]
+        elif ok.any():
+            out[ok] = self.booster.predict(codes[ok].astype(np.float64))
+        return out
+
+    def predict_frame(self, df: pd.DataFrame, errors: str = "raise") -> np.ndarray:
+        return self.predict_columns({c: df[c].to_numpy() for c in df.columns
+                                     if c in self.features or c == "city"}, errors=errors)
@@ -0,0 +1,50 @@
+"""
+TabularEncoder.from_pipeline 과 PreprocessPipeline.transform_one 이 같은 순서/값을 내는지 확인
+
+실행 (src/app 에서)
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pandas as pd
+import torch
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(APP_DIR), "training"))
+from tab_encoder import TRAIN_IDS, TabularEncoder
+from tools.csv_preprocessed_util import TRAIN_CONFIG, PreprocessPipeline
+
+ROWS = [
+    {"condition": "새 상품", "is_completed": False, "location": "서울특별시", "model": "yoyo", "model_type": "디럭스"},
+    {"condition": "사용감 적음", "is_completed": True, "location": "부산광역시", "model": "crusi", "model_type": "절충형"},
+    {"condition": "사용감 많음", "is_completed": False, "location": "경기도", "model": "scoot", "model_type": "디럭스"},
+]
+
+def fit_pipeline():
+    df = pd.DataFrame([{**row, "id": str(i), "price": 100000 * (i + 1)} for i, row in enumerate(ROWS * 4)])
+    pipeline = PreprocessPipeline(TRAIN_CONFIG)
+    pipeline.fit_transform(df)
+    pipeline.model_inputs = list(TRAIN_IDS)
+    # 앱은 저장된 JSON 만 읽으므로 왕복한 뒤 비교
+    return PreprocessPipeline.from_dict(pipeline.to_dict())
+
+def test_encoder_matches_transform_one_in_model_input_order():
+    pipeline = fit_pipeline()
+    encoder = TabularEncoder.from_pipeline(pipeline.to_dict())
+
+    assert encoder.fields == TRAIN_IDS
+    assert pipeline.feature_cols != TRAIN_IDS
+    for row in ROWS:
+        expected = pipeline.transform_one(row)
+        assert torch.allclose(encoder.encode_one(*(row[f] for f in encoder.fields)), expected)
+        assert torch.allclose(pipeline.transform_one(row, columns=TRAIN_IDS), expected)
+
+    batch = encoder.encode_columns({f: [row[f] for row in ROWS] for f in encoder.fields})
+    assert torch.allclose(batch, torch.cat([pipeline.transform_one(row) for row in ROWS]))
+
+def test_transform_one_defaults_to_feature_cols_without_model_inputs():
+    pipeline = fit_pipeline()
+    pipeline.model_inputs = None
+    assert pipeline.transform_one(ROWS[0]).shape == (1, len(pipeline.feature_cols))
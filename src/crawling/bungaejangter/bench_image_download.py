@@ -0,0 +1,95 @@
+"""
+이미지 다운로드 처리량 비교: download_image 순차 호출 vs ImageDownloader (세션 풀 + 병렬)
+
+로컬 HTTP 서버가 이미지 서버 역할을 합니다 (응답 지연, 일정 비율 429, 일부 url 은 같은 내용).
+
+실행 예시 (src/crawling/bungaejangter 에서)
+    python bench_image_download.py --images 200 --latency-ms 30 --workers 16
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from image_util import ImageDownloader, download_image
+
+def make_server(n_images: int, size_kb: int, latency_ms: float, throttle: float, dup_ratio: float):
+    rng = random.Random(0)
+    n_unique = max(1, int(n_images * (1 - dup_ratio)))
+    bodies = [rng.randbytes(size_kb * 1024) for _ in range(n_unique)]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(latency_ms / 1000.0)
+            if random.random() < throttle:
+                self.send_response(429)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            idx = int(self.path.rsplit("/", 1)[-1].split(".")[0])
+            body = bodies[idx % n_unique]
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="이미지 다운로드 처리량 비교")
+    parser.add_argument("--images", type=int, default=200)
+    parser.add_argument("--size-kb", type=int, default=150)
+    parser.add_argument("--latency-ms", type=float, default=30)
+    parser.add_argument("--throttle", type=float, default=0.02, help="429 응답 비율")
+    parser.add_argument("--dup-ratio", type=float, default=0.1, help="내용이 겹치는 url 비율")
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    server = make_server(args.images, args.size_kb, args.latency_ms, args.throttle, args.dup_ratio)
+    base = f"http://127.0.0.1:{server.server_address[1]}/img"
+    urls = [f"{base}/{i}.jpg" for i in range(args.images)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 1) 기존 함수 순차 호출 (파일마다 print 는 숨김)
+        legacy_dir = os.path.join(tmp, "legacy")
+        os.makedirs(legacy_dir)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            ok = sum(download_image(url, os.path.join(legacy_dir, f"{i}.jpg")) for i, url in enumerate(urls))
+        legacy_sec = time.perf_counter() - start
+        print(f"download_image 순차  : {args.images / legacy_sec:8.1f} images/s (성공 {ok}/{args.images})")
+
+        # 2) ImageDownloader
+        new_dir = os.path.join(tmp, "new")
+        downloader = ImageDownloader(max_workers=args.workers, backoff=0.05,
+                                     index_path=os.path.join(new_dir, "image_hashes.json"))
+        pairs = [(url, os.path.join(new_dir, f"{i}.jpg")) for i, url in enumerate(urls)]
+        start = time.perf_counter()
+        stats = downloader.download_many(pairs)
+        new_sec = time.perf_counter() - start
+        print(f"ImageDownloader x{args.workers:<3}: {args.images / new_sec:8.1f} images/s "
+              f"(x{legacy_sec / new_sec:.1f}) {stats}")
+
+        # 3) 다시 실행 -> 전부 건너뜀
+        start = time.perf_counter()
+        stats = downloader.download_many(pairs)
+        print(f"재실행             : {time.perf_counter() - start:.3f}s {stats}")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+"""
+번개장터 병렬 크롤러
+
+- 드라이버(headless Chrome 또는 HTTP 세션) workers 개가 공유 큐의 검색 페이지 / 상품 링크를 나눠서 처리
+- 호스트별 요청 간격 제한 (rate)
+- 상품 1건마다 jsonl 에 바로 기록 + 링크 상태는 CrawlState(SQLite) 에 기록
+  -> 중단 후 다시 실행하면 이미 받은 링크는 건너뛰고, 내용이 그대로인 매물은 다시 저장하지 않음
+- 이미지는 별도 스레드 풀에서 ImageDownloader 로 다운로드 (세션 재사용, 재시도, 중복 제거)
+
+실행 예시 (src/crawling/bungaejangter 에서)
+    python crawl_engine.py --keywords "유모차 스토케" "유모차 부가부" --workers 4 --rate 2
+    python crawl_engine.py --backend http --base-url http://127.0.0.1:8000/   # 저장한 HTML 을 띄운 로컬 서버
+    python crawl_engine.py --only-failed                                      # 실패 / 이미지 미완료 링크만 다시
+    python -m pytest tests                                                    # tests/fixtures/site 로 http 백엔드 테스트
+"""
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
+
+import requests
+from bs4 import BeautifulSoup
+from selenium import webdriver
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+from file_util import ensure_dir
+from image_util import ImageDownloader
+from item_crawler import (
+    base_url, data_base_path, image_base_path, image_save_path,
+    get_item_data, get_keyword_item_count, get_keyword_page_count, get_page_keyword_item_list,
+)
+
+# daangn 과 같이 쓰는 상태 저장소 (src/crawling/crawl_state.py)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawl_state import CrawlState, content_hash
+
+SOURCE = "bungaejangter"
+
+class HostRateLimiter:
+    """
+    호스트별로 초당 rate 번까지만 요청하도록 간격을 맞춤 (여러 스레드 공유)
+    """
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str):
+        if not self.interval:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next.get(host, now))
+            self._next[host] = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+class RateLimitedDriver:
+    """
+    get() 전에 rate limiter 를 거치는 드라이버 래퍼 (나머지 속성은 그대로 전달)
+    """
+    def __init__(self, driver, limiter: HostRateLimiter):
+        self._driver = driver
+        self._limiter = limiter
+
+    def get(self, url):
+        self._limiter.wait(url)
+        return self._driver.get(url)
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+class SoupElement:
+    """
+    BeautifulSoup 태그를 Selenium WebElement 처럼 쓰기 위한 래퍼 (item_crawler 에서 쓰는 기능만)
+    """
+    def __init__(self, tag, page_url):
+        self._tag = tag
+        self._page_url = page_url
+
+    @property
+    def text(self):
+        return self._tag.get_text("\n", strip=True)
+
+    def get_attribute(self, name):
+        value = self._tag.get(name)
+        # Selenium 과 같이 href/src 는 절대 URL 로
+        if value is not None and name in ("href", "src"):
+            value = urljoin(self._page_url, value)
+        return value
+
+    def find_element(self, by, value):
+        tag = self._tag.select_one(value)
+        if tag is None:
+            raise NoSuchElementException(value)
+        return SoupElement(tag, self._page_url)
+
+    def find_elements(self, by, value):
+        return [SoupElement(tag, self._page_url) for tag in self._tag.select(value)]
+
+class SoupDriver:
+    """
+    requests 세션 + BeautifulSoup 으로 Selenium 드라이버 흉내 (JS 실행 없음)
+    렌더링된 HTML 을 저장해 두고 로컬 서버로 띄운 fixture 를 크롤링할 때 사용
+    """
+    # 받은 HTML 이 전부라 요소를 기다릴 필요 없음
+    wait_timeout = 0
+
+    def __init__(self, session: requests.Session | None = None, timeout: float = 10):
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.current_url = None
+        self._soup = BeautifulSoup("", "html.parser")
+
+    def get(self, url):
+        resp = self.session.get(url, timeout=self.timeout)
+        resp.raise_for_status()
+        self.current_url = resp.url
+        self._soup = BeautifulSoup(resp.text, "html.parser")
+
+    def find_element(self, by, value):
+        return SoupElement(self._soup, self.current_url).find_element(by, value)
+
+    def find_elements(self, by, value):
+        return SoupElement(self._soup, self.current_url).find_elements(by, value)
+
+    def quit(self):
+        self.session.close()
+
+def make_chrome_driver(headless: bool = True):
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--window-size=1280,2000")
+    return webdriver.Chrome(options=options)
+
+DRIVER_FACTORIES = {
+    "chrome": make_chrome_driver,
+    "http": SoupDriver,
+}
+
+class JsonlWriter:
+    """
+    결과를 한 줄씩 바로 기록 (flush 까지)
+    """
+    def __init__(self, path: str):
+        self.path = path
+        ensure_dir(os.path.dirname(path) or ".")
+        self._f = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self._f.write(line + "\n")
+            self._f.flush()
+
+    def close(self):
+        self._f.close()
+
+class CrawlEngine:
+    """
+    키워드 검색 결과 전체를 드라이버 workers 개로 병렬 크롤링합니다.
+    큐 작업: ("page", keyword, page) -> 상품 링크들을 ("item", listing) 으로 다시 큐에 넣음
+    recrawl_after(초) 를 주면 그보다 오래전에 받은 매물도 다시 확인 (내용이 같으면 저장 생략)
+    """
+    def __init__(self, make_driver=make_chrome_driver, workers: int = 4, rate: float = 2.0,
+                 out_path: str = data_base_path + "bungaejangter.jsonl", image_dir: str = image_base_path,
+                 download_workers: int = 8, base: str = base_url, state_path: str | None = None,
+                 recrawl_after: float | None = None):
+        self.make_driver = make_driver
+        self.workers = workers
+        self.limiter = HostRateLimiter(rate)
+        self.writer = JsonlWriter(out_path)
+        self.state = CrawlState(state_path or os.path.join(os.path.dirname(out_path) or ".", "crawl_state.db"))
+        self.recrawl_after = recrawl_after
+        self.image_dir = image_dir
+        ensure_dir(image_dir)
+        self.base = base
+        self.downloads = ThreadPoolExecutor(max_workers=download_workers) if download_workers > 0 else None
+        self.downloader = ImageDownloader(index_path=os.path.join(image_dir, "image_hashes.json"))
+
+        self._tasks = queue.Queue()
+        self._lock = threading.Lock()
+        # 링크별 남은 이미지 수 / 실패 여부 (모두 끝나면 images_ok 또는 failed 기록)
+        self._images_left = {}
+        self._images_failed = set()
+        self.stats = {"pages": 0, "items": 0, "unchanged": 0, "skipped": 0, "errors": 0,
+                      "images": 0, "image_errors": 0}
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.stats[name] += n
+
+    def _new_driver(self):
+        return RateLimitedDriver(self.make_driver(), self.limiter)
+
+    def _download(self, link, url, save_path):
+        # 다운로드 풀 Future 는 결과를 보지 않으므로 예외(디스크 오류 등)도 여기서 실패로 셈
+        try:
+            failed = self.downloader.download(url, save_path) == "failed"
+        except Exception as e:
+            print(f"이미지 실패 {url}: {e}")
+            failed = True
+        self._count("image_errors" if failed else "images")
+
+        with self._lock:
+            if failed:
+                self._images_failed.add(link)
+            self._images_left[link] -= 1
+            done = self._images_left[link] == 0
+            if done:
+                del self._images_left[link]
+                failed = link in self._images_failed
+                self._images_failed.discard(link)
+        if done:
+            if failed:
+                self.state.mark_failed(link, "image download", source=SOURCE)
+            else:
+                self.state.mark_images_ok(link)
+
+    def _handle(self, driver, task):
+        if task[0] == "page":
+            _, keyword, page = task
+            listings = get_page_keyword_item_list(driver, keyword, page, base=self.base)
+            self._count("pages")
+            for listing in listings:
+                if not listing["link"]:
+                    continue
+                self.state.discover(listing["link"], SOURCE, meta=listing)
+                if not self.state.needs_fetch(listing["link"], self.recrawl_after):
+                    self._count("skipped")
+                    continue
+                self._tasks.put(("item", listing))
+            return
+
+        listing = dict(task[1])
+        link = listing["link"]
+        if listing["is_completed"]:
+            link += "&original=1"
+
+        # 이미지는 받지 않고 URL 만 -> 다운로드 풀로 넘김
+        try:
+            listing.update(get_item_data(driver, link, image_dir=self.image_dir, download=self.downloads is None))
+        except Exception as e:
+            self.state.mark_failed(listing["link"], e, source=SOURCE)
+            raise
+
+        # 내용이 전과 같으면 이미 jsonl 에 기록한 매물 -> 확인 시각만 갱신
+        # (이미지가 끝나지 않았거나 실패했던 매물은 처음 기록한 id 폴더로 이미지만 다시)
+        digest = content_hash(listing["title"], listing["price"], listing["condition"], listing["detail"],
+                              listing["is_completed"], *listing["images_url"])
+        previous = self.state.get(listing["link"])
+        if previous and previous["content_hash"] == digest:
+            self.state.mark_fetched(listing["link"], SOURCE, content_hash=digest)
+            self._count("unchanged")
+            if previous["status"] != "images_ok" and previous["item_id"]:
+                self._submit_images(listing["link"], self._image_pairs(previous["item_id"], listing["images_url"]))
+            return
+
+        self.writer.write(listing)
+        self.state.mark_fetched(listing["link"], SOURCE, item_id=listing["id"], content_hash=digest)
+        self._count("items")
+        self._submit_images(listing["link"], self._image_pairs(listing["id"], listing["images_url"]))
+
+    def _image_pairs(self, item_id, urls):
+        return [(url, image_save_path(self.image_dir, item_id, index)) for index, url in enumerate(urls) if url]
+
+    def _submit_images(self, link, pairs):
+        if self.downloads is None:
+            if pairs:
+                self.state.mark_images_ok(link)
+            return
+        if not pairs:
+            return
+        with self._lock:
+            # 같은 링크 이미지를 받는 중이면 (다른 검색 페이지에도 나온 매물) 그쪽 결과를 따름
+            if link in self._images_left:
+                return
+            self._images_left[link] = len(pairs)
+        for url, save_path in pairs:
+            self.downloads.submit(self._download, link, url, save_path)
+
+    def _worker(self):
+        driver = self._new_driver()
+        try:
+            while True:
+                task = self._tasks.get()
+                if task is None:
+                    self._tasks.task_done()
+                    break
+                try:
+                    self._handle(driver, task)
+                except Exception as e:
+                    self._count("errors")
+                    print(f"실패 {task[:2]}: {e}")
+                finally:
+                    self._tasks.task_done()
+        finally:
+            driver.quit()
+
+    def crawl(self, keywords) -> dict:
+        # 1) 키워드별 페이지 수는 드라이버 1개로 먼저 확인
+        driver = self._new_driver()
+        try:
+            for keyword in keywords:
+                item_count = get_keyword_item_count(driver, keyword, base=self.base)
+                page_count = get_keyword_page_count(driver, keyword, item_count, base=self.base) if item_count else 0
+                print(f"키워드: {keyword} / 전체 아이템 수: {item_count} / 페이지수: {page_count}")
+                for page in range(1, page_count + 1):
+                    self._tasks.put(("page", keyword, page))
+        finally:
+            driver.quit()
+
+        return self._run_workers()
+
+    def crawl_failed(self) -> dict:
+        """
+        검색 페이지 없이 상태 저장소의 failed 링크와, 이미지를 받다가 중단된 fetched 링크만 다시 받습니다.
+        """
+        for link in self.state.pending(SOURCE, statuses=("fetched", "failed")):
+            meta = self.state.get(link)["meta"]
+            if meta:
+                self._tasks.put(("item", meta))
+        return self._run_workers()
+
+    def _run_workers(self) -> dict:
+        # 2) 페이지 -> 상품 작업을 워커들이 나눠서 처리 (상품 작업은 처리 중에 큐에 추가됨)
+        threads = [threading.Thread(target=self._worker, name=f"crawler-{i}", daemon=True)
+                   for i in range(self.workers)]
+        for t in threads:
+            t.start()
+        self._tasks.join()
+
+        for _ in threads:
+            self._tasks.put(None)
+        for t in threads:
+            t.join()
+
+        if self.downloads is not None:
+            self.downloads.shutdown(wait=True)
+            self.downloader.index.save()
+        self.writer.close()
+        return {**self.stats, "state": self.state.counts(SOURCE)}
+
+def main():
+    parser = argparse.ArgumentParser(description="번개장터 병렬 크롤러")
+    parser.add_argument("--keywords", nargs="+", default=["유모차 스토케"])
+    parser.add_argument("--backend", choices=list(DRIVER_FACTORIES), default="chrome")
+    parser.add_argument("--base-url", default=base_url)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=2.0, help="호스트별 초당 최대 요청 수 (0 이면 제한 없음)")
+    parser.add_argument("--out", default=data_base_path + "bungaejangter.jsonl")
+    parser.add_argument("--image-dir", default=image_base_path)
+    parser.add_argument("--download-workers", type=int, default=8)
+    parser.add_argument("--state", default=None, help="상태 DB 경로 (기본: --out 과 같은 폴더의 crawl_state.db)")
+    parser.add_argument("--recrawl-after-hours", type=float, default=None)
+    parser.add_argument("--only-failed", action="store_true", help="실패했거나 이미지가 끝나지 않은 링크만 다시 받기")
+    args = parser.parse_args()
+
+    recrawl_after = args.recrawl_after_hours * 3600 if args.recrawl_after_hours is not None else None
+    engine = CrawlEngine(DRIVER_FACTORIES[args.backend], workers=args.workers, rate=args.rate,
+                         out_path=args.out, image_dir=args.image_dir,
+                         download_workers=args.download_workers, base=args.base_url,
+                         state_path=args.state, recrawl_after=recrawl_after)
+    start = time.perf_counter()
+    stats = engine.crawl_failed() if args.only_failed else engine.crawl(args.keywords)
+    print(f"완료 {time.perf_counter() - start:.1f}s: {stats}")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,14 @@
+import hashlib
+import json
+import os
+import random
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
 
 def download_image(url: str, save_path: str, chunk_size: int = 1024) -> bool:
     """
@@ -26,4 +36,214 @@ def download_image(url: str, save_path: str, chunk_size: int = 1024) -> bool:
             return False
     except Exception as e:
         print(f"오류 발생: {e}")
-        return False
\ No newline at end of file
+        return False
+
+# 재시도할 HTTP 상태 (차단/과다 요청/서버 오류)
+RETRY_STATUS = {403, 429, 500, 502, 503, 504}
+
+def strong_etag(headers) -> str | None:
+    """
+    응답의 강한 ETag (약한 ETag(W/) 는 같은 바이트를 보장하지 않으므로 None)
+    ETag 는 그 url 리소스 안에서만 의미가 있으므로 다른 url 과 비교하지 않음
+    """
+    etag = headers.get("ETag")
+    if not etag or etag.startswith("W/"):
+        return None
+    return etag
+
+class HashIndex:
+    """
+    url -> 내용 sha1, sha1 -> 저장 경로, url -> 강한 ETag (JSON 파일)
+    - 이미 받은 url 은 네트워크 없이 건너뜀 (revalidate 면 If-None-Match 로 같은 url 만 확인)
+    - 다른 url 이라도 받은 내용이 같으면 기존 파일을 하드링크(안 되면 복사)
+    """
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self.urls = {}
+        self.files = {}
+        self.etags = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.urls = data.get("urls", {})
+            self.files = data.get("files", {})
+            # 예전 "etags"(호스트 + ETag 키) 는 url 별이 아니므로 버림
+            self.etags = data.get("url_etags", {})
+
+    def lookup_url(self, url: str) -> str | None:
+        with self._lock:
+            digest = self.urls.get(url)
+            path = self.files.get(digest) if digest else None
+        return path if path and os.path.exists(path) else None
+
+    def lookup_etag(self, url: str) -> str | None:
+        """
+        그 url 을 받을 때 기록한 강한 ETag
+        """
+        with self._lock:
+            return self.etags.get(url)
+
+    def add(self, url: str, digest: str, path: str, etag: str | None = None) -> str | None:
+        """
+        기록 후, 같은 내용의 다른 파일이 이미 있으면 그 경로를 반환
+        """
+        with self._lock:
+            self.urls[url] = digest
+            if etag is not None:
+                self.etags[url] = etag
+            else:
+                self.etags.pop(url, None)
+            existing = self.files.get(digest)
+            if existing and existing != path and os.path.exists(existing):
+                return existing
+            self.files[digest] = path
+        return None
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps({"urls": self.urls, "files": self.files, "url_etags": self.etags}, ensure_ascii=False)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+def _link_or_copy(src: str, dst: str):
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+class ImageDownloader:
+    """
+    여러 이미지를 한꺼번에 받는 다운로더
+    - 스레드마다 커넥션 풀을 가진 requests.Session 재사용
+    - 403/429/5xx/연결 오류는 지수 백오프(+Retry-After)로 재시도, 대기는 최대 max_backoff 초
+    - 임시 파일(.part)에 받은 뒤 os.replace 로 원자적 저장
+    - 이미 있는 파일 / 같은 url / 같은 내용은 다시 저장하지 않음
+    - revalidate=True 면 이미 받은 url 도 기록한 ETag 로 조건부 요청(If-None-Match)을 보내
+      304 면 기존 파일을 쓰고, 바뀌었으면 새로 받음 (기본은 네트워크 없이 기존 파일 사용)
+    download() 는 여러 스레드에서 동시에 호출해도 됩니다.
+    """
+    def __init__(self, max_workers: int = 16, retries: int = 3, backoff: float = 0.5, max_backoff: float = 30.0,
+                 chunk_size: int = 256 * 1024, timeout: float = 10, index_path: str | None = None,
+                 revalidate: bool = False):
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.revalidate = revalidate
+        self.index = HashIndex(index_path)
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._local.session = session
+        return session
+
+    def _wait(self, attempt: int, resp=None):
+        retry_after = resp.headers.get("Retry-After") if resp is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = float(retry_after)
+        else:
+            delay = self.backoff * (2 ** attempt) * (1 + random.random() * 0.1)
+        # 서버가 Retry-After 를 크게 줘도 다운로드 스레드를 오래 잡아두지 않음
+        time.sleep(min(delay, self.max_backoff))
+
+    def _fetch(self, url: str, save_path: str, if_none_match: str | None = None) -> tuple[str | None, str | None]:
+        """
+        save_path 에 원자적으로 저장하고 (sha1, 강한 ETag) 를 반환, 실패 시 (None, None)
+        if_none_match 를 주면 조건부 요청 -> 304(바뀌지 않음)도 (None, None) (save_path 는 만들지 않음)
+        """
+        tmp_path = save_path + ".part"
+        headers = {"If-None-Match": if_none_match} if if_none_match else None
+        for attempt in range(self.retries + 1):
+            resp = None
+            try:
+                resp = self._session().get(url, stream=True, timeout=self.timeout, headers=headers)
+                if resp.status_code == 200:
+                    etag = strong_etag(resp.headers)
+                    digest = hashlib.sha1()
+                    with open(tmp_path, "wb") as f:
+                        for chunk in resp.iter_content(self.chunk_size):
+                            if chunk:
+                                f.write(chunk)
+                                digest.update(chunk)
+                    os.replace(tmp_path, save_path)
+                    return digest.hexdigest(), etag
+                if resp.status_code not in RETRY_STATUS:
+                    return None, None
+            except requests.RequestException:
+                pass
+            except OSError:
+                # 디스크 쓰기 실패 등은 다시 받아도 같으므로 바로 실패 처리
+                return None, None
+            finally:
+                if resp is not None:
+                    resp.close()
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+            if attempt < self.retries:
+                self._wait(attempt, resp)
+        return None, None
+
+    def download(self, url: str, save_path: str) -> str:
+        """
+        반환: "exists" | "linked" | "downloaded" | "duplicate" | "failed"
+        ("duplicate" 는 받은 내용의 해시가 같아 기존 파일을 링크한 경우)
+        """
+        if os.path.exists(save_path):
+            return "exists"
+
+        os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+        known = self.index.lookup_url(url)
+        if known:
+            etag = self.index.lookup_etag(url) if self.revalidate else None
+            if etag is None:
+                _link_or_copy(known, save_path)
+                return "linked"
+            # 같은 url 에 조건부 요청: 304(또는 확인 실패)면 가지고 있는 파일 그대로
+            digest, etag = self._fetch(url, save_path, if_none_match=etag)
+            if digest is None:
+                _link_or_copy(known, save_path)
+                return "linked"
+        else:
+            digest, etag = self._fetch(url, save_path)
+            if digest is None:
+                return "failed"
+
+        existing = self.index.add(url, digest, save_path, etag=etag)
+        if existing:
+            _link_or_copy(existing, save_path)
+            return "duplicate"
+        return "downloaded"
+
+    def download_many(self, pairs) -> dict:
+        """
+        [(url, save_path), ...] 를 max_workers 개 스레드로 받고 상태별 개수를 반환합니다.
+        """
+        stats = {"exists": 0, "linked": 0, "downloaded": 0, "duplicate": 0, "failed": 0}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for status in pool.map(lambda p: self.download(*p), pairs):
+                stats[status] += 1
+        self.index.save()
+        return stats
+
+def download_images(pairs, max_workers: int = 16, retries: int = 3, index_path: str | None = None) -> dict:
+    """
+    download_image 의 일괄 버전: [(url, save_path), ...] -> {"downloaded": n, "failed": n, ...}
+    """
+    return ImageDownloader(max_workers=max_workers, retries=retries, index_path=index_path).download_many(pairs)
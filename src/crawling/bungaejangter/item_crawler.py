@@ -8,7 +8,7 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
 import uuid
 import re
 import time
@@ -21,25 +21,46 @@ base_url = "https://m.bunjang.co.kr/"
 data_base_path = "C:/Potenup/SecondHanded-Strollers-PredictedPrice/data/raw/"
 image_base_path = "C:/Potenup/SecondHanded-Strollers-PredictedPrice/data/raw/images/"
 
-def get_keyword_item_count(driver, keyword):
+# 고정 sleep 대신 필요한 요소가 뜰 때까지만 기다림 (최대 초)
+wait_timeout = 10
+
+def wait_for(driver, css, timeout=None) -> bool:
+    """
+    css 요소가 나타날 때까지 기다립니다. 시간 안에 안 나타나면 False
+    드라이버에 wait_timeout 속성이 있으면 그 값을 기본값으로 사용 (정적 HTML 드라이버는 0)
+    """
+    if timeout is None:
+        timeout = getattr(driver, "wait_timeout", wait_timeout)
+    try:
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, css)))
+        return True
+    except TimeoutException:
+        return False
+
+def image_save_path(image_dir, uid, index):
+    return f"{image_dir + uid}/bungaejangter_{uid}_{index}.jpg"
+
+def get_keyword_item_count(driver, keyword, base=base_url):
     # 키워드 URL로 이동
-    driver.get(base_url + f"search/products?q={keyword}")
-    time.sleep(3)
+    driver.get(base + f"search/products?q={keyword}")
 
     # 전체 상품 갯수
     item_count_css = "#root > div > div > div:nth-child(4) > div > div.sc-hRmvpr.jtLTMQ > div > div.sc-cZBZkQ.ckPglo > span.sc-ecaExY.jPSzJz"
+    if not wait_for(driver, item_count_css):
+        return 0
     item_count = driver.find_element(By.CSS_SELECTOR, item_count_css).text
     item_count = int(re.sub("[^0-9]", "", item_count))
 
     return item_count
 
-def get_keyword_page_count(driver, keyword, item_count):
+def get_keyword_page_count(driver, keyword, item_count, base=base_url):
     # 키워드 URL로 이동
-    driver.get(base_url + f"search/products?q={keyword}&page=1")
-    time.sleep(3)
+    driver.get(base + f"search/products?q={keyword}&page=1")
 
     # 첫번째 페이지 상품 리스트 만들기
     item_list_css = "#root > div > div > div:nth-child(4) > div > div.sc-gbzWSY.dLcZgG > div > div > a"
+    wait_for(driver, item_list_css)
     item_list = driver.find_elements(By.CSS_SELECTOR, item_list_css)
     
     # 첫페이지의 상품 갯수
@@ -51,13 +72,14 @@ def get_keyword_page_count(driver, keyword, item_count):
     
     return page_count
     
-def get_page_keyword_item_list(driver, keyword, page):
+def get_page_keyword_item_list(driver, keyword, page, base=base_url):
     # 키워드 URL로 이동
-    driver.get(base_url + f"search/products?q={keyword}&page={page}")
-    time.sleep(2)
+    driver.get(base + f"search/products?q={keyword}&page={page}")
 
     # 상품 리스트 만들기
     item_list_css = "#root > div > div > div:nth-child(4) > div > div.sc-gbzWSY.dLcZgG > div > div > a"
+    if not wait_for(driver, item_list_css):
+        return []
     item_list = driver.find_elements(By.CSS_SELECTOR, item_list_css)
 
     item_data = []
@@ -84,7 +106,7 @@ def get_page_keyword_item_list(driver, keyword, page):
 
         location_css = "#root > div > div > div:nth-child(4) > div > div.sc-gacfCG.QBPXM > div > div:nth-child(1) > a > div.sc-hjRWVT.epZFAs"
         try:
-            location = item.find_element(By.CSS_SELECTOR, location_css)
+            location = item.find_element(By.CSS_SELECTOR, location_css).text
         except NoSuchElementException:
             location = None
 
@@ -116,13 +138,17 @@ def get_page_keyword_item_list(driver, keyword, page):
         item_data.append(item)
     return item_data
 
-def get_item_data(driver, link):            
+def get_item_data(driver, link, image_dir=None, download=True):
+    """
+    상품 페이지 정보를 읽습니다.
+    download=False 면 이미지는 받지 않고 images_url 만 반환합니다 (crawl_engine 이 따로 병렬 다운로드)
+    """
+    image_dir = image_dir or image_base_path
     driver.get(link)
-    
-    time.sleep(2)
 
     # 타이틀
     title_css = "#root > div > div > div.Productsstyle__Wrapper-sc-13cvfvh-0.eVEUVR > div.Productsstyle__ProductPageTop-sc-13cvfvh-1.WbLlq > div > div.Productsstyle__ProductContentWrapper-sc-13cvfvh-8.jGywBa > div > div.Productsstyle__ProductSummaryWrapper-sc-13cvfvh-11.iDkwQU > div > div:nth-child(1) > div.ProductSummarystyle__Basic-sc-oxz0oy-2.ifrXrN > div.ProductSummarystyle__Name-sc-oxz0oy-3.dZBHcg"
+    wait_for(driver, title_css)
     try:
         title = driver.find_element(By.CSS_SELECTOR, title_css).text
         title = re.sub("[^0-9a-zA-Z가-힣\s]", " ", title)
@@ -164,12 +190,11 @@ def get_item_data(driver, link):
     
     print(f"이미지 수: {len(image_list)}")
 
-    ensure_dir(image_base_path + uid)
-    images_url = []
-    for index, image in enumerate(image_list):
-        url = image.get_attribute('src')
-        images_url.append(url)
-        download_image(url, f"{image_base_path + uid}/bungaejangter_{uid}_{index}.jpg")
+    images_url = [image.get_attribute('src') for image in image_list]
+    if download:
+        ensure_dir(image_dir + uid)
+        for index, url in enumerate(images_url):
+            download_image(url, image_save_path(image_dir, uid, index))
 
     # 모든 정보 
     return {
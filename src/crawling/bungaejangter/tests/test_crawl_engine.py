@@ -0,0 +1,119 @@
+"""
+CrawlEngine(http 백엔드) 를 로컬 http.server 에 띄운 fixture 페이지로 끝까지 돌려 보는 테스트
+
+fixtures/site
+    search/products : 검색 결과 (상품 2건 + 광고 1건)
+    products/101    : 이미지 2장 (101-0.jpg 는 102-0.jpg 와 내용이 같음)
+    products/102    : 판매 완료, 이미지 2장 중 1장은 없는 파일 (404)
+
+실행 (src/crawling/bungaejangter 에서)
+    python -m pytest tests
+"""
+import functools
+import json
+import os
+import shutil
+import sys
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawl_engine import SOURCE, CrawlEngine, SoupDriver
+
+SITE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "site")
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    def guess_type(self, path):
+        # 확장자 없는 파일은 저장한 HTML 페이지
+        return "text/html; charset=utf-8" if not os.path.splitext(path)[1] else super().guess_type(path)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def site():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(FixtureHandler, directory=SITE_DIR))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+def make_engine(base, tmp_path):
+    return CrawlEngine(SoupDriver, workers=2, rate=0, out_path=str(tmp_path / "out" / "bungaejangter.jsonl"),
+                       image_dir=str(tmp_path / "images") + "/", download_workers=2, base=base,
+                       state_path=str(tmp_path / "crawl_state.db"))
+
+def read_jsonl(tmp_path):
+    with open(tmp_path / "out" / "bungaejangter.jsonl", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_crawl_fixture_site(site, tmp_path):
+    engine = make_engine(site, tmp_path)
+    stats = engine.crawl(["유모차 스토케"])
+
+    assert stats["pages"] == 1
+    assert stats["items"] == 2
+    assert stats["errors"] == 0
+    assert stats["images"] == 3
+    assert stats["image_errors"] == 1
+
+    rows = {row["link"]: row for row in read_jsonl(tmp_path)}
+    assert len(rows) == 2
+    first = rows[site + "products/101?ref=search"]
+    assert first["title"] == "스토케 익스플로리 V6 블랙"
+    assert first["price"] == "650000"
+    assert first["condition"] == "사용감 적음"
+    assert first["is_completed"] is False
+    assert rows[site + "products/102?ref=search"]["is_completed"] is True
+
+    # 101 은 이미지 2장 모두, 102 는 한 장이 404 라 failed
+    state = engine.state
+    assert state.status(site + "products/101?ref=search") == "images_ok"
+    assert state.status(site + "products/102?ref=search") == "failed"
+    assert len(os.listdir(tmp_path / "images" / first["id"])) == 2
+
+def test_download_exception_marks_link_failed(site, tmp_path):
+    engine = make_engine(site, tmp_path)
+
+    def broken_download(url, save_path):
+        raise OSError("disk full")
+
+    engine.downloader.download = broken_download
+    stats = engine.crawl(["유모차 스토케"])
+
+    # 예외가 Future 에 묻히지 않고 실패로 세어져 링크가 fetched 에 남지 않음
+    assert stats["image_errors"] == 4
+    assert engine._images_left == {}
+    assert stats["state"]["failed"] == 2
+    assert stats["state"]["fetched"] == 0
+
+def test_resume_links_left_in_fetched(site, tmp_path):
+    engine = make_engine(site, tmp_path)
+    engine.crawl(["유모차 스토케"])
+    link = site + "products/101?ref=search"
+    item_id = engine.state.get(link)["item_id"]
+    failed_link = site + "products/102?ref=search"
+    failed_id = engine.state.get(failed_link)["item_id"]
+
+    # 상세 저장 후 이미지가 끝나기 전에 죽은 상태를 흉내냄
+    shutil.rmtree(tmp_path / "images" / item_id)
+    engine.state._execute("UPDATE links SET status = 'fetched' WHERE link = ?", (link,))
+
+    engine = make_engine(site, tmp_path)
+    stats = engine.crawl(["유모차 스토케"])
+
+    # 내용이 같으므로 jsonl 에 다시 쓰지 않고 이미지만 다시 받음 (이미지 실패로 failed 였던 102 도 같음)
+    assert stats["unchanged"] == 2
+    assert stats["items"] == 0
+    assert len(read_jsonl(tmp_path)) == 2
+    assert engine.state.status(link) == "images_ok"
+    assert len(os.listdir(tmp_path / "images" / item_id)) == 2
+
+    # 102 는 처음 기록한 id 폴더로 다시 받고 (여전히 404 라 failed), 새 id 폴더를 만들지 않음
+    assert engine.state.get(failed_link)["item_id"] == failed_id
+    assert engine.state.status(failed_link) == "failed"
+    folders = [d for d in os.listdir(tmp_path / "images") if os.path.isdir(tmp_path / "images" / d)]
+    assert sorted(folders) == sorted([item_id, failed_id])
@@ -0,0 +1,71 @@
+"""
+ImageDownloader 의 ETag 처리 테스트 (로컬 http.server)
+
+/a.jpg, /b.jpg 는 내용은 다르지만 ETag / 길이가 같음 (해시 없는 CDN ETag 흉내)
+
+실행 (src/crawling/bungaejangter 에서)
+    python -m pytest tests
+"""
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from image_util import ImageDownloader
+
+BODIES = {"/a.jpg": b"image-a", "/b.jpg": b"image-b"}
+ETAG = '"same-etag"'
+
+class EtagHandler(BaseHTTPRequestHandler):
+    requests_seen = []
+
+    def do_GET(self):
+        self.requests_seen.append((self.path, self.headers.get("If-None-Match")))
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = BODIES[self.path]
+        self.send_response(200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def server():
+    EtagHandler.requests_seen = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), EtagHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def test_same_etag_on_other_url_is_downloaded(server, tmp_path):
+    downloader = ImageDownloader(max_workers=1, retries=0, index_path=str(tmp_path / "index.json"))
+
+    assert downloader.download(server + "/a.jpg", str(tmp_path / "1" / "0.jpg")) == "downloaded"
+    # ETag / 길이가 같아도 다른 url 은 본문을 받아서 내용으로 판단
+    assert downloader.download(server + "/b.jpg", str(tmp_path / "2" / "0.jpg")) == "downloaded"
+    assert read(tmp_path / "1" / "0.jpg") == b"image-a"
+    assert read(tmp_path / "2" / "0.jpg") == b"image-b"
+
+def test_revalidate_uses_if_none_match_on_same_url(server, tmp_path):
+    downloader = ImageDownloader(max_workers=1, retries=0, revalidate=True)
+    downloader.download(server + "/a.jpg", str(tmp_path / "1" / "0.jpg"))
+
+    # 같은 url 을 다른 경로로 -> 조건부 요청, 304 라 기존 파일을 링크
+    assert downloader.download(server + "/a.jpg", str(tmp_path / "2" / "0.jpg")) == "linked"
+    assert read(tmp_path / "2" / "0.jpg") == b"image-a"
+    assert EtagHandler.requests_seen == [("/a.jpg", None), ("/a.jpg", ETAG)]
@@ -0,0 +1,214 @@
+"""
+크롤링 상태 저장소 (SQLite) - daangn / bungaejangter 공용
+
+detail_links.json / empty_links.json 처럼 리스트 전체를 다시 쓰지 않고 링크 1건씩 기록합니다.
+- status       : discovered -> fetched -> images_ok (실패 시 failed)
+- last_fetched : 마지막으로 상세 페이지를 읽은 시각 (unix time)
+- content_hash : 상세 내용 해시 (바뀌지 않은 매물은 다시 저장하지 않음)
+
+사용 예시
+    state = CrawlState("crawl_state.db")
+    state.discover(links, source="daangn")
+    for link in state.pending("daangn"):   # discovered + fetched + failed (images_ok 만 제외)
+        ...
+        state.mark_fetched(link, item_id=uid, content_hash=content_hash(title, price, detail))
+
+기존 JSON 가져오기 (src/crawling 에서)
+    python crawl_state.py --db crawl_state.db --source daangn --import-json daangn/detail_links.json
+    python crawl_state.py --db crawl_state.db --source daangn --import-json daangn/empty_links.json --as-failed
+"""
+import argparse
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+STATUSES = ("discovered", "fetched", "images_ok", "failed")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS links (
+    link         TEXT PRIMARY KEY,
+    source       TEXT NOT NULL,
+    status       TEXT NOT NULL DEFAULT 'discovered',
+    item_id      TEXT,
+    content_hash TEXT,
+    last_fetched REAL,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    error        TEXT,
+    meta         TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_links_source_status ON links (source, status);
+"""
+
+def content_hash(*fields) -> str:
+    """
+    상세 내용 필드들로 만든 sha1 (None 은 빈 문자열 취급)
+    """
+    h = hashlib.sha1()
+    for value in fields:
+        h.update(("" if value is None else str(value)).encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+class CrawlState:
+    """
+    링크 1건 = 1행. 조회는 PRIMARY KEY 로 바로 찾으므로 전체 파일을 읽지 않습니다.
+    여러 스레드에서 공유해도 됩니다 (연결 1개 + 락, WAL 모드).
+    """
+    def __init__(self, path: str = "crawl_state.db"):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    def _executemany(self, sql, rows):
+        # 한 트랜잭션으로 실행 (self._lock 을 잡은 상태에서 호출). 실패하면 롤백해서
+        # 공유 연결이 열린 트랜잭션에 남아 이후 BEGIN 이 모두 실패하지 않게 함
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany(sql, rows)
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def discover(self, links, source: str, meta: dict | None = None) -> int:
+        """
+        새 링크를 discovered 로 추가 (이미 있으면 그대로). 새로 추가된 수를 반환
+        meta(목록 페이지에서 읽은 정보)는 실패한 링크만 다시 받을 때 사용
+        """
+        if isinstance(links, str):
+            links = [links]
+        meta_json = json.dumps(meta, ensure_ascii=False, default=str) if meta is not None else None
+        with self._lock:
+            before = self._conn.total_changes
+            self._executemany("INSERT OR IGNORE INTO links (link, source, meta) VALUES (?, ?, ?)",
+                              [(link, source, meta_json) for link in links])
+            return self._conn.total_changes - before
+
+    def get(self, link: str) -> dict | None:
+        row = self._execute("SELECT * FROM links WHERE link = ?", (link,)).fetchone()
+        if row is None:
+            return None
+        record = dict(row)
+        record["meta"] = json.loads(record["meta"]) if record["meta"] else None
+        return record
+
+    def status(self, link: str) -> str | None:
+        row = self._execute("SELECT status FROM links WHERE link = ?", (link,)).fetchone()
+        return row[0] if row else None
+
+    def __contains__(self, link):
+        return self.status(link) is not None
+
+    def needs_fetch(self, link: str, max_age: float | None = None) -> bool:
+        """
+        아직 받지 않았거나 이미지까지 끝나지 않았거나(fetched) 실패했거나,
+        max_age 초보다 오래전에 받은 링크면 True
+        """
+        row = self._execute("SELECT status, last_fetched FROM links WHERE link = ?", (link,)).fetchone()
+        if row is None or row["status"] != "images_ok":
+            return True
+        return max_age is not None and (row["last_fetched"] or 0) < time.time() - max_age
+
+    def mark_fetched(self, link: str, source: str | None = None, item_id: str | None = None,
+                     content_hash: str | None = None) -> bool:
+        """
+        상세 페이지를 읽었음을 기록. 내용 해시가 이전과 다르면(또는 처음이면) True
+        item_id 가 None 이면 기존 값을 유지합니다.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT status, content_hash FROM links WHERE link = ?", (link,)).fetchone()
+            changed = row is None or content_hash is None or row["content_hash"] != content_hash
+            # 내용이 같고 이미지까지 받은 매물은 images_ok 유지
+            status = "images_ok" if row is not None and not changed and row["status"] == "images_ok" else "fetched"
+            self._conn.execute(
+                """
+                INSERT INTO links (link, source, status, item_id, content_hash, last_fetched, attempts)
+                VALUES (?, ?, ?, ?, ?, ?, 1)
+                ON CONFLICT(link) DO UPDATE SET
+                    status = excluded.status,
+                    item_id = COALESCE(excluded.item_id, links.item_id),
+                    content_hash = excluded.content_hash,
+                    last_fetched = excluded.last_fetched,
+                    attempts = links.attempts + 1,
+                    error = NULL
+                """,
+                (link, source or "", status, item_id, content_hash, time.time()),
+            )
+            return changed
+
+    def mark_images_ok(self, link: str):
+        self._execute("UPDATE links SET status = 'images_ok', error = NULL WHERE link = ?", (link,))
+
+    def mark_failed(self, link: str, error: str = "", source: str | None = None):
+        self._execute(
+            """
+            INSERT INTO links (link, source, status, attempts, error) VALUES (?, ?, 'failed', 1, ?)
+            ON CONFLICT(link) DO UPDATE SET status = 'failed', attempts = links.attempts + 1, error = excluded.error
+            """,
+            (link, source or "", str(error)[:500]),
+        )
+
+    def pending(self, source: str, statuses=("discovered", "fetched", "failed"), limit: int | None = None) -> list[str]:
+        placeholders = ",".join("?" * len(statuses))
+        sql = f"SELECT link FROM links WHERE source = ? AND status IN ({placeholders}) ORDER BY rowid"
+        params = [source, *statuses]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [row[0] for row in self._execute(sql, params).fetchall()]
+
+    def counts(self, source: str | None = None) -> dict:
+        if source is None:
+            rows = self._execute("SELECT status, COUNT(*) FROM links GROUP BY status").fetchall()
+        else:
+            rows = self._execute("SELECT status, COUNT(*) FROM links WHERE source = ? GROUP BY status",
+                                 (source,)).fetchall()
+        counts = dict.fromkeys(STATUSES, 0)
+        counts.update({status: n for status, n in rows})
+        return counts
+
+    def import_json(self, path: str, source: str, as_failed: bool = False) -> int:
+        """
+        detail_links.json / empty_links.json 같은 링크 리스트 JSON 을 가져옵니다.
+        as_failed=True 면 (이미지가 비었던 링크 목록) failed 로 표시
+        """
+        with open(path, encoding="utf-8") as f:
+            links = json.load(f)
+
+        added = self.discover(links, source)
+        if as_failed:
+            with self._lock:
+                self._executemany("UPDATE links SET status = 'failed', error = 'empty images' WHERE link = ?",
+                                  [(link,) for link in links])
+        return added
+
+    def close(self):
+        self._conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="크롤링 상태 저장소")
+    parser.add_argument("--db", default="crawl_state.db")
+    parser.add_argument("--source", required=True, help="daangn / bungaejangter")
+    parser.add_argument("--import-json", nargs="*", default=[])
+    parser.add_argument("--as-failed", action="store_true", help="가져온 링크를 failed 로 표시")
+    args = parser.parse_args()
+
+    state = CrawlState(args.db)
+    for path in args.import_json:
+        added = state.import_json(path, args.source, as_failed=args.as_failed)
+        print(f"{path}: {added}개 추가")
+    print(f"{args.source}: {state.counts(args.source)}")
+    state.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+크롤링한 location(동 이름, 주소 등) -> 모델 범주(10개 시/도) 정규화
+
+city_key_donglist_value.json (시/도 -> 동 목록)을 로드할 때 한 번만 뒤집어서
+동 -> 시/도 해시 인덱스를 만듭니다.
+- 정확히 일치       : "주안6동", "가양제1동"
+- 표기 통일         : 공백 제거, "가양제1동" <-> "가양1동"
+- 번호/본동 제거    : "주안6동" -> "주안동", "잠실본동" -> "잠실동"
+- 주소 문자열       : "인천 미추홀구 주안6동" -> 단어별로 시/도 이름, 동 이름 순서로 조회
+- 접두어 인덱스     : (min_prefix 지정 시만) 위에서 못 찾으면 동 이름 어간("주안", "검암")의 가장 긴 접두어로 조회
+                      짧은 접두어는 엉뚱한 시/도로 붙기 쉬우므로 기본은 꺼 두고, 매핑한 값은 prefix_matches() 로 확인
+같은 동 이름이 여러 시/도에 있으면 JSON 순서상 앞의 시/도를 씁니다 (노트북 find_city 와 동일).
+
+열 전체는 normalize() 한 번으로 처리합니다 (고유값만 조회, 결과는 캐시, 모르는 값은 None).
+
+사용 예시
+    from location_normalizer import normalize_locations
+    df["location"] = normalize_locations(df["location"])
+
+실행 예시 (src/preprocessed 에서)
+    python location_normalizer.py --csv ../../csv/bungaejangter_clean.csv
+    python location_normalizer.py --csv ../../csv/data_0829.csv --out ../../csv/data_0829_city.csv
+    python location_normalizer.py --csv ../../csv/bungaejangter_clean.csv --min-prefix 3   # 접두어 매핑 목록도 출력
+"""
+import argparse
+import functools
+import json
+import os
+import re
+
+import pandas as pd
+
+REGIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "city_key_donglist_value.json")
+
+# "가양제1동" -> "가양1동"
+_JE_NUMBER = re.compile(r"제(?=\d)")
+# "주안6동" / "종로1·2·3·4가동" / "잠실본동" -> 번호/본 부분
+_DONG_NUMBER = re.compile(r"(?:\d+(?:[·.,]\d+)*가?|본)(?=동$)")
+# 동/읍/면/리/가 + 앞의 번호 (어간 추출용)
+_SUFFIX = re.compile(r"(?:\d+(?:[·.,]\d+)*)?(?:가?동|읍|면|리|가)$")
+_NON_WORD = re.compile(r"[^0-9가-힣·]")
+
+def _canonical(value: str) -> str:
+    return _JE_NUMBER.sub("", _NON_WORD.sub("", value))
+
+def _base(value: str) -> str:
+    return _DONG_NUMBER.sub("", value)
+
+def _stem(value: str) -> str:
+    return _SUFFIX.sub("", _base(value))
+
+class LocationNormalizer:
+    """
+    regions   : {시/도: [동 이름, ...]} (기본: city_key_donglist_value.json)
+    min_prefix: 어간 접두어 조회의 최소 길이 (None 이면 접두어 조회 안 함)
+    """
+    def __init__(self, regions: dict | None = None, min_prefix: int | None = None):
+        if regions is None:
+            with open(REGIONS_PATH, "r", encoding="utf-8") as f:
+                regions = json.load(f)
+
+        self.cities = list(regions.keys())
+        self.min_prefix = min_prefix
+
+        # 시/도 이름과 줄임말 ("서울", "서울시", "경기", ...)
+        self._city_names = {}
+        for city in self.cities:
+            for alias in (city, city[:2], city[:2] + "시"):
+                self._city_names.setdefault(alias, city)
+
+        # 동 -> 시/도 (정확 / 표기 통일 / 번호 제거 / 어간)
+        self._exact, self._base, self._stems = {}, {}, {}
+        for city, dongs in regions.items():
+            for dong in dongs:
+                canonical = _canonical(dong)
+                self._exact.setdefault(dong, city)
+                self._exact.setdefault(canonical, city)
+                self._base.setdefault(_base(canonical), city)
+                stem = _stem(canonical)
+                if min_prefix is not None and len(stem) >= min_prefix:
+                    self._stems.setdefault(stem, city)
+        self._max_stem = max((len(s) for s in self._stems), default=0)
+
+        self._cache = {}
+        # 접두어 조회로 찾은 값 -> (접두어, 시/도)
+        self._prefix_matches = {}
+
+    def _lookup_token(self, token: str):
+        if token in self._city_names:
+            return self._city_names[token]
+        if token in self._exact:
+            return self._exact[token]
+        canonical = _canonical(token)
+        return self._exact.get(canonical) or self._base.get(_base(canonical))
+
+    def _lookup_prefix(self, token: str):
+        # 가장 긴 어간 접두어 (길이 제한이 있어 해시 조회 몇 번으로 끝남)
+        if self.min_prefix is None:
+            return None
+        stem = _stem(_canonical(token))
+        for n in range(min(len(stem), self._max_stem), self.min_prefix - 1, -1):
+            city = self._stems.get(stem[:n])
+            if city is not None:
+                return stem[:n], city
+        return None
+
+    def _resolve(self, value: str):
+        value = value.strip()
+        if not value:
+            return None
+
+        city = self._lookup_token(value)
+        if city is not None:
+            return city
+
+        tokens = value.split()
+        if len(tokens) > 1:
+            # 주소: 시/도 이름이 있으면 우선, 없으면 뒤 단어(동)부터
+            for token in tokens:
+                if token in self._city_names:
+                    return self._city_names[token]
+            for token in reversed(tokens):
+                city = self._lookup_token(token)
+                if city is not None:
+                    return city
+
+        for token in reversed(tokens):
+            match = self._lookup_prefix(token)
+            if match is not None:
+                self._prefix_matches[value] = match
+                return match[1]
+        return None
+
+    def resolve(self, value):
+        """
+        값 1개 -> 시/도 (모르면 None), 결과는 캐시
+        """
+        if value is None or (isinstance(value, float) and value != value):
+            return None
+        value = str(value)
+        try:
+            return self._cache[value]
+        except KeyError:
+            city = self._cache[value] = self._resolve(value)
+            return city
+
+    def normalize(self, values) -> pd.Series:
+        """
+        열 전체 정규화 - 고유값만 조회해서 다시 펼침 (Series 면 인덱스 유지)
+        """
+        series = values if isinstance(values, pd.Series) else pd.Series(values)
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        mapped = pd.Series([self.resolve(u) for u in uniques] + [None], dtype=object)
+        return pd.Series(mapped.to_numpy()[codes], index=series.index, name=series.name, dtype=object)
+
+    def unknown(self) -> list:
+        """
+        지금까지 조회한 값 중 시/도를 찾지 못한 값
+        """
+        return [value for value, city in self._cache.items() if city is None]
+
+    def prefix_matches(self) -> dict:
+        """
+        지금까지 접두어 조회로 시/도를 정한 값 -> (접두어, 시/도) (결과 검수용)
+        """
+        return dict(self._prefix_matches)
+
+@functools.lru_cache(maxsize=None)
+def get_normalizer(min_prefix: int | None = None) -> LocationNormalizer:
+    """
+    기본 JSON 으로 만든 공용 인스턴스 (min_prefix 별로 프로세스당 한 번)
+    """
+    return LocationNormalizer(min_prefix=min_prefix)
+
+def normalize_locations(values, min_prefix: int | None = None) -> pd.Series:
+    return get_normalizer(min_prefix).normalize(values)
+
+def main():
+    parser = argparse.ArgumentParser(description="location 칼럼 -> 시/도 정규화")
+    parser.add_argument("--csv", required=True)
+    parser.add_argument("--column", default="location")
+    parser.add_argument("--out", default=None, help="정규화한 CSV 저장 경로 (없으면 통계만 출력)")
+    parser.add_argument("--min-prefix", type=int, default=None,
+                        help="동 이름 어간 접두어 조회 최소 길이 (기본: 접두어 조회 안 함)")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv, encoding="utf-8-sig")
+    normalizer = get_normalizer(args.min_prefix)
+    before = df[args.column]
+    after = normalizer.normalize(before)
+
+    print(f"{args.column}: {before.notna().sum()}개 중 {after.notna().sum()}개 매칭")
+    print(after.value_counts(dropna=False).to_dict())
+    prefix = normalizer.prefix_matches()
+    if prefix:
+        print(f"접두어로 매핑한 값 {len(prefix)}개:")
+        for value, (stem, city) in prefix.items():
+            print(f"  {value} -> {city} (접두어 {stem})")
+    unknown = normalizer.unknown()
+    if unknown:
+        print(f"찾지 못한 값 {len(unknown)}개: {unknown[:20]}")
+
+    if args.out:
+        df[args.column] = after
+        df.to_csv(args.out, index=False, encoding="utf-8-sig")
+        print(f"saved {args.out}")
+
+if __name__ == "__main__":
+    main()
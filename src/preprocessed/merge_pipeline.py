@@ -0,0 +1,270 @@
+"""
+merge.ipynb 를 대체하는 증분 병합 파이프라인
+
+- 소스 CSV 를 청크 단위로 읽어 KEEP 스키마로 정리
+- 디스크 인덱스(SQLite)로 중복 제거
+    * id 가 이미 있고 내용도 같으면 건너뜀, 내용이 바뀌었으면 새 버전으로 추가
+    * 같은 id 의 여러 버전은 merge.ipynb 의 base.update() 처럼 합침
+      (뒤 버전의 값이 우선, 뒤 버전에 없는(NaN) 칼럼은 앞 버전 값 유지)
+    * 정규화한 (title, price, location) 이 다른 id 로 이미 있으면 재등록 매물로 보고 건너뜀
+- 새로 추가/변경된 행만 청크마다 Parquet 파트 파일(master/part-XXXXX.parquet)로 추가
+  (파트 파일을 쓴 뒤에 인덱스를 커밋하므로 중간에 멈춰도 행이 빠지지 않음)
+- 크기/수정시각이 그대로인 소스 파일은 읽지도 않음
+  -> 다시 실행할 때 비용은 전체 이력이 아니라 바뀐 파일/새 행 수에 비례
+
+실행 예시 (src/preprocessed 에서)
+    python merge_pipeline.py                                   # 기본 3개 소스 -> ../../data/master
+    python merge_pipeline.py --source ../../csv/data_0829.csv:snapshot --export ../../csv/data_merged.csv
+"""
+import argparse
+import glob
+import os
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+# 최종 스키마 (merge.ipynb 와 동일)
+KEEP = ["id", "title", "detail", "condition", "is_completed", "price", "location", "source", "model", "model_type"]
+
+# (파일 경로, source 라벨)
+DEFAULT_SOURCES = [
+    ("../../csv/daangn_clean.csv", "daangn"),
+    ("../../csv/bungaejangter_clean.csv", "bungae"),
+    ("../../csv/naver_clean.csv", "naver"),
+]
+MASTER_DIR = "../../data/master"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rows (
+    id       TEXT PRIMARY KEY,
+    row_hash INTEGER NOT NULL,
+    key_hash INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rows_key ON rows (key_hash);
+CREATE TABLE IF NOT EXISTS files (
+    path     TEXT PRIMARY KEY,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    merged   REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS parts (
+    seq INTEGER PRIMARY KEY
+);
+"""
+
+def prep_chunk(df: pd.DataFrame, source: str) -> pd.DataFrame:
+    """
+    merge.ipynb 의 prep() 을 청크에 적용 (컬럼 정리 + id 결측 제거 + KEEP 스키마)
+    """
+    df.columns = df.columns.str.lower().str.strip()
+    df = df.dropna(subset=["id"])
+    out = pd.DataFrame({"id": df["id"].astype("string")})
+    for c in KEEP[1:]:
+        if c == "source":
+            out[c] = source
+        elif c in df.columns:
+            out[c] = df[c]
+        else:
+            out[c] = np.nan
+
+    # 청크 안 중복 id 도 load_master 와 같은 방식으로 합침 (청크 크기에 따라 결과가 달라지지 않게)
+    # model / model_type 빈문자 채우기는 merge.ipynb 처럼 병합이 끝난 뒤 (load_master)
+    return coalesce(out)
+
+def coalesce(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    id 별로 칼럼마다 마지막 non-NaN 값을 취합니다 (merge.ipynb 의 base.update(d) 와 같은 규칙)
+    """
+    return df.groupby("id", sort=False, as_index=False).last()
+
+def _normalize_text(s: pd.Series) -> pd.Series:
+    return (s.fillna("").astype(str).str.lower()
+            .str.replace(r"[^0-9a-z가-힣]+", " ", regex=True).str.strip())
+
+def _hash(frame: pd.DataFrame) -> np.ndarray:
+    # SQLite INTEGER 에 맞게 uint64 -> int64
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy().view(np.int64)
+
+# is_completed 표기 통일 (bool / "True" / "1" / 1.0 ...)
+_BOOL_TEXT = {"true": "True", "1": "True", "1.0": "True", "false": "False", "0": "False", "0.0": "False"}
+
+def _canonical_text(s: pd.Series) -> pd.Series:
+    return s.astype(object).where(s.notna(), "nan").astype(str)
+
+def row_hashes(chunk: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (행 내용 해시 - source 라벨 제외, 정규화한 (title, price, location) 해시)
+    칼럼마다 표기를 통일한 뒤 해시하므로, 같은 파일의 다른 행 때문에 pandas 추론 dtype 이 바뀌어도
+    (예: price 빈 값 하나로 int -> float) 내용이 같은 행은 같은 해시
+    """
+    price = pd.to_numeric(chunk["price"], errors="coerce").round().astype("Int64").astype(str)
+    content = pd.DataFrame({c: _canonical_text(chunk[c]) for c in KEEP if c != "source"})
+    content["price"] = price
+    content["is_completed"] = content["is_completed"].str.strip().str.lower().map(_BOOL_TEXT).fillna("nan")
+    key = pd.DataFrame({
+        "title": _normalize_text(chunk["title"]),
+        "price": price,
+        "location": _normalize_text(chunk["location"]),
+    })
+    return _hash(content), _hash(key)
+
+class MergeIndex:
+    """
+    id -> (행 해시, 키 해시) 디스크 인덱스 + 처리한 소스 파일 목록
+    """
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def file_unchanged(self, path: str) -> bool:
+        st = os.stat(path)
+        row = self._conn.execute("SELECT size, mtime_ns FROM files WHERE path = ?",
+                                 (os.path.abspath(path),)).fetchone()
+        return row is not None and row == (st.st_size, st.st_mtime_ns)
+
+    def mark_file(self, path: str):
+        st = os.stat(path)
+        self._conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                           (os.path.abspath(path), st.st_size, st.st_mtime_ns, time.time()))
+
+    def filter_new(self, chunk: pd.DataFrame, write=None) -> tuple[pd.DataFrame, dict]:
+        """
+        청크에서 새 행 / 바뀐 행만 남기고 인덱스에 반영합니다.
+        write(kept, part_seq) 는 인덱스 커밋 전에 호출됩니다 (실패하면 롤백).
+        """
+        row_hash, key_hash = row_hashes(chunk)
+        conn = self._conn
+        conn.execute("BEGIN")
+        try:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS incoming (pos INTEGER, id TEXT, row_hash INTEGER, key_hash INTEGER)")
+            conn.execute("DELETE FROM incoming")
+            conn.executemany("INSERT INTO incoming VALUES (?, ?, ?, ?)",
+                             zip(range(len(chunk)), chunk["id"].tolist(), row_hash.tolist(), key_hash.tolist()))
+
+            # id 로 기존 행 찾기 (PRIMARY KEY 조인)
+            by_id = conn.execute("""
+                SELECT i.pos, r.row_hash FROM incoming i JOIN rows r ON r.id = i.id
+            """).fetchall()
+            # 같은 (title, price, location) 을 가진 다른 id
+            by_key = conn.execute("""
+                SELECT DISTINCT i.pos FROM incoming i JOIN rows r ON r.key_hash = i.key_hash AND r.id != i.id
+            """).fetchall()
+
+            known = {pos: h for pos, h in by_id}
+            dup_key = {pos for (pos,) in by_key}
+
+            keep = np.zeros(len(chunk), dtype=bool)
+            seen_keys = set()
+            stats = {"new": 0, "changed": 0, "unchanged": 0, "duplicate": 0}
+            for pos in range(len(chunk)):
+                if pos in known:
+                    if known[pos] == row_hash[pos]:
+                        stats["unchanged"] += 1
+                        continue
+                    stats["changed"] += 1
+                elif pos in dup_key or key_hash[pos] in seen_keys:
+                    stats["duplicate"] += 1
+                    continue
+                else:
+                    stats["new"] += 1
+                keep[pos] = True
+                seen_keys.add(key_hash[pos])
+
+            conn.executemany(
+                "INSERT OR REPLACE INTO rows (id, row_hash, key_hash) VALUES (?, ?, ?)",
+                [(chunk["id"].iat[p], int(row_hash[p]), int(key_hash[p])) for p in np.flatnonzero(keep)],
+            )
+            kept = chunk[keep]
+            if write is not None and len(kept):
+                write(kept, conn.execute("INSERT INTO parts DEFAULT VALUES").lastrowid)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return kept, stats
+
+    def close(self):
+        self._conn.close()
+
+def _write_part(kept: pd.DataFrame, master_dir: str, seq: int) -> str:
+    path = os.path.join(master_dir, f"part-{seq:05d}.parquet")
+    tmp_path = path + ".tmp"
+    out = kept.astype({c: "string" for c in KEEP if c != "price"})
+    out["price"] = pd.to_numeric(out["price"], errors="coerce")
+    out.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+def merge_sources(sources, master_dir: str = MASTER_DIR, chunksize: int = 50_000, force: bool = False) -> dict:
+    """
+    sources: [(csv 경로, source 라벨), ...] (뒤 소스가 같은 id 를 덮어씀)
+    새/변경 행만 master_dir 에 파트 파일로 추가하고 통계를 반환합니다.
+    """
+    os.makedirs(master_dir, exist_ok=True)
+    index = MergeIndex(os.path.join(master_dir, "merge_index.db"))
+    totals = {"files_skipped": 0, "rows_read": 0, "new": 0, "changed": 0, "unchanged": 0, "duplicate": 0,
+              "parts": []}
+
+    def write(kept, seq):
+        totals["parts"].append(_write_part(kept, master_dir, seq))
+
+    try:
+        for path, source in sources:
+            if not force and index.file_unchanged(path):
+                totals["files_skipped"] += 1
+                continue
+
+            # 모든 칼럼을 문자열로 읽어 청크/실행마다 dtype 추론이 달라지지 않게 함 (빈 칸은 NaN)
+            for chunk in pd.read_csv(path, chunksize=chunksize, encoding="utf-8-sig", dtype=str):
+                chunk = prep_chunk(chunk, source)
+                totals["rows_read"] += len(chunk)
+                _, stats = index.filter_new(chunk, write=write)
+                for k, v in stats.items():
+                    totals[k] += v
+            index.mark_file(path)
+    finally:
+        index.close()
+    return totals
+
+def load_master(master_dir: str = MASTER_DIR, columns=None) -> pd.DataFrame:
+    """
+    파트 파일을 순서대로 읽어 id 별로 버전을 합친 행을 반환합니다 (coalesce).
+    """
+    parts = sorted(glob.glob(os.path.join(master_dir, "part-*.parquet")))
+    if not parts:
+        return pd.DataFrame(columns=columns or KEEP)
+    df = pd.concat([pd.read_parquet(p, columns=columns) for p in parts], ignore_index=True)
+    if "id" in df.columns:
+        df = coalesce(df)
+    # model / model_type: 있으면 유지, 없거나 NaN만 빈문자 채움
+    for c in ["model", "model_type"]:
+        if c in df.columns:
+            df[c] = df[c].fillna("")
+    return df
+
+def main():
+    parser = argparse.ArgumentParser(description="소스 CSV 증분 병합 -> Parquet master")
+    parser.add_argument("--source", action="append", default=None,
+                        help="경로:라벨 (여러 번 지정 가능, 기본: daangn/bungae/naver clean csv)")
+    parser.add_argument("--master-dir", default=MASTER_DIR)
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    parser.add_argument("--force", action="store_true", help="바뀌지 않은 파일도 다시 읽기")
+    parser.add_argument("--export", default=None, help="병합 결과를 CSV 로도 저장 (merge.ipynb 출력과 같은 형식)")
+    args = parser.parse_args()
+
+    sources = [tuple(s.rsplit(":", 1)) for s in args.source] if args.source else DEFAULT_SOURCES
+
+    start = time.perf_counter()
+    stats = merge_sources(sources, args.master_dir, chunksize=args.chunksize, force=args.force)
+    print(f"병합 {time.perf_counter() - start:.2f}s: {stats}")
+
+    if args.export:
+        out = load_master(args.master_dir)[KEEP]
+        out.to_csv(args.export, index=False, encoding="utf-8-sig")
+        print(f"saved {args.export}: {len(out)} rows")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+merge_pipeline 증분 병합 테스트 (작은 CSV 를 tmp_path 에 만들어 병합)
+
+실행 (src/preprocessed 에서)
+    python -m pytest tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from merge_pipeline import load_master, merge_sources
+
+HEADER = "id,title,detail,condition,is_completed,price,location,model,model_type\n"
+ROWS = [
+    "1,t1,d1,사용감 적음,False,100,서울,crusi,디럭스\n",
+    "2,t2,d2,사용감 많음,True,200,부산,vista,디럭스\n",
+    "3,t3,d3,사용감 많음,False,300,대구,,\n",
+]
+
+def write_csv(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(HEADER + "".join(rows))
+    return str(path)
+
+def test_rerun_with_new_row_appends_only_new_row(tmp_path):
+    master = str(tmp_path / "master")
+    src = write_csv(tmp_path / "a.csv", ROWS)
+    merge_sources([(src, "daangn")], master)
+
+    # price 빈 행이 추가되면 pandas 가 price 를 float 로 읽지만 기존 3행은 그대로여야 함
+    write_csv(tmp_path / "a.csv", ROWS + ["4,t4,d4,,,,울산,,\n"])
+    stats = merge_sources([(src, "daangn")], master)
+
+    assert stats["new"] == 1
+    assert stats["changed"] == 0
+    assert stats["unchanged"] == 3
+    assert len(load_master(master)) == 4
+
+def test_later_source_keeps_earlier_values_for_missing_fields(tmp_path):
+    master = str(tmp_path / "master")
+    first = write_csv(tmp_path / "a.csv", ROWS)
+    # 뒤 소스에는 model / condition 칼럼이 없음 -> 앞 소스 값 유지, price 만 갱신
+    later = tmp_path / "b.csv"
+    later.write_text("ID,Title,Price,Location\n1,t1,120,서울\n", encoding="utf-8")
+    merge_sources([(first, "daangn"), (str(later), "bungae")], master)
+
+    row = load_master(master).set_index("id").loc["1"]
+    assert row["price"] == 120
+    assert row["model"] == "crusi"
+    assert row["condition"] == "사용감 적음"
+    assert row["source"] == "bungae"
@@ -0,0 +1,85 @@
+"""
+데이터셋 로드 비교: pd.read_csv(전체) vs Parquet / Arrow(memory-map) + 칼럼 선택
+
+각 방식은 새 프로세스에서 실행해 로드 시간과 최대 RSS 를 따로 잽니다.
+실행 예시 (src/training 에서)
+    python bench_dataset_io.py
+    python bench_dataset_io.py --csv ../../csv/data_0825.csv --repeat 5
+    python bench_dataset_io.py --scale 50     # 행을 50배로 복제해서 큰 데이터셋 흉내
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+_CHILD = r"""
+import json, sys, time
+import pandas as pd
+sys.path.insert(0, {cwd!r})
+from tools.dataset_io import TABULAR_COLUMNS, read_dataset
+
+def peak_rss_mb():
+    # ru_maxrss 는 exec 전 부모 프로세스 값을 물려받으므로 VmHWM 사용
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+
+base_rss = peak_rss_mb()
+
+start = time.perf_counter()
+if {kind!r} == "csv":
+    df = pd.read_csv({path!r})
+elif {kind!r} == "csv_usecols":
+    df = pd.read_csv({path!r}, usecols=TABULAR_COLUMNS)
+else:
+    df = read_dataset({path!r}, columns=None if {kind!r}.endswith("_all") else TABULAR_COLUMNS)
+sec = time.perf_counter() - start
+rss = peak_rss_mb()
+print(json.dumps({{"sec": sec, "rss_mb": rss, "delta_mb": rss - base_rss,
+                  "frame_mb": df.memory_usage(deep=True).sum() / 2**20, "rows": len(df), "cols": df.shape[1]}}))
+"""
+
+def run_child(kind: str, path: str) -> dict:
+    code = _CHILD.format(kind=kind, path=path, cwd=os.getcwd())
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    from tools.dataset_io import CSV_PATH, convert_csv
+
+    parser = argparse.ArgumentParser(description="데이터셋 로드 시간 / 최대 RSS 비교")
+    parser.add_argument("--csv", default=CSV_PATH)
+    parser.add_argument("--repeat", type=int, default=3, help="방식별 반복 횟수 (최소값 사용)")
+    parser.add_argument("--scale", type=int, default=1, help="행 복제 배수")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.scale > 1:
+            import pandas as pd
+            df = pd.read_csv(args.csv)
+            args.csv = os.path.join(tmp, "data.csv")
+            pd.concat([df] * args.scale, ignore_index=True).to_csv(args.csv, index=False)
+        parquet_path = convert_csv(args.csv, os.path.join(tmp, "data.parquet"))
+        arrow_path = convert_csv(args.csv, os.path.join(tmp, "data.arrow"))
+        print(f"CSV {os.path.getsize(args.csv) / 2**20:.2f} MB | parquet {os.path.getsize(parquet_path) / 2**20:.2f} MB"
+              f" | arrow {os.path.getsize(arrow_path) / 2**20:.2f} MB")
+
+        cases = [
+            ("read_csv (전체)", "csv", args.csv),
+            ("read_csv (usecols)", "csv_usecols", args.csv),
+            ("parquet (전체)", "parquet_all", parquet_path),
+            ("parquet (탭 칼럼)", "parquet", parquet_path),
+            ("arrow mmap (탭 칼럼)", "arrow", arrow_path),
+        ]
+        print(f"{'방식':<22}{'로드 ms':>10}{'최대 RSS MB':>14}{'로드 중 RSS 증가 MB':>20}{'df MB':>10}")
+        for name, kind, path in cases:
+            runs = [run_child(kind, path) for _ in range(args.repeat)]
+            best = min(runs, key=lambda r: r["sec"])
+            print(f"{name:<22}{best['sec'] * 1000:10.1f}{best['rss_mb']:14.1f}{best['delta_mb']:20.1f}"
+                  f"{best['frame_mb']:10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Dataset 처리량 비교: 노트북 CombinedDataset(매 샘플 listdir + PIL 디코딩) vs CachedImageDataset(uint8 memmap)
+
+실행 예시 (src/training 에서)
+    python bench_image_dataset.py --image-root ../../data/total_images
+    python bench_image_dataset.py --synthetic 512     # 실제 이미지가 없을 때 임의 JPEG 로 측정
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+from PIL import Image
+from torch.utils.data import DataLoader
+
+from tools.csv_preprocessed_util import preprocess_pipeline
+from tools.dataset_io import load_dataset
+from tools.image_dataset import CachedImageDataset, build_image_cache
+from tools.image_preprocessed_util import get_image_transforms
+
+TRAIN_IDS = ['is_completed', 'location', 'model', 'model_type', 'condition']
+
+class LegacyCombinedDataset(torch.utils.data.Dataset):
+    """
+    학습 노트북의 CombinedDataset (image_base_path 만 인자로 받도록 수정)
+    """
+    def __init__(self, df, image_ids, target_id, train_ids, image_base_path, image_transform=None):
+        self.df = df
+        self.transform = image_transform
+        self.image_ids = image_ids
+        self.labels = df[target_id]
+        self.image_base_path = image_base_path
+        self.tabular_data = self.df[train_ids]
+
+    def __len__(self):
+        return len(self.df)
+
+    def __getitem__(self, idx):
+        image_id = self.image_ids[idx]
+        uuid_path = os.path.join(self.image_base_path, image_id)
+        filename = os.listdir(uuid_path)[0]
+        image_path = os.path.join(uuid_path, filename)
+        image = Image.open(image_path).convert('RGB')
+
+        image_tensor = self.transform(image)
+        tabular_tensor = torch.tensor(self.tabular_data.iloc[idx].values, dtype=torch.float32)
+        label = torch.tensor(self.labels[idx], dtype=torch.float32)
+
+        return image_tensor, tabular_tensor, label
+
+def make_synthetic(n: int, root: str) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    rows = []
+    for i in range(n):
+        uid = f"synthetic-{i:05d}"
+        os.makedirs(os.path.join(root, uid), exist_ok=True)
+        h, w = rng.integers(600, 1200, size=2)
+        Image.fromarray(rng.integers(0, 255, (h, w, 3), dtype=np.uint8)).save(
+            os.path.join(root, uid, f"daangn_{uid}_1.jpg"), quality=85)
+        rows.append({"id": uid, "condition": "새 상품", "is_completed": True, "location": "서울특별시",
+                     "model": "yoyo", "model_type": "디럭스", "price": float(rng.integers(1, 100) * 10000)})
+    return pd.DataFrame(rows)
+
+def samples_per_sec(dataset, num_workers: int, batch_size: int = 32) -> float:
+    loader = DataLoader(dataset, batch_size=batch_size, shuffle=True, num_workers=num_workers)
+    start = time.perf_counter()
+    n = 0
+    for images, _, _ in loader:
+        n += len(images)
+    return n / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Dataset 처리량 비교")
+    parser.add_argument("--csv", default="../../csv/data_regression_clean.csv")
+    parser.add_argument("--image-root", default="../../data/total_images")
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument("--synthetic", type=int, default=0, help="N 개 임의 이미지로 측정")
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 4])
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    if args.synthetic:
+        image_root = os.path.join(tmp.name, "images")
+        df = make_synthetic(args.synthetic, image_root)
+    else:
+        image_root = args.image_root
+        df = load_dataset(args.csv, columns=["id"] + TRAIN_IDS + ["price"])
+        df = df[df["id"].map(lambda i: os.path.isdir(os.path.join(image_root, str(i))))]
+
+    config = {
+        "select_cols": ["id"] + TRAIN_IDS + ["price"],
+        "label_encode": {"cols": TRAIN_IDS},
+    }
+    df, _ = preprocess_pipeline(df.dropna(subset=["price"]), mode="fit", config=config)
+
+    cache_dir = args.cache_dir or os.path.join(tmp.name, "cache")
+    start = time.perf_counter()
+    build_image_cache(df["id"].tolist(), image_root, cache_dir, num_workers=max(args.workers))
+    print(f"캐시 생성: {len(df)}장, {time.perf_counter() - start:.1f}s (1회)")
+
+    legacy = LegacyCombinedDataset(df, df["id"].tolist(), "price", TRAIN_IDS, image_root, get_image_transforms())
+    cached = CachedImageDataset(cache_dir, df, "price", TRAIN_IDS)
+
+    for workers in args.workers:
+        legacy_sps = samples_per_sec(legacy, workers)
+        cached_sps = samples_per_sec(cached, workers)
+        print(f"num_workers={workers}: CombinedDataset {legacy_sps:8.1f} samples/s | "
+              f"CachedImageDataset {cached_sps:8.1f} samples/s (x{cached_sps / legacy_sps:.1f})")
+
+if __name__ == "__main__":
+    main()
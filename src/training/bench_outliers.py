@@ -0,0 +1,74 @@
+"""
+이상치 제거 비교: remove_outliers_iqr / remove_outliers_zscore vs OutlierFilter (벡터화, 마스크 1개)
+
+csv/data_*.csv 스냅샷을 모두 이어붙여 사용합니다 (price, log_price 두 칼럼).
+실행 예시 (src/training 에서)
+    python bench_outliers.py
+    python bench_outliers.py --scale 20 --repeat 5     # 행을 20배로 복제
+"""
+import argparse
+import glob
+import time
+
+import numpy as np
+import pandas as pd
+
+from tools.csv_preprocessed_util import OutlierFilter, remove_outliers_iqr, remove_outliers_zscore
+
+COLS = ["price", "log_price"]
+GROUP_BY = ["model", "model_type"]
+
+def load_snapshots(pattern: str) -> pd.DataFrame:
+    frames = []
+    for path in sorted(glob.glob(pattern)):
+        df = pd.read_csv(path, encoding="utf-8-sig")
+        df = df.loc[:, ~df.columns.str.startswith("Unnamed")]
+        frames.append(df[["id", "price", "model", "model_type"]])
+    df = pd.concat(frames, ignore_index=True)
+    df["price"] = pd.to_numeric(df["price"], errors="coerce")
+    df["log_price"] = np.log1p(df["price"].clip(lower=0))
+    return df
+
+def best_of(fn, repeat: int):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), out
+
+def main():
+    parser = argparse.ArgumentParser(description="이상치 제거 속도 비교")
+    parser.add_argument("--pattern", default="../../csv/data_*.csv")
+    parser.add_argument("--scale", type=int, default=1, help="행 복제 배수")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    df = load_snapshots(args.pattern)
+    if args.scale > 1:
+        df = pd.concat([df] * args.scale, ignore_index=True)
+    print(f"{len(df)} rows, cols={COLS}")
+
+    iqr = OutlierFilter(COLS, method="iqr")
+    zscore = OutlierFilter(COLS, method="zscore")
+    grouped = OutlierFilter(["price"], method="iqr", group_by=GROUP_BY)
+    grouped.fit(df)
+    fitted = OutlierFilter.from_dict(grouped.to_dict())
+
+    cases = [
+        ("remove_outliers_iqr", lambda: remove_outliers_iqr(df, COLS)),
+        ("OutlierFilter iqr (fit+filter)", lambda: iqr.fit_filter(df)),
+        ("remove_outliers_zscore", lambda: remove_outliers_zscore(df, COLS)),
+        ("OutlierFilter zscore (fit+filter)", lambda: zscore.fit_filter(df)),
+        (f"OutlierFilter iqr by {'/'.join(GROUP_BY)} (fit+filter)", lambda: grouped.fit_filter(df)),
+        ("  저장된 경계로 filter (재학습 없음)", lambda: fitted.filter(df)),
+    ]
+    print(f"{'방식':<50}{'ms':>10}{'남은 행':>10}")
+    for name, fn in cases:
+        sec, out = best_of(fn, args.repeat)
+        print(f"{name:<50}{sec * 1000:10.2f}{len(out):10d}")
+
+    print(f"그룹별 경계 {len(grouped.group_keys)}개 (행 {grouped.min_group_size}개 미만 그룹은 전체 경계)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+학습 처리량 비교 (train_convnext.py 옵션별 samples/sec, 스텝 시간, 데이터 대기 비율)
+
+같은 seed / 같은 임의 데이터 / 에폭당 같은 스텝 수로 각 설정을 새 프로세스에서 실행합니다.
+첫 에폭은 워밍업(compile 포함)으로 보고 마지막 에폭 값을 비교합니다.
+
+실행 예시 (src/training 에서)
+    python bench_training.py
+    python bench_training.py --backbone convnext_small --synthetic 256 --max-steps 8 --threads 8
+    python bench_training.py --configs base channels_last bf16 channels_last+bf16 frozen compile
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# 설정 이름 -> train_convnext.py 추가 인자
+CONFIGS = {
+    "base": [],
+    "channels_last": ["--channels-last"],
+    "bf16": ["--bf16"],
+    "channels_last+bf16": ["--channels-last", "--bf16"],
+    "frozen": ["--freeze-epochs", "100"],
+    "compile": ["--compile"],
+}
+
+_CHILD = r"""
+import json, sys
+sys.path.insert(0, {cwd!r})
+from train_convnext import build_parser, train
+result = train(build_parser().parse_args({argv!r}))
+print("RESULT " + json.dumps(result["history"][-1]))
+"""
+
+def run_config(name: str, base_argv: list, tmp: str) -> dict:
+    out_dir = os.path.join(tmp, name)
+    argv = base_argv + CONFIGS[name] + ["--out", os.path.join(out_dir, "convnext_best.pt"),
+                                         "--log-dir", os.path.join(out_dir, "runs")]
+    code = _CHILD.format(cwd=os.getcwd(), argv=argv)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if out.returncode != 0:
+        return {"error": out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "failed"}
+    line = [l for l in out.stdout.splitlines() if l.startswith("RESULT ")][-1]
+    return json.loads(line[len("RESULT "):])
+
+def main():
+    parser = argparse.ArgumentParser(description="학습 처리량 비교")
+    parser.add_argument("--configs", nargs="+", default=["base", "channels_last", "bf16", "channels_last+bf16", "frozen"],
+                        choices=list(CONFIGS))
+    parser.add_argument("--backbone", default="convnext_tiny")
+    parser.add_argument("--synthetic", type=int, default=128)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--max-steps", type=int, default=4)
+    parser.add_argument("--epochs", type=int, default=2, help="마지막 에폭 값을 사용 (첫 에폭은 워밍업)")
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--num-workers", type=int, default=0)
+    args = parser.parse_args()
+
+    base_argv = ["--synthetic", str(args.synthetic), "--backbone", args.backbone, "--no-pretrained",
+                 "--batch-size", str(args.batch_size), "--max-steps", str(args.max_steps),
+                 "--epochs", str(args.epochs), "--patience", str(args.epochs), "--seed", "0",
+                 "--threads", str(args.threads), "--num-workers", str(args.num_workers)]
+
+    print(f"{'설정':<22}{'samples/s':>12}{'ms/step':>10}{'data wait %':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in args.configs:
+            r = run_config(name, base_argv, tmp)
+            if "error" in r:
+                print(f"{name:<22}  실패: {r['error']}")
+                continue
+            print(f"{name:<22}{r['samples_per_sec']:12.1f}{r['ms_per_step']:10.0f}{r['data_wait_ratio'] * 100:13.0f}")
+
+if __name__ == "__main__":
+    main()
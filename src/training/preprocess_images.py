@@ -0,0 +1,206 @@
+"""
+원본 이미지 트리(image_root/<id>/<파일>)를 학습 해상도 정사각형 이미지로 일괄 변환
+
+- 프로세스 풀로 병렬 처리 (코어 수만큼)
+- 큰 JPEG 는 draft() 축소 디코딩 (open_reduced)
+- manifest.json 에 원본 크기/수정시각(+선택적 sha1)과 가로/세로를 기록하고,
+  다음 실행에서는 원본이 그대로이고 출력이 있으면 건너뜀 -> 크롤링 후 새 이미지 수에 비례
+- 변환 설정(target_size, method, quality)이 바뀌면 전부 다시 변환
+- 사라진 원본은 기록과 출력 파일을 함께 지움
+- 출력은 JPEG 원본은 같은 이름, 그 외는 원래 확장자를 남긴 이름 (x.png -> x.png.jpg, x.jpg 와 겹치지 않음)
+
+실행 예시 (src/training 에서)
+    python preprocess_images.py --image-root ../../data/total_images --out-root ../../data/images_224
+    python preprocess_images.py --image-root ../../data/total_images --out-root ../../data/images_224 \\
+        --method notebook --workers 8 --hash
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from tools.image_preprocessed_util import IMAGE_EXTS, normalize_image, open_reduced
+
+MANIFEST_NAME = "manifest.json"
+
+def file_sha1(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def list_images(image_root: str) -> list[str]:
+    """
+    image_root 아래 id 폴더들의 이미지 상대 경로 (id/파일명)
+    """
+    rel_paths = []
+    with os.scandir(image_root) as folders:
+        for folder in folders:
+            if not folder.is_dir():
+                continue
+            with os.scandir(folder.path) as files:
+                for entry in files:
+                    if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTS):
+                        rel_paths.append(f"{folder.name}/{entry.name}")
+    return sorted(rel_paths)
+
+def output_rel_path(rel_path: str) -> str:
+    # 확장자만 바꾸면 x.png 와 x.jpg 가 같은 출력이 되므로 JPEG 가 아니면 원래 확장자를 남김
+    if os.path.splitext(rel_path)[1].lower() in (".jpg", ".jpeg"):
+        return rel_path
+    return rel_path + ".jpg"
+
+def _process_one(job: tuple) -> dict:
+    # 워커 프로세스에서 실행 (pickle 가능한 인자만)
+    rel_path, image_root, out_root, target_size, method, quality, use_hash = job
+    src = os.path.join(image_root, rel_path)
+    out_rel = output_rel_path(rel_path)
+    dst = os.path.join(out_root, out_rel)
+    try:
+        st = os.stat(src)
+        img, (width, height) = open_reduced(src, target_size)
+        img = normalize_image(img, target_size, method)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        tmp = dst + ".part"
+        img.save(tmp, "JPEG", quality=quality)
+        os.replace(tmp, dst)
+
+        return {
+            "src": rel_path, "out": out_rel, "bytes": st.st_size, "mtime_ns": st.st_mtime_ns,
+            "sha1": file_sha1(src) if use_hash else None,
+            "width": width, "height": height, "out_width": img.width, "out_height": img.height,
+        }
+    except Exception as e:
+        return {"src": rel_path, "error": str(e)}
+
+class Manifest:
+    """
+    원본 상대 경로 -> 변환 기록 (out, bytes, mtime_ns, sha1, width, height, out_width, out_height)
+    """
+    def __init__(self, out_root: str, params: dict):
+        self.path = os.path.join(out_root, MANIFEST_NAME)
+        self.params = params
+        self.files = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            # 변환 설정이 바뀌었으면 이전 기록은 쓰지 않음
+            if data.get("params") == params:
+                self.files = data.get("files", {})
+
+    def is_fresh(self, rel_path: str, image_root: str, out_root: str, use_hash: bool) -> bool:
+        record = self.files.get(rel_path)
+        if record is None or not os.path.exists(os.path.join(out_root, record["out"])):
+            return False
+        st = os.stat(os.path.join(image_root, rel_path))
+        if (st.st_size, st.st_mtime_ns) == (record["bytes"], record["mtime_ns"]):
+            return True
+        # 복사 등으로 mtime 만 바뀐 경우 내용 해시로 확인
+        if use_hash and record.get("sha1") and st.st_size == record["bytes"]:
+            if file_sha1(os.path.join(image_root, rel_path)) == record["sha1"]:
+                record["mtime_ns"] = st.st_mtime_ns
+                return True
+        return False
+
+    def drop_stale(self, rel_paths: list) -> tuple[int, set]:
+        """
+        다시 쓸 수 없는 기록을 버리고 (사라진 원본 수, 버린 기록의 출력 경로) 를 반환
+        - rel_paths 에 없는 원본 (사라진 원본)
+        - 같은 출력을 가리키는 기록들: 예전 이름 규칙의 x.png / x.jpg 는 어느 원본의 결과인지 모름
+        - 출력 이름이 지금 규칙과 다른 기록 (다시 변환)
+        """
+        current = set(rel_paths)
+        owners = {}
+        for rel_path, record in self.files.items():
+            owners.setdefault(record["out"], []).append(rel_path)
+
+        removed = [p for p in self.files if p not in current]
+        stale = set(removed)
+        stale.update(p for group in owners.values() if len(group) > 1 for p in group)
+        stale.update(p for p, record in self.files.items() if record["out"] != output_rel_path(p))
+        return len(removed), {self.files.pop(p)["out"] for p in stale}
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"params": self.params, "files": self.files}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(list(self.files.values()))
+
+def preprocess_images(image_root: str, out_root: str, target_size: int = 224, method: str = "make_square",
+                      quality: int = 95, workers: int | None = None, use_hash: bool = False,
+                      chunksize: int = 16) -> dict:
+    """
+    새로 생기거나 바뀐 이미지만 변환하고 통계를 반환합니다.
+    """
+    os.makedirs(out_root, exist_ok=True)
+    params = {"target_size": target_size, "method": method, "quality": quality}
+    manifest = Manifest(out_root, params)
+
+    rel_paths = list_images(image_root)
+
+    # 1) 사라진 원본 / 쓸 수 없는 기록은 버리고, 지금 원본의 출력이 아닌 파일은 삭제
+    removed, stale_outs = manifest.drop_stale(rel_paths)
+    for out_rel in stale_outs - {output_rel_path(p) for p in rel_paths}:
+        out_path = os.path.join(out_root, out_rel)
+        if os.path.exists(out_path):
+            os.remove(out_path)
+
+    # 2) 새로 생기거나 바뀐 원본만 변환
+    todo = [p for p in rel_paths if not manifest.is_fresh(p, image_root, out_root, use_hash)]
+
+    stats = {"total": len(rel_paths), "skipped": len(rel_paths) - len(todo), "processed": 0, "failed": 0,
+             "removed": removed, "errors": []}
+    jobs = [(p, image_root, out_root, target_size, method, quality, use_hash) for p in todo]
+
+    start = time.perf_counter()
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(_process_one, jobs, chunksize=chunksize):
+                if "error" in result:
+                    stats["failed"] += 1
+                    stats["errors"].append(result)
+                    continue
+                manifest.files[result.pop("src")] = result
+                stats["processed"] += 1
+    stats["seconds"] = time.perf_counter() - start
+    stats["images_per_sec"] = stats["processed"] / stats["seconds"] if stats["processed"] else 0.0
+
+    manifest.save()
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="원본 이미지 -> 학습 해상도 정사각형 이미지 일괄 변환")
+    parser.add_argument("--image-root", default="../../data/total_images")
+    parser.add_argument("--out-root", default="../../data/images_224")
+    parser.add_argument("--target-size", type=int, default=224)
+    parser.add_argument("--method", default="make_square", choices=["make_square", "notebook"])
+    parser.add_argument("--quality", type=int, default=95, help="출력 JPEG 품질")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="프로세스 수")
+    parser.add_argument("--hash", action="store_true", help="mtime 이 바뀐 원본은 sha1 로 한 번 더 비교")
+    args = parser.parse_args()
+
+    stats = preprocess_images(args.image_root, args.out_root, args.target_size, args.method,
+                              args.quality, args.workers, args.hash)
+    errors = stats.pop("errors")
+    print(f"전체 {stats['total']} | 건너뜀 {stats['skipped']} | 변환 {stats['processed']} | 실패 {stats['failed']}"
+          f" | 제거 {stats['removed']} | {stats['seconds']:.2f}s | {stats['images_per_sec']:.1f} images/s"
+          f" (workers={args.workers})")
+    for error in errors[:10]:
+        print(f"  실패 {error['src']}: {error['error']}")
+
+    # 원본 크기 분포 (check_image_size 대신 manifest 사용, 이미지를 다시 열지 않음)
+    df = Manifest(args.out_root, {"target_size": args.target_size, "method": args.method,
+                                  "quality": args.quality}).to_frame()
+    if len(df):
+        print(df[["width", "height", "bytes"]].describe().round(1))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+CombinedModel 하이퍼파라미터 스윕 (tab_scale / img_scale / img_dim / tab_dim / lr)
+
+- 시행(trial)을 프로세스 풀에서 병렬로 실행, 시행마다 CPU 스레드 수를 따로 지정 (--threads-per-trial)
+- 이미지는 한 번만 처리해서 모든 시행이 공유
+    * --mode features (기본) : 백본 특징 저장소(feature_store)를 한 번 만들고 헤드만 학습 (HeadOnlyModel)
+    * --mode finetune         : uint8 이미지 캐시(image_dataset)를 한 번 만들고 train_convnext.train 으로 전체 학습
+- 가지치기: --warmup-epochs 이후 에폭마다 검증 MAE 가 같은 에폭 다른 시행들의 중앙값보다 나쁘면 중단
+- 결과는 표 하나(CSV)로 저장, 최고 MAE 기준 정렬
+
+실행 예시 (src/training 에서)
+    python sweep_runner.py --trials 24 --epochs 30 --threads-per-trial 2
+    python sweep_runner.py --space '{"tab_scale": [1, 5], "img_scale": [0.2, 1.0], "lr": [1e-3, 3e-4]}'
+    python sweep_runner.py --mode finetune --backbone convnext_tiny --trials 4 --epochs 5
+    python sweep_runner.py --synthetic 256 --no-pretrained --trials 8 --epochs 6      # 동작 확인용
+"""
+import argparse
+import itertools
+import json
+import multiprocessing as mp
+import os
+import random
+import statistics
+import tempfile
+import time
+from argparse import Namespace
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import torch
+import torch.nn as nn
+from sklearn.model_selection import train_test_split
+from torch.utils.data import DataLoader
+
+from tools.feature_store import BACKBONES, FeatureDataset, FeatureStore, HeadOnlyModel, build_feature_store
+from tools.image_dataset import build_image_cache
+from train_convnext import TRAIN_IDS, build_parser, load_frame, set_seed, train
+
+# 노트북에서 손으로 바꿔 보던 값 주변
+DEFAULT_SPACE = {
+    "tab_scale": [1.0, 2.0, 5.0, 10.0],
+    "img_scale": [0.1, 0.2, 0.5, 1.0],
+    "img_dim": [16, 32, 64],
+    "tab_dim": [128, 256],
+    "lr": [1e-3, 3e-4],
+}
+
+def sample_trials(space: dict, n_trials: int, seed: int) -> list[dict]:
+    """
+    n_trials=0 이면 전체 격자, 아니면 격자에서 중복 없이 n_trials 개 무작위 선택
+    """
+    keys = list(space)
+    grid = [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+    if n_trials and n_trials < len(grid):
+        grid = random.Random(seed).sample(grid, n_trials)
+    return grid
+
+class MedianPruner:
+    """
+    프로세스 간 공유 dict(epoch -> [MAE, ...]) 로 같은 에폭 중앙값과 비교
+    """
+    def __init__(self, shared, lock, warmup_epochs: int = 3, min_trials: int = 3):
+        self.shared = shared
+        self.lock = lock
+        self.warmup_epochs = warmup_epochs
+        self.min_trials = min_trials
+
+    def report(self, epoch: int, mae: float) -> bool:
+        """
+        기록하고 계속할지 반환 (False = 가지치기)
+        """
+        with self.lock:
+            others = list(self.shared.get(epoch, []))
+            self.shared[epoch] = others + [mae]
+        if epoch < self.warmup_epochs or len(others) < self.min_trials:
+            return True
+        return mae <= statistics.median(others)
+
+def _head_trial(trial: dict, data: dict, opts: dict, pruner: MedianPruner) -> dict:
+    # 특징 저장소(memmap)에서 헤드만 학습
+    store = FeatureStore(data["store_dir"])
+    train_ds = FeatureDataset(store, data["train_df"], "price", TRAIN_IDS)
+    val_ds = FeatureDataset(store, data["val_df"], "price", TRAIN_IDS)
+    train_loader = DataLoader(train_ds, batch_size=opts["batch_size"], shuffle=True)
+    val_loader = DataLoader(val_ds, batch_size=opts["batch_size"], shuffle=False)
+
+    model = HeadOnlyModel(store.dim, len(TRAIN_IDS), tab_scale=trial["tab_scale"], img_scale=trial["img_scale"],
+                          img_dim=int(trial["img_dim"]), tab_dim=int(trial["tab_dim"]))
+    criterion = nn.SmoothL1Loss()
+    optimizer = torch.optim.AdamW(model.parameters(), lr=trial["lr"], weight_decay=opts["weight_decay"])
+
+    history, pruned = [], False
+    for epoch in range(opts["epochs"]):
+        model.train()
+        for features, tabular_data, labels in train_loader:
+            optimizer.zero_grad(set_to_none=True)
+            loss = criterion(model(features, tabular_data).squeeze(1), torch.log1p(labels))
+            loss.backward()
+            optimizer.step()
+
+        model.eval()
+        abs_err, n = 0.0, 0
+        with torch.inference_mode():
+            for features, tabular_data, labels in val_loader:
+                preds = torch.expm1(model(features, tabular_data).squeeze(1))
+                abs_err += (preds - labels).abs().sum().item()
+                n += len(labels)
+        record = {"epoch": epoch, "val_mae": abs_err / max(1, n)}
+        history.append(record)
+        if not pruner.report(epoch, record["val_mae"]):
+            pruned = True
+            break
+    return {"history": history, "pruned": pruned}
+
+def _finetune_trial(trial: dict, data: dict, opts: dict, pruner: MedianPruner) -> dict:
+    # 공유 uint8 이미지 캐시로 train_convnext 전체 학습
+    argv = ["--csv", data["csv"], "--image-root", data["image_root"], "--cache-dir", data["cache_dir"],
+            "--backbone", opts["backbone"], "--epochs", str(opts["epochs"]),
+            "--batch-size", str(opts["batch_size"]), "--weight-decay", str(opts["weight_decay"]),
+            "--threads", str(opts["threads"]), "--patience", str(opts["epochs"]),
+            "--out", os.path.join(opts["out_dir"], f"trial_{trial['trial']:03d}", "convnext_best.pt"),
+            "--log-dir", os.path.join(opts["out_dir"], f"trial_{trial['trial']:03d}", "runs")]
+    for k in DEFAULT_SPACE:
+        argv += [f"--{k.replace('_', '-')}", str(trial[k])]
+    if opts["no_pretrained"]:
+        argv.append("--no-pretrained")
+    if opts["max_steps"]:
+        argv += ["--max-steps", str(opts["max_steps"])]
+
+    result = train(build_parser().parse_args(argv), on_epoch=lambda e, r: pruner.report(e, r["val_mae"]))
+    return {"history": result["history"], "pruned": result["pruned"]}
+
+def run_trial(trial: dict, data: dict, opts: dict, shared, lock) -> dict:
+    """
+    워커 프로세스에서 시행 1개 실행 -> 결과 표의 한 행
+    """
+    torch.set_num_threads(opts["threads"])
+    set_seed(opts["seed"])
+    pruner = MedianPruner(shared, lock, warmup_epochs=opts["warmup_epochs"], min_trials=opts["min_trials"])
+
+    start = time.perf_counter()
+    try:
+        fn = _head_trial if opts["mode"] == "features" else _finetune_trial
+        result = fn(trial, data, opts, pruner)
+    except Exception as e:
+        return {**trial, "status": "failed", "error": str(e), "seconds": time.perf_counter() - start}
+
+    history = result["history"]
+    best = min(history, key=lambda r: r["val_mae"]) if history else {"val_mae": float("nan"), "epoch": -1}
+    return {
+        **trial,
+        "status": "pruned" if result["pruned"] else "complete",
+        "best_val_mae": best["val_mae"],
+        "best_epoch": best["epoch"] + 1,
+        "epochs_run": len(history),
+        "seconds": time.perf_counter() - start,
+    }
+
+def prepare_data(args, work_dir: str) -> dict:
+    """
+    전처리 + 분할은 한 번, 이미지 처리(특징 저장소 / uint8 캐시)도 한 번만
+    """
+    image_root, csv_path = args.image_root, args.csv
+    if args.synthetic:
+        # 임의 데이터도 CSV 로 남겨서 finetune 시행들이 같은 행을 읽게 함
+        from bench_image_dataset import make_synthetic
+        image_root = os.path.join(work_dir, "images")
+        csv_path = os.path.join(work_dir, "synthetic.csv")
+        make_synthetic(args.synthetic, image_root).to_csv(csv_path, index=False)
+    df, _, _ = load_frame(Namespace(synthetic=0, csv=csv_path, image_root=image_root))
+
+    if args.mode == "features":
+        store_dir = args.shared_dir or os.path.join(work_dir, f"features_{args.backbone}")
+        if not os.path.exists(os.path.join(store_dir, "meta.json")):
+            start = time.perf_counter()
+            build_feature_store(df["id"].tolist(), image_root, store_dir, backbone=args.backbone,
+                                num_workers=args.loader_workers, pretrained=not args.no_pretrained)
+            print(f"특징 저장소 생성 {time.perf_counter() - start:.1f}s -> {store_dir}")
+        train_df, val_df = train_test_split(df, test_size=0.2, random_state=42)
+        return {"store_dir": store_dir, "train_df": train_df.reset_index(drop=True),
+                "val_df": val_df.reset_index(drop=True)}
+
+    cache_dir = args.shared_dir or os.path.join(work_dir, "image_cache")
+    if not os.path.exists(os.path.join(cache_dir, "meta.json")):
+        start = time.perf_counter()
+        build_image_cache(df["id"].tolist(), image_root, cache_dir, num_workers=args.loader_workers)
+        print(f"uint8 이미지 캐시 생성 {time.perf_counter() - start:.1f}s -> {cache_dir}")
+    return {"csv": csv_path, "image_root": image_root, "cache_dir": cache_dir}
+
+def main():
+    parser = argparse.ArgumentParser(description="CombinedModel 하이퍼파라미터 병렬 스윕")
+    parser.add_argument("--mode", default="features", choices=["features", "finetune"])
+    parser.add_argument("--space", default=None, help="JSON {파라미터: [값, ...]} (기본: DEFAULT_SPACE)")
+    parser.add_argument("--trials", type=int, default=16, help="격자에서 무작위로 고를 시행 수 (0 = 전체 격자)")
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--weight-decay", type=float, default=1e-4)
+    parser.add_argument("--warmup-epochs", type=int, default=3, help="이 에폭 전에는 가지치기 안 함")
+    parser.add_argument("--min-trials", type=int, default=3, help="비교할 다른 시행이 이 수 이상일 때만 가지치기")
+    parser.add_argument("--threads-per-trial", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=0, help="동시 시행 수 (0 = 코어 수 / 시행당 스레드)")
+    parser.add_argument("--seed", type=int, default=42)
+
+    parser.add_argument("--csv", default="../../csv/data_regression_clean.csv")
+    parser.add_argument("--image-root", default="../../data/total_images")
+    parser.add_argument("--synthetic", type=int, default=0, help="N 개 임의 이미지로 실행")
+    parser.add_argument("--backbone", default="convnext_small", choices=list(BACKBONES))
+    parser.add_argument("--no-pretrained", action="store_true")
+    parser.add_argument("--max-steps", type=int, default=0, help="finetune 모드 에폭당 최대 스텝")
+    parser.add_argument("--loader-workers", type=int, default=4, help="특징/캐시 생성용 DataLoader 워커 수")
+    parser.add_argument("--shared-dir", default=None, help="특징 저장소 / 이미지 캐시 경로 (있으면 재사용)")
+    parser.add_argument("--out", default="sweep_results.csv")
+    args = parser.parse_args()
+
+    space = json.loads(args.space) if args.space else {}
+    space = {**DEFAULT_SPACE, **space}
+    trials = [{"trial": i, **t} for i, t in enumerate(sample_trials(space, args.trials, args.seed))]
+    workers = args.workers or max(1, (os.cpu_count() or 1) // args.threads_per_trial)
+
+    work_dir = tempfile.mkdtemp(prefix="sweep_")
+    data = prepare_data(args, work_dir)
+    opts = {"mode": args.mode, "epochs": args.epochs, "batch_size": args.batch_size,
+            "weight_decay": args.weight_decay, "threads": args.threads_per_trial, "seed": args.seed,
+            "warmup_epochs": args.warmup_epochs, "min_trials": args.min_trials, "backbone": args.backbone,
+            "no_pretrained": args.no_pretrained, "max_steps": args.max_steps, "out_dir": work_dir}
+
+    print(f"시행 {len(trials)}개 | 동시 {workers}개 x 스레드 {args.threads_per_trial} | mode={args.mode}")
+    start = time.perf_counter()
+    rows = []
+    # fork 된 워커가 부모의 OpenMP 스레드 풀을 물려받지 않도록 spawn
+    ctx = mp.get_context("spawn")
+    with ctx.Manager() as manager, ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        shared, lock = manager.dict(), manager.Lock()
+        futures = [pool.submit(run_trial, t, data, opts, shared, lock) for t in trials]
+        for future in as_completed(futures):
+            row = future.result()
+            rows.append(row)
+            print(f"  trial {row['trial']:3d} {row['status']:<8} MAE {row.get('best_val_mae', float('nan')):>12,.0f}"
+                  f" ({row.get('epochs_run', 0)} epochs, {row['seconds']:.1f}s) {row.get('error', '')}")
+
+    table = pd.DataFrame(rows).sort_values("best_val_mae", na_position="last").reset_index(drop=True)
+    table.to_csv(args.out, index=False)
+    print(f"\n스윕 {time.perf_counter() - start:.1f}s, 결과 -> {args.out}")
+    print(table.head(10).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,7 @@
+import json
+import os
+
+import numpy as np
 import pandas as pd
 from sklearn.preprocessing import LabelEncoder
 from sklearn.preprocessing import StandardScaler, MinMaxScaler, RobustScaler
@@ -30,6 +34,164 @@ def remove_outliers_zscore(df: pd.DataFrame, cols: list, threshold: float = 3.0)
 
     return df_copy[mask].reset_index(drop=True)
 
+def _as_str(values: pd.Series) -> pd.Series:
+    # astype(str) 과 같되 NaN 은 pandas 버전과 상관없이 "nan"
+    return values.astype(object).where(values.notna(), "nan").astype(str)
+
+# 벡터화 이상치 필터 (칼럼 통계를 한 번에 계산해서 마스크 1개로 자름)
+class OutlierFilter:
+    """
+    - method="iqr"    : [Q1 - k*IQR, Q3 + k*IQR]
+    - method="zscore" : [mean - threshold*std, mean + threshold*std]  (|z| <= threshold 와 같음)
+    - group_by        : 그룹별 경계 (예: ["model", "model_type"] 별 price)
+                        min_group_size 보다 작은 그룹 / 처음 보는 그룹은 전체 경계 사용
+    모든 칼럼 통계는 전체(또는 그룹) 데이터 기준으로 한 번에 계산합니다.
+    (remove_outliers_iqr 처럼 앞 칼럼에서 잘린 데이터로 다음 칼럼을 다시 계산하지 않음)
+    fit 후 경계만 저장하므로 mask/filter 는 다시 학습하지 않고 O(n)
+    """
+    def __init__(self, cols: list, method: str = "iqr", k: float = 1.5, threshold: float = 3.0,
+                 group_by: list | None = None, min_group_size: int = 30):
+        if method not in ("iqr", "zscore"):
+            raise ValueError("method must be 'iqr' or 'zscore'")
+        self.cols = list(cols)
+        self.method = method
+        self.k = float(k)
+        self.threshold = float(threshold)
+        self.group_by = list(group_by or [])
+        self.min_group_size = int(min_group_size)
+
+        self.bounds = None        # (2, C) 전체 경계 [하한, 상한]
+        self.group_keys = []      # [(그룹 값, ...), ...]
+        self.group_bounds = None  # (G, 2, C)
+        self._group_index = None
+
+    def _bounds(self, values: np.ndarray) -> np.ndarray:
+        # values: (N, C) -> (2, C)
+        if self.method == "iqr":
+            q1, q3 = np.nanquantile(values, [0.25, 0.75], axis=0)
+            iqr = q3 - q1
+            return np.stack([q1 - self.k * iqr, q3 + self.k * iqr])
+        mean = np.nanmean(values, axis=0)
+        std = np.nanstd(values, axis=0, ddof=1)
+        return np.stack([mean - self.threshold * std, mean + self.threshold * std])
+
+    def _key_codes(self, df: pd.DataFrame, vocabs: list | None = None):
+        """
+        그룹 칼럼별 값 -> 어휘 인덱스 (N, K), 어휘에 없는 값은 -1
+        고유값만 문자열로 바꿔서 조회하므로 행 수에 대해 해시 1번
+        vocabs 가 None 이면 df 값으로 어휘를 만듭니다.
+        """
+        build = vocabs is None
+        if build:
+            vocabs = [{} for _ in self.group_by]
+        codes = np.empty((len(df), len(self.group_by)), dtype=np.int64)
+        for j, (g, vocab) in enumerate(zip(self.group_by, vocabs)):
+            row_codes, uniques = pd.factorize(df[g], use_na_sentinel=False)
+            keys = ["nan" if pd.isna(u) else str(u) for u in uniques]
+            if build:
+                for key in keys:
+                    vocab.setdefault(key, len(vocab))
+            lookup = np.array([vocab.get(key, -1) for key in keys], dtype=np.int64)
+            codes[:, j] = lookup[row_codes]
+        return codes, vocabs
+
+    def fit(self, df: pd.DataFrame):
+        values = df[self.cols].to_numpy(dtype=np.float64)
+        self.bounds = self._bounds(values)
+        self.group_keys, self.group_bounds, self._group_index = [], None, None
+        if not self.group_by:
+            return self
+
+        # 그룹 코드(혼합 진법 1개 정수)로 정렬해서 그룹별 연속 구간에 대해 통계 계산
+        codes, vocabs = self._key_codes(df)
+        sizes = [max(len(v), 1) for v in vocabs]
+        flat = np.ravel_multi_index(codes.T, sizes)
+        order = np.argsort(flat, kind="stable")
+        groups, starts, counts = np.unique(flat[order], return_index=True, return_counts=True)
+        sorted_values = values[order]
+        names = [list(v) for v in vocabs]
+
+        keys, bounds = [], []
+        for code, begin, n in zip(groups, starts, counts):
+            if n < self.min_group_size:
+                continue
+            idx = np.unravel_index(code, sizes)
+            keys.append(tuple(names[j][i] for j, i in enumerate(idx)))
+            bounds.append(self._bounds(sorted_values[begin:begin + n]))
+        self.group_keys = keys
+        self.group_bounds = np.stack(bounds) if bounds else np.empty((0, 2, len(self.cols)))
+        return self
+
+    def _build_group_index(self):
+        # 그룹 값 어휘 + (혼합 진법 코드 -> group_bounds 행) 표, 마지막 행 = 전체 경계
+        vocabs = [{} for _ in self.group_by]
+        for key in self.group_keys:
+            for vocab, value in zip(vocabs, key):
+                vocab.setdefault(value, len(vocab))
+        sizes = [max(len(v), 1) for v in vocabs]
+        lookup = np.full(int(np.prod(sizes)), len(self.group_keys), dtype=np.int64)
+        for g, key in enumerate(self.group_keys):
+            lookup[np.ravel_multi_index([vocab[v] for vocab, v in zip(vocabs, key)], sizes)] = g
+        table = np.concatenate([self.group_bounds, self.bounds[None]])
+        self._group_index = (vocabs, sizes, lookup, table)
+
+    def _row_bounds(self, df: pd.DataFrame):
+        # 행별 (하한, 상한) - 그룹 없으면 (2, C) 를 브로드캐스트
+        if not self.group_by or not self.group_keys:
+            return self.bounds[0], self.bounds[1]
+        if self._group_index is None:
+            self._build_group_index()
+        vocabs, sizes, lookup, table = self._group_index
+
+        codes, _ = self._key_codes(df, vocabs)
+        unknown = (codes < 0).any(axis=1)
+        idx = lookup[np.ravel_multi_index(np.where(codes < 0, 0, codes).T, sizes)]
+        # 작은 그룹 / 처음 보는 그룹 -> 전체 경계
+        idx[unknown] = len(self.group_keys)
+        rows = table[idx]
+        return rows[:, 0], rows[:, 1]
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        남길 행 True (NaN 은 제거)
+        """
+        if self.bounds is None:
+            raise RuntimeError("fit() 을 먼저 호출하세요")
+        values = df[self.cols].to_numpy(dtype=np.float64)
+        lower, upper = self._row_bounds(df)
+        return ((values >= lower) & (values <= upper)).all(axis=1)
+
+    def filter(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df[self.mask(df)].reset_index(drop=True)
+
+    def fit_filter(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self.fit(df).filter(df)
+
+    def to_dict(self) -> dict:
+        return {
+            "method": self.method,
+            "cols": self.cols,
+            "k": self.k,
+            "threshold": self.threshold,
+            "group_by": self.group_by,
+            "min_group_size": self.min_group_size,
+            "bounds": None if self.bounds is None else self.bounds.tolist(),
+            "groups": [[list(key), b.tolist()] for key, b in zip(self.group_keys, self.group_bounds)]
+                      if self.group_keys else [],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        f = cls(data["cols"], method=data.get("method", "iqr"), k=data.get("k", 1.5),
+                threshold=data.get("threshold", 3.0), group_by=data.get("group_by"),
+                min_group_size=data.get("min_group_size", 30))
+        if data.get("bounds") is not None:
+            f.bounds = np.asarray(data["bounds"], dtype=np.float64)
+        groups = data.get("groups") or []
+        f.group_keys = [tuple(key) for key, _ in groups]
+        f.group_bounds = np.asarray([b for _, b in groups], dtype=np.float64).reshape(-1, 2, len(f.cols))
+        return f
+
 # 라벨 인코더
 def label_encode_df(df: pd.DataFrame, cols: list):
     df_copy = df.copy()
@@ -84,6 +246,348 @@ def filter_columns(df: pd.DataFrame, cols: list) -> pd.DataFrame:
     df_copy = df_copy[cols].copy()
     return df_copy
 
+# 모델 학습용 기본 설정 (노트북과 동일)
+TRAIN_CONFIG = {
+    "select_cols": ["id", "condition", "is_completed", "location", "model", "model_type", "price"],
+    "label_encode": {"cols": ["condition", "is_completed", "location", "model", "model_type"]},
+    "final_cols": ["id", "condition", "is_completed", "location", "model", "model_type", "price"],
+}
+
+# 스케일러 종류별 sklearn 속성 (저장/복원용)
+_SCALER_PARAMS = {
+    "standard": (StandardScaler, ["mean_", "scale_", "var_"]),
+    "minmax": (MinMaxScaler, ["min_", "scale_", "data_min_", "data_max_", "data_range_"]),
+    "robust": (RobustScaler, ["center_", "scale_"]),
+}
+
+def _label_codes(values: pd.Series, classes: list, col: str) -> np.ndarray:
+    # LabelEncoder.transform 과 같은 결과 (str 로 맞춘 뒤 정렬된 classes 의 위치), 모르는 값은 ValueError
+    values = _as_str(values)
+    codes = pd.Index(classes).get_indexer(values)
+    if (codes < 0).any():
+        bad = values[codes < 0].unique().tolist()
+        raise ValueError(f"학습 때 없던 {col} 값입니다: {bad}")
+    return codes
+
+class PreprocessPipeline:
+    """
+    preprocess_pipeline 의 규칙을 학습해서 들고 있는 객체
+    - fit / transform / fit_transform : 처음에 한 번만 복사하고 이후 단계는 그 프레임을 직접 수정
+    - filter_outliers                 : 저장된 이상치 경계로 새 데이터 거르기 (OutlierFilter)
+    - save / load                     : 규칙 전체를 JSON 파일 하나로 (convnext_best.pt 옆에 저장)
+    - transform_one                   : dict 1건 -> (1, F) float32 텐서 (요청 1건용 fast path)
+    - model_inputs                    : 모델에 넣는 칼럼 순서 (학습 스크립트가 지정해서 함께 저장, 없으면 feature_cols)
+    config 형식은 preprocess_pipeline 과 같습니다.
+    """
+    def __init__(self, config: dict | None = None, target: str = "price", id_col: str = "id"):
+        self.config = config or {}
+        self.target = target
+        self.id_col = id_col
+
+        self.impute_values = {}
+        self.outlier = None
+        self.label_classes = {}
+        self.onehot = None
+        self.scale = None
+        self.columns = None
+        self.model_inputs = None
+        self._fast = {}
+
+    # 학습
+    def fit(self, df: pd.DataFrame):
+        self.fit_transform(df)
+        return self
+
+    def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        cfg = self.config
+        df_out = self._select(df)
+
+        # 1) 결측치: 학습 데이터 기준 값을 저장
+        if "impute" in cfg:
+            im = cfg["impute"]
+            strategy = im.get("strategy", "mean")
+            for col in [c for c in im.get("cols", []) if c in df_out.columns]:
+                if strategy == "mean":
+                    value = df_out[col].mean()
+                elif strategy == "median":
+                    value = df_out[col].median()
+                elif strategy == "mode":
+                    value = df_out[col].mode()[0]
+                else:
+                    value = im.get("fill_value", None)
+                self.impute_values[col] = value.item() if hasattr(value, "item") else value
+            self._impute(df_out)
+
+        # 2) 이상치 제거: OutlierFilter 로 경계를 한 번에 계산하고 마스크 1개로 자름
+        if "outlier" in cfg:
+            oc = cfg["outlier"]
+            cols_out = [c for c in oc.get("cols", []) if c in df_out.columns]
+            if cols_out:
+                self.outlier = OutlierFilter(
+                    cols_out, method=oc.get("method", "zscore"), k=oc.get("k", 1.5),
+                    threshold=oc.get("threshold", 3.0), group_by=oc.get("group_by"),
+                    min_group_size=oc.get("min_group_size", 30),
+                ).fit(df_out)
+                df_out = df_out[self.outlier.mask(df_out)]
+
+        # 3) 라벨 인코딩: LabelEncoder 와 같은 정렬된 classes
+        if "label_encode" in cfg:
+            for col in [c for c in cfg["label_encode"].get("cols", []) if c in df_out.columns]:
+                self.label_classes[col] = np.unique(_as_str(df_out[col])).tolist()
+
+        # 4) 원핫 인코딩
+        if "onehot" in cfg:
+            oh_cols = [c for c in cfg["onehot"].get("cols", []) if c in df_out.columns]
+            if oh_cols:
+                self.onehot = {"cols": oh_cols, "drop_first": bool(cfg["onehot"].get("drop_first", False))}
+
+        df_out = self._encode(df_out, fit=True)
+
+        # 5) 스케일링
+        if "scale" in cfg:
+            sc = cfg["scale"]
+            sc_cols = [c for c in sc.get("cols", []) if c in df_out.columns]
+            if sc_cols:
+                method = sc.get("method", "standard")
+                if method not in _SCALER_PARAMS:
+                    raise ValueError("method must be 'standard', 'minmax', or 'robust'")
+                scaler = _SCALER_PARAMS[method][0]().fit(df_out[sc_cols])
+                self.scale = {"cols": sc_cols, "method": method,
+                              **{k: getattr(scaler, k).tolist() for k in _SCALER_PARAMS[method][1]}}
+                self._scale(df_out)
+
+        df_out = self._finalize(df_out)
+        self.columns = list(df_out.columns)
+        self._fast = {}
+        return df_out
+
+    # 적용
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        df_out = self._select(df)
+        self._impute(df_out)
+        df_out = self._encode(df_out, fit=False)
+        self._scale(df_out)
+        return self._finalize(df_out)
+
+    def filter_outliers(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        fit 때 저장한 이상치 경계로 새 데이터를 거릅니다 (다시 학습하지 않음, transform 전 원본 기준)
+        """
+        return self.outlier.filter(df) if self.outlier else df
+
+    def _select(self, df):
+        cols = self.config.get("select_cols")
+        # 입력 프레임은 건드리지 않도록 여기서 한 번만 복사
+        return df[cols].copy() if cols else df.copy()
+
+    def _impute(self, df_out):
+        for col, value in self.impute_values.items():
+            if col in df_out.columns:
+                df_out[col] = df_out[col].fillna(value)
+
+    def _encode(self, df_out, fit: bool):
+        for col, classes in self.label_classes.items():
+            if col in df_out.columns:
+                df_out[col] = _label_codes(df_out[col], classes, col)
+
+        if self.onehot:
+            df_out = pd.get_dummies(df_out, columns=self.onehot["cols"], drop_first=self.onehot["drop_first"])
+            if fit:
+                self.onehot["columns"] = list(df_out.columns)
+            else:
+                df_out = df_out.reindex(columns=self.onehot["columns"], fill_value=0)
+        return df_out
+
+    def _scale(self, df_out):
+        if not self.scale:
+            return
+        cols = self.scale["cols"]
+        for c in cols:
+            if c not in df_out.columns:
+                df_out[c] = 0.0
+        # sklearn transform 과 같은 식을 저장된 계수로 바로 계산
+        values = df_out[cols].to_numpy(dtype=np.float64)
+        scale = np.asarray(self.scale["scale_"])
+        if self.scale["method"] == "minmax":
+            values = values * scale + np.asarray(self.scale["min_"])
+        else:
+            center = np.asarray(self.scale["mean_" if self.scale["method"] == "standard" else "center_"])
+            values = (values - center) / scale
+        df_out[cols] = values
+
+    def _finalize(self, df_out):
+        if self.config.get("final_cols"):
+            df_out = df_out[[c for c in self.config["final_cols"] if c in df_out.columns]]
+        return df_out.reset_index(drop=True)
+
+    @property
+    def scaler(self):
+        if not self.scale:
+            return None
+        cls, params = _SCALER_PARAMS[self.scale["method"]]
+        scaler = cls()
+        for k in params:
+            setattr(scaler, k, np.asarray(self.scale[k], dtype=np.float64))
+        scaler.n_features_in_ = len(self.scale["cols"])
+        return scaler
+
+    @property
+    def feature_cols(self) -> list:
+        """
+        모델 탭 입력 칼럼 (id, target 제외한 최종 칼럼 순서)
+        """
+        return [c for c in self.columns or [] if c not in (self.id_col, self.target)]
+
+    # 요청 1건 fast path
+    def _build_fast(self, columns: list) -> list:
+        # 칼럼별 (원래 칼럼, 값->숫자 dict 또는 None, 원핫 값, scale 계수) 를 미리 계산
+        onehot_src = {}
+        if self.onehot:
+            for col in self.onehot["cols"]:
+                for c in self.onehot["columns"]:
+                    if c.startswith(col + "_"):
+                        onehot_src[c] = (col, c[len(col) + 1:])
+
+        scale_of = {}
+        if self.scale:
+            method = self.scale["method"]
+            for i, c in enumerate(self.scale["cols"]):
+                if method == "minmax":
+                    scale_of[c] = (self.scale["scale_"][i], self.scale["min_"][i], True)
+                else:
+                    center = self.scale["mean_" if method == "standard" else "center_"][i]
+                    scale_of[c] = (self.scale["scale_"][i], center, False)
+
+        steps = []
+        for c in columns:
+            if c in onehot_src:
+                col, value = onehot_src[c]
+                steps.append((col, None, value, scale_of.get(c)))
+            elif c in self.label_classes:
+                steps.append((c, {v: float(i) for i, v in enumerate(self.label_classes[c])}, None, scale_of.get(c)))
+            else:
+                steps.append((c, None, None, scale_of.get(c)))
+        return steps
+
+    def transform_one(self, row: dict, columns: list | None = None) -> "torch.Tensor":
+        """
+        {"condition": "...", "location": "...", ...} -> (1, len(columns)) float32 텐서
+        columns 순서대로 (기본: model_inputs, 없으면 feature_cols)
+        학습 때 없던 값이거나 대체값 없는 숫자 칼럼이 빠졌으면 ValueError
+        """
+        # pandas 전처리만 쓰는 곳(노트북, 탭 모델 학습)은 torch 없이도 import 되도록 여기서 import
+        import torch
+
+        columns = tuple(columns or self.model_inputs or self.feature_cols)
+        steps = self._fast.get(columns)
+        if steps is None:
+            unknown = [c for c in columns if c not in self.feature_cols]
+            if unknown:
+                raise ValueError(f"전처리 결과에 없는 칼럼입니다: {unknown}")
+            steps = self._fast[columns] = self._build_fast(list(columns))
+
+        vec = []
+        for col, mapping, onehot_value, scale in steps:
+            value = row.get(col)
+            if value is None and col in self.impute_values:
+                value = self.impute_values[col]
+            if mapping is not None:
+                try:
+                    x = mapping["nan" if value is None or value != value else str(value)]
+                except KeyError:
+                    raise ValueError(f"학습 때 없던 {col} 값입니다: {value!r}") from None
+            elif onehot_value is not None:
+                x = 1.0 if str(value) == onehot_value else 0.0
+            elif value is None:
+                raise ValueError(f"{col} 값이 없고 학습 때 저장한 대체값도 없습니다.")
+            else:
+                x = float(value)
+            if scale is not None:
+                k, c, is_minmax = scale
+                x = x * k + c if is_minmax else (x - c) / k
+            vec.append(x)
+        return torch.tensor([vec], dtype=torch.float32)
+
+    # 저장 / 복원
+    def to_dict(self) -> dict:
+        return {
+            "version": 1,
+            "config": self.config,
+            "target": self.target,
+            "id_col": self.id_col,
+            "impute_values": self.impute_values,
+            "outlier": self.outlier.to_dict() if self.outlier else None,
+            "label_classes": self.label_classes,
+            "onehot": self.onehot,
+            "scale": self.scale,
+            "columns": self.columns,
+            "model_inputs": self.model_inputs,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        pipeline = cls(data.get("config"), target=data.get("target", "price"), id_col=data.get("id_col", "id"))
+        pipeline.impute_values = data.get("impute_values") or {}
+        pipeline.outlier = OutlierFilter.from_dict(data["outlier"]) if data.get("outlier") else None
+        pipeline.label_classes = data.get("label_classes") or {}
+        pipeline.onehot = data.get("onehot")
+        pipeline.scale = data.get("scale")
+        pipeline.columns = data.get("columns")
+        pipeline.model_inputs = data.get("model_inputs")
+        return pipeline
+
+    def save(self, path: str):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def to_artifacts(self) -> dict:
+        """
+        예전 preprocess_pipeline artifacts 형식 (LabelEncoder / sklearn scaler 객체 포함)
+        """
+        artifacts = {"pipeline": self}
+        if self.outlier:
+            artifacts["outlier"] = self.outlier.to_dict()
+        if self.label_classes:
+            encoders = {}
+            for col, classes in self.label_classes.items():
+                le = LabelEncoder()
+                le.classes_ = np.array(classes, dtype=object)
+                encoders[col] = le
+            artifacts["label_encoders"] = encoders
+        if self.onehot:
+            artifacts["onehot_info"] = {"cols": self.onehot["cols"], "drop_first": self.onehot["drop_first"]}
+            artifacts["onehot_columns"] = self.onehot["columns"]
+        if self.scale:
+            artifacts["scaler"] = self.scaler
+            artifacts["scale_info"] = {"cols": self.scale["cols"], "method": self.scale["method"]}
+        return artifacts
+
+    @classmethod
+    def from_artifacts(cls, artifacts: dict, config: dict | None = None):
+        """
+        예전 artifacts(dict) 로부터 복원 (transform 모드 호환용)
+        """
+        pipeline = cls(config)
+        outlier = artifacts.get("outlier")
+        pipeline.outlier = OutlierFilter.from_dict(outlier) if outlier and outlier.get("bounds") else None
+        pipeline.label_classes = {col: [str(c) for c in le.classes_]
+                                  for col, le in artifacts.get("label_encoders", {}).items()}
+        if "onehot_info" in artifacts:
+            pipeline.onehot = {**artifacts["onehot_info"], "columns": artifacts.get("onehot_columns")}
+        scaler = artifacts.get("scaler")
+        if scaler is not None:
+            method = artifacts.get("scale_info", {}).get("method", "standard")
+            pipeline.scale = {"cols": artifacts["scale_info"]["cols"], "method": method,
+                              **{k: getattr(scaler, k).tolist() for k in _SCALER_PARAMS[method][1]}}
+        return pipeline
+
 # 최종 전처리 파이프라인
 def preprocess_pipeline(
     df: pd.DataFrame,
@@ -92,9 +596,10 @@ def preprocess_pipeline(
     config: dict | None = None
 ):
     """
-    헬퍼 함수들만 호출해 구성한 전처리 파이프라인.
+    PreprocessPipeline 을 감싼 기존 함수형 인터페이스.
     - mode="fit"       : 규칙 학습 + 적용 → (df_processed, artifacts)
     - mode="transform" : 저장된 규칙만 적용 → (df_processed, artifacts)
+    artifacts["pipeline"] 에 학습된 PreprocessPipeline 이 들어갑니다 (save() 로 파일 저장).
 
     config 예시
     ----------
@@ -107,6 +612,7 @@ def preprocess_pipeline(
         # 이상치 제거(fit에서만)
         # "outlier": {"method":"zscore","cols":["price"],"threshold":3.0}
         # "outlier": {"method":"iqr","cols":["price"]}
+        # "outlier": {"method":"iqr","cols":["price"],"group_by":["model","model_type"],"min_group_size":30}
 
         # 라벨 인코딩
         # "label_encode": {"cols":["condition","is_completed","location","model","model_type"]},
@@ -122,96 +628,14 @@ def preprocess_pipeline(
     }
     """
     assert mode in ("fit", "transform")
-    cfg = config or {}
-    df_out = df.copy()
     artifacts = artifacts or {}
 
-    # 1) 칼럼 선택
-    if cfg.get("select_cols"):
-        df_out = filter_columns(df_out, cfg["select_cols"])
-
-    # 2) 결측치 처리 (헬퍼 사용)
-    if "impute" in cfg:
-        im = cfg["impute"]
-        cols_impute = [c for c in im.get("cols", []) if c in df_out.columns]
-        if cols_impute:
-            df_out[cols_impute] = fill_missing(
-                df_out[cols_impute],
-                strategy=im.get("strategy", "mean"),
-                cols=cols_impute,
-                fill_value=im.get("fill_value", None)
-            )
-
-    # 3) 이상치 제거 (fit에서만)
-    if mode == "fit" and "outlier" in cfg:
-        oc = cfg["outlier"]
-        cols_out = [c for c in oc.get("cols", []) if c in df_out.columns]
-        if cols_out:
-            if oc.get("method", "zscore") == "zscore":
-                thr = float(oc.get("threshold", 3.0))
-                df_out = remove_outliers_zscore(df_out, cols_out, threshold=thr)
-                artifacts["outlier"] = {"method": "zscore", "cols": cols_out, "threshold": thr}
-            else:
-                df_out = remove_outliers_iqr(df_out, cols_out)
-                artifacts["outlier"] = {"method": "iqr", "cols": cols_out}
-
-    # 4) 라벨 인코딩 (헬퍼 사용)
-    if "label_encode" in cfg:
-        le_cols = [c for c in cfg["label_encode"].get("cols", []) if c in df_out.columns]
-        if le_cols:
-            if mode == "fit":
-                df_out, encoders = label_encode_df(df_out, le_cols)
-                artifacts["label_encoders"] = encoders  # {col: LabelEncoder}
-            else:
-                encoders = artifacts.get("label_encoders", {})
-                for col in le_cols:
-                    le = encoders.get(col)
-                    if le is None:
-                        continue
-
-    # 5) 원핫 인코딩 (헬퍼 사용)
-    if "onehot" in cfg:
-        oh_cols = [c for c in cfg["onehot"].get("cols", []) if c in df_out.columns]
-        drop_first = bool(cfg["onehot"].get("drop_first", False))
-        if oh_cols:
-            if mode == "fit":
-                df_out = onehot_encode_df(df_out, oh_cols, drop_first=drop_first)
-                artifacts["onehot_info"] = {"cols": oh_cols, "drop_first": drop_first}
-                artifacts["onehot_columns"] = list(df_out.columns)
-            else:
-                info = artifacts.get("onehot_info", {})
-                oh_cols_fit = info.get("cols", oh_cols)
-                drop_first_fit = info.get("drop_first", drop_first)
-                df_out = onehot_encode_df(df_out, oh_cols_fit, drop_first=drop_first_fit)
-                cols_fit = artifacts.get("onehot_columns")
-                if cols_fit:
-                    missing = [c for c in cols_fit if c not in df_out.columns]
-                    for c in missing:
-                        df_out[c] = 0
-                    df_out = df_out[cols_fit]
-
-    # 6) 스케일링 (헬퍼 사용)
-    if "scale" in cfg:
-        sc = cfg["scale"]
-        sc_cols = [c for c in sc.get("cols", []) if c in df_out.columns]
-        if sc_cols:
-            if mode == "fit":
-                df_out, scaler = scale_df(df_out, sc_cols, method=sc.get("method", "standard"))
-                artifacts["scaler"] = scaler
-                artifacts["scale_info"] = {"cols": sc_cols, "method": sc.get("method", "standard")}
-            else:
-                scaler = artifacts.get("scaler")
-                sc_info = artifacts.get("scale_info", {})
-                sc_cols_fit = sc_info.get("cols", sc_cols)
-                if scaler is not None and sc_cols_fit:
-                    for c in sc_cols_fit:
-                        if c not in df_out.columns:
-                            df_out[c] = 0.0
-                    df_out[sc_cols_fit] = scaler.transform(df_out[sc_cols_fit])
-
-    # 7) 최종 칼럼 순서
-    if cfg.get("final_cols"):
-        final_cols = [c for c in cfg["final_cols"] if c in df_out.columns]
-        df_out = df_out[final_cols]
-
-    return df_out.reset_index(drop=True), artifacts
\ No newline at end of file
+    if mode == "fit":
+        pipeline = PreprocessPipeline(config)
+        df_out = pipeline.fit_transform(df)
+    else:
+        pipeline = artifacts.get("pipeline") or PreprocessPipeline.from_artifacts(artifacts, config)
+        df_out = pipeline.transform(df)
+
+    artifacts.update(pipeline.to_artifacts())
+    return df_out, artifacts
\ No newline at end of file
@@ -0,0 +1,77 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+CSV_PATH = "../../csv/data_regression_clean.csv"
+
+# 학습(탭)에 필요한 칼럼 / 범주형 칼럼 / 긴 텍스트 칼럼
+TABULAR_COLUMNS = ["id", "condition", "is_completed", "location", "model", "model_type", "price"]
+CATEGORY_COLUMNS = ["condition", "location", "model", "model_type", "source"]
+TEXT_COLUMNS = ["title", "detail"]
+
+FORMATS = (".parquet", ".arrow")
+
+def to_typed_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    CSV 에서 읽은 df 를 저장용 타입으로 정리
+    - 인덱스 잔재 칼럼(Unnamed: 0) 제거
+    - 범주형 칼럼 -> category, price -> float32
+    """
+    df = df.loc[:, ~df.columns.str.startswith("Unnamed")].copy()
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    if "price" in df.columns:
+        df["price"] = pd.to_numeric(df["price"], errors="coerce").astype("float32")
+    if "id" in df.columns:
+        df["id"] = df["id"].astype(str)
+    return df.reset_index(drop=True)
+
+def convert_csv(csv_path: str = CSV_PATH, out_path: str | None = None) -> str:
+    """
+    정리된 CSV 를 한 번만 파싱해서 Parquet(.parquet) 또는 Arrow IPC(.arrow) 로 저장합니다.
+    - .parquet : 압축, 칼럼 단위 읽기
+    - .arrow   : 비압축 Feather v2, memory-map 으로 복사 없이 읽기
+    """
+    out_path = out_path or os.path.splitext(csv_path)[0] + ".parquet"
+    if not out_path.endswith(FORMATS):
+        raise ValueError(f"out_path must end with one of {FORMATS}")
+
+    table = pa.Table.from_pandas(to_typed_frame(pd.read_csv(csv_path)), preserve_index=False)
+    tmp_path = out_path + ".tmp"
+    if out_path.endswith(".parquet"):
+        pq.write_table(table, tmp_path, compression="zstd")
+    else:
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, out_path)
+    return out_path
+
+def read_dataset(path: str, columns=TABULAR_COLUMNS, memory_map: bool = True) -> pd.DataFrame:
+    """
+    Parquet / Arrow 데이터셋을 필요한 칼럼만 읽습니다 (columns=None 이면 전체).
+    범주형은 category, price 는 float32 로 복원됩니다.
+    """
+    if path.endswith(".parquet"):
+        table = pq.read_table(path, columns=columns, memory_map=memory_map)
+    elif path.endswith(".arrow"):
+        source = pa.memory_map(path, "r") if memory_map else pa.OSFile(path, "rb")
+        table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select(columns)
+    else:
+        raise ValueError(f"path must end with one of {FORMATS}")
+    return table.to_pandas()
+
+def load_dataset(csv_path: str = CSV_PATH, columns=TABULAR_COLUMNS, fmt: str = ".parquet",
+                 memory_map: bool = True) -> pd.DataFrame:
+    """
+    노트북의 pd.read_csv(csv_path) 대체
+    CSV 옆에 같은 이름의 .parquet/.arrow 가 없거나 CSV 보다 오래됐으면 먼저 변환합니다.
+    """
+    path = os.path.splitext(csv_path)[0] + fmt
+    if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(csv_path):
+        convert_csv(csv_path, path)
+    return read_dataset(path, columns=columns, memory_map=memory_map)
@@ -0,0 +1,195 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import torch
+import torch.nn as nn
+from PIL import Image
+from torch.utils.data import DataLoader, Dataset
+from torchvision import models
+
+from tools.image_preprocessed_util import first_image_path, get_image_transforms
+
+def _drop_classifier(idx):
+    def drop(m):
+        m.classifier[idx] = nn.Identity()
+        return m
+    return drop
+
+def _drop_fc(m):
+    m.fc = nn.Identity()
+    return m
+
+# 백본 이름 -> (생성 함수, 가중치, 분류층 제거 함수)
+BACKBONES = {
+    "convnext_tiny": (models.convnext_tiny, models.ConvNeXt_Tiny_Weights.DEFAULT, _drop_classifier(2)),
+    "convnext_small": (models.convnext_small, models.ConvNeXt_Small_Weights.DEFAULT, _drop_classifier(2)),
+    "efficientnet_b0": (models.efficientnet_b0, models.EfficientNet_B0_Weights.DEFAULT, _drop_classifier(1)),
+    "resnet50": (models.resnet50, models.ResNet50_Weights.DEFAULT, _drop_fc),
+}
+
+def build_backbone(name: str, pretrained: bool = True) -> nn.Module:
+    """
+    분류층을 Identity 로 바꾼 (pooled 특징 벡터를 내는) torchvision 백본
+    """
+    if name not in BACKBONES:
+        raise ValueError(f"backbone must be one of {list(BACKBONES)}")
+
+    fn, weights, drop = BACKBONES[name]
+    return drop(fn(weights=weights if pretrained else None)).eval()
+
+class _ImagePathDataset(Dataset):
+    def __init__(self, paths, transform):
+        self.paths = paths
+        self.transform = transform
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __getitem__(self, idx):
+        with Image.open(self.paths[idx]) as img:
+            return self.transform(img.convert('RGB'))
+
+def build_feature_store(ids, image_root: str, out_dir: str, backbone: str = "convnext_small",
+                        batch_size: int = 64, num_workers: int = 4, device: str | None = None,
+                        target_size: int = 224, pretrained: bool = True):
+    """
+    id 별 첫 이미지를 백본에 한 번만 통과시켜 특징을 out_dir 에 저장합니다.
+    - features.npy : (N, D) float32 (np.load(mmap_mode="r") 로 읽음)
+    - meta.json    : 백본 이름, 차원, id 목록(행 순서), 이미지 없는 id 목록 (완료 표시로 마지막에 기록)
+    이미지가 하나도 없으면 아무것도 쓰지 않고 RuntimeError
+    """
+    device = device or ('cuda' if torch.cuda.is_available() else 'cpu')
+
+    # 1) 이미지 경로 확정 (없는 id 는 제외)
+    ids = [str(i) for i in ids]
+    paths = {i: first_image_path(image_root, i) for i in ids}
+    kept = [i for i in ids if paths[i] is not None]
+    missing = [i for i in ids if paths[i] is None]
+    if not kept:
+        raise RuntimeError(f"{image_root} 에서 이미지를 찾지 못했습니다 (id {len(ids)}개). 특징 저장소를 만들지 않습니다.")
+
+    # 다시 만드는 중에 멈추면 이전 meta.json 이 남아 완료된 저장소로 보이지 않게 먼저 지움
+    os.makedirs(out_dir, exist_ok=True)
+    meta_path = os.path.join(out_dir, "meta.json")
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    # 2) 백본 통과 (배치 단위로 memmap 에 바로 기록)
+    model = build_backbone(backbone, pretrained=pretrained).to(device)
+    loader = DataLoader(_ImagePathDataset([paths[i] for i in kept], get_image_transforms(target_size)),
+                        batch_size=batch_size, num_workers=num_workers, shuffle=False)
+
+    features = None
+    offset = 0
+    with torch.inference_mode():
+        for images in loader:
+            out = model(images.to(device)).float().cpu().numpy()
+            if features is None:
+                features = np.lib.format.open_memmap(os.path.join(out_dir, "features.npy"), mode="w+",
+                                                     dtype=np.float32, shape=(len(kept), out.shape[1]))
+            features[offset:offset + len(out)] = out
+            offset += len(out)
+
+    dim = int(features.shape[1])
+    features.flush()
+    del features
+
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({"backbone": backbone, "dim": dim, "target_size": target_size,
+                   "ids": kept, "missing": missing}, f, ensure_ascii=False)
+
+    return FeatureStore(out_dir)
+
+class FeatureStore:
+    """
+    build_feature_store 결과를 memmap 으로 읽는 id -> 특징 벡터 저장소
+    """
+    def __init__(self, store_dir: str, mmap: bool = True):
+        with open(os.path.join(store_dir, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+
+        self.backbone = meta["backbone"]
+        self.dim = meta["dim"]
+        self.ids = meta["ids"]
+        self.missing = meta["missing"]
+        self.features = np.load(os.path.join(store_dir, "features.npy"), mmap_mode="r" if mmap else None)
+        self._row = {i: r for r, i in enumerate(self.ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, image_id):
+        return str(image_id) in self._row
+
+    def rows(self, ids) -> np.ndarray:
+        return np.fromiter((self._row[str(i)] for i in ids), dtype=np.int64)
+
+    def get(self, ids) -> np.ndarray:
+        return self.features[self.rows(ids)]
+
+class FeatureDataset(Dataset):
+    """
+    특징 저장소 + 탭 데이터로 head 만 학습하기 위한 Dataset
+    - 반환: (feature_tensor, tabular_tensor, label) - CombinedDataset 과 같은 순서
+    - 저장소에 없는 id 행은 제외
+    """
+    def __init__(self, store: FeatureStore, df: pd.DataFrame, target_id: str, train_ids: list, id_col: str = "id"):
+        df = df[df[id_col].astype(str).isin(store.ids)].reset_index(drop=True)
+
+        self.ids = df[id_col].astype(str).tolist()
+        self.features = torch.from_numpy(np.ascontiguousarray(store.get(self.ids)))
+        self.tabular = torch.tensor(df[train_ids].to_numpy(dtype=np.float32))
+        self.labels = torch.tensor(df[target_id].to_numpy(dtype=np.float32))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, idx):
+        return self.features[idx], self.tabular[idx], self.labels[idx]
+
+class HeadOnlyModel(nn.Module):
+    """
+    CombinedModel 에서 conv_part 를 뺀 나머지 (레이어 이름 동일)
+    학습한 state_dict 는 CombinedModel.load_state_dict(..., strict=False) 로 옮길 수 있음
+    """
+    def __init__(self, feature_dim, tabular_data_size, tab_scale=1.0, img_scale=1.0, img_dim=64, tab_dim=256):
+        super().__init__()
+        self.tab_scale = tab_scale
+        self.img_scale = img_scale
+
+        self.img_head = nn.Sequential(nn.Linear(feature_dim, img_dim), nn.ReLU())
+        self.tab_head = nn.Sequential(nn.Linear(tabular_data_size, tab_dim), nn.ReLU())
+        self.reg_part = nn.Sequential(
+            nn.Linear(img_dim + tab_dim, 512),
+            nn.ReLU(),
+            nn.Linear(512, 128),
+            nn.ReLU(),
+            nn.Linear(128, 1)
+        )
+
+    def forward(self, image_features, tabular_data):
+        image_features = self.img_head(image_features * self.img_scale)
+        tab_features = self.tab_head(tabular_data * self.tab_scale)
+        return self.reg_part(torch.cat((image_features, tab_features), dim=1))
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="이미지 백본 특징 저장소 만들기 (src/training 에서 python -m tools.feature_store)")
+    parser.add_argument("--csv", default="../../csv/data_regression_clean.csv")
+    parser.add_argument("--image-root", default="../../data/total_images")
+    parser.add_argument("--out-dir", default="../../data/features/convnext_small")
+    parser.add_argument("--backbone", default="convnext_small", choices=list(BACKBONES))
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--num-workers", type=int, default=4)
+    args = parser.parse_args()
+
+    ids = pd.read_csv(args.csv, usecols=["id"])["id"].dropna().unique().tolist()
+    store = build_feature_store(ids, args.image_root, args.out_dir, backbone=args.backbone,
+                                batch_size=args.batch_size, num_workers=args.num_workers)
+    print(f"저장 완료: {args.out_dir} ({len(store)}개, dim={store.dim}, 이미지 없음 {len(store.missing)}개)")
+
+if __name__ == "__main__":
+    main()
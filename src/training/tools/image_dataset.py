@@ -0,0 +1,113 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import torch
+from PIL import Image
+from torch.utils.data import DataLoader, Dataset
+
+from tools.image_preprocessed_util import custom_crop_and_resize, first_image_path
+
+IMAGENET_MEAN = (0.485, 0.456, 0.406)
+IMAGENET_STD = (0.229, 0.224, 0.225)
+
+class _DecodeDataset(Dataset):
+    """
+    이미지 1장을 디코딩 + 크롭/패딩 + 리사이즈해서 uint8 (3,H,W) 로 반환 (캐시 생성용)
+    """
+    def __init__(self, paths, target_size):
+        self.paths = paths
+        self.target_size = target_size
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __getitem__(self, idx):
+        with Image.open(self.paths[idx]) as img:
+            img = custom_crop_and_resize(img.convert('RGB'), self.target_size)
+            return torch.from_numpy(np.asarray(img, dtype=np.uint8).transpose(2, 0, 1).copy())
+
+def build_image_cache(ids, image_root: str, cache_dir: str, target_size: int = 224,
+                      num_workers: int = 4, batch_size: int = 64):
+    """
+    id 별 첫 이미지를 한 번만 디코딩해서 cache_dir 에 저장합니다.
+    - images_u8.npy : (N, 3, target_size, target_size) uint8 memmap
+    - meta.json     : id 목록(행 순서), 이미지 없는 id 목록, target_size (완료 표시로 마지막에 기록)
+    이미지가 하나도 없으면 아무것도 쓰지 않고 RuntimeError
+    """
+    # 1) 경로는 한 번만 확정
+    ids = [str(i) for i in ids]
+    paths = {i: first_image_path(image_root, i) for i in ids}
+    kept = [i for i in ids if paths[i] is not None]
+    missing = [i for i in ids if paths[i] is None]
+    if not kept:
+        raise RuntimeError(f"{image_root} 에서 이미지를 찾지 못했습니다 (id {len(ids)}개). 이미지 캐시를 만들지 않습니다.")
+
+    # 다시 만드는 중에 멈추면 이전 meta.json 이 남아 완료된 캐시로 보이지 않게 먼저 지움
+    os.makedirs(cache_dir, exist_ok=True)
+    meta_path = os.path.join(cache_dir, "meta.json")
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    # 2) 병렬 디코딩 -> memmap 에 순서대로 기록
+    images = np.lib.format.open_memmap(os.path.join(cache_dir, "images_u8.npy"), mode="w+",
+                                       dtype=np.uint8, shape=(len(kept), 3, target_size, target_size))
+    loader = DataLoader(_DecodeDataset([paths[i] for i in kept], target_size),
+                        batch_size=batch_size, num_workers=num_workers, shuffle=False)
+    offset = 0
+    for batch in loader:
+        images[offset:offset + len(batch)] = batch.numpy()
+        offset += len(batch)
+    images.flush()
+    del images
+
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({"target_size": target_size, "ids": kept, "missing": missing}, f, ensure_ascii=False)
+
+    return kept, missing
+
+class CachedImageDataset(Dataset):
+    """
+    build_image_cache 결과를 쓰는 CombinedDataset 대체
+    - 반환: (image_tensor, tabular_tensor, label) - CombinedDataset 과 동일
+    - 로드 시에는 uint8 -> float 변환과 정규화(+선택적 augment 텐서 연산)만 수행
+    - 캐시에 없는 id 행은 제외
+    """
+    def __init__(self, cache_dir: str, df: pd.DataFrame, target_id: str, train_ids: list,
+                 id_col: str = "id", augment=None):
+        with open(os.path.join(cache_dir, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        row_of = {i: r for r, i in enumerate(meta["ids"])}
+
+        df = df[df[id_col].astype(str).isin(row_of)].reset_index(drop=True)
+        self.ids = df[id_col].astype(str).tolist()
+        self.rows = np.array([row_of[i] for i in self.ids], dtype=np.int64)
+        self.tabular = torch.tensor(df[train_ids].to_numpy(dtype=np.float32))
+        self.labels = torch.tensor(df[target_id].to_numpy(dtype=np.float32))
+
+        self.images_path = os.path.join(cache_dir, "images_u8.npy")
+        self.augment = augment
+        self.mean = torch.tensor(IMAGENET_MEAN).view(3, 1, 1)
+        self.std = torch.tensor(IMAGENET_STD).view(3, 1, 1)
+        # memmap 은 워커마다 __getitem__ 에서 처음 열기 (피클링 시 복사 방지)
+        self._images = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_images"] = None
+        return state
+
+    def __getitem__(self, idx):
+        if self._images is None:
+            self._images = np.load(self.images_path, mmap_mode="r")
+
+        image = torch.from_numpy(np.array(self._images[self.rows[idx]]))
+        image = (image.float().div_(255.0) - self.mean) / self.std
+        if self.augment is not None:
+            image = self.augment(image)
+
+        return image, self.tabular[idx], self.labels[idx]
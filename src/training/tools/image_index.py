@@ -0,0 +1,123 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from PIL import Image
+
+from tools.image_preprocessed_util import IMAGE_EXTS
+
+def scan_folder(folder: str) -> list[dict]:
+    """
+    폴더 안 이미지들의 파일 크기와 가로/세로를 헤더만 읽어 반환합니다 (디코딩 없음).
+    """
+    files = []
+    for entry in sorted(os.scandir(folder), key=lambda e: e.name):
+        if not entry.is_file() or not entry.name.lower().endswith(IMAGE_EXTS):
+            continue
+        try:
+            with Image.open(entry.path) as img:
+                width, height = img.size
+        except Exception:
+            continue
+        files.append({"file": entry.name, "bytes": entry.stat().st_size, "width": width, "height": height})
+    return files
+
+class ImageIndex:
+    """
+    id -> 이미지 파일 목록(크기, 해상도) 디스크 인덱스
+    - refresh(): 폴더 mtime 이 바뀐 id 만 스레드 풀로 다시 스캔
+    - 이미지는 메모리에 올리지 않고 경로만 제공 (디코딩은 필요할 때)
+    """
+    def __init__(self, image_root: str, index_path: str | None = None):
+        self.image_root = image_root
+        self.index_path = index_path or os.path.join(image_root, "image_index.json")
+        self.folders = {}
+
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.folders = data.get("folders", {})
+
+    def refresh(self, max_workers: int = 16) -> dict:
+        """
+        디스크와 인덱스를 맞추고 {"scanned", "removed", "total"} 를 반환합니다.
+        """
+        current = {}
+        with os.scandir(self.image_root) as it:
+            for entry in it:
+                if entry.is_dir():
+                    current[entry.name] = entry.stat().st_mtime_ns
+
+        changed = [uid for uid, mtime in current.items()
+                   if uid not in self.folders or self.folders[uid]["mtime"] != mtime]
+        removed = [uid for uid in self.folders if uid not in current]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            scanned = pool.map(scan_folder, [os.path.join(self.image_root, uid) for uid in changed])
+            for uid, files in zip(changed, scanned):
+                self.folders[uid] = {"mtime": current[uid], "files": files}
+
+        for uid in removed:
+            del self.folders[uid]
+
+        if changed or removed:
+            self.save()
+
+        return {"scanned": len(changed), "removed": len(removed), "total": len(self.folders)}
+
+    def save(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"image_root": self.image_root, "folders": self.folders}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+    def __contains__(self, image_id):
+        entry = self.folders.get(str(image_id))
+        return bool(entry and entry["files"])
+
+    def ids(self) -> list[str]:
+        return [uid for uid, entry in self.folders.items() if entry["files"]]
+
+    def paths(self, image_id) -> list[str]:
+        entry = self.folders.get(str(image_id))
+        if not entry:
+            return []
+        folder = os.path.join(self.image_root, str(image_id))
+        return [os.path.join(folder, f["file"]) for f in entry["files"]]
+
+    def first_path(self, image_id) -> str | None:
+        paths = self.paths(image_id)
+        return paths[0] if paths else None
+
+    def to_frame(self) -> pd.DataFrame:
+        rows = [{"id": uid, **f} for uid, entry in self.folders.items() for f in entry["files"]]
+        return pd.DataFrame(rows, columns=["id", "file", "bytes", "width", "height"])
+
+def load_images_by_uuid(image_root: str, uuid_list, index: ImageIndex | None = None):
+    """
+    노트북 load_images_by_uuid 대체 - 이미지 대신 경로를 반환합니다.
+    Returns:
+        dict: {uuid: [path1, path2, ...]}, list: 이미지가 없는 uuid 목록
+    """
+    if index is None:
+        index = ImageIndex(image_root)
+        index.refresh()
+
+    image_paths = {}
+    error_image_list = []
+    for uuid in uuid_list:
+        paths = index.paths(uuid)
+        if paths:
+            image_paths[uuid] = paths
+        else:
+            error_image_list.append(uuid)
+
+    return image_paths, error_image_list
+
+def open_image(path: str) -> Image.Image:
+    """
+    필요한 시점에 한 장만 디코딩
+    """
+    with Image.open(path) as img:
+        return img.convert('RGB')
@@ -1,7 +1,10 @@
+from functools import partial
 from PIL import Image, ImageOps
 import os
 import pandas as pd
 
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg')
+
 def check_image_size(dst_base):
     image_data = []
 
@@ -55,3 +58,71 @@ def make_square(img: Image.Image, pad_color=(114,114,114), crop_threshold: float
         # 패딩으로 맞춤 (긴 쪽에 맞춰서 정사각)
         max_dim = max(w, h)
         return ImageOps.pad(img, (max_dim, max_dim), color=pad_color, method=Image.BICUBIC)
+
+
+def custom_crop_and_resize(img: Image.Image, target_size: int = 224):
+    """
+    학습 노트북의 이미지 정사각형화 (get_image_transforms 내부 함수와 동일)
+    - 가로 세로 비율 차이가 0.1 보다 크면 짧은 변 기준 중앙 크롭
+    - 아니면 검은색 패딩으로 정사각형
+    """
+    width, height = img.size
+    if abs(width / height - 1.0) > 0.1:
+        side = min(width, height)
+        left = int(round((width - side) / 2.0))
+        top = int(round((height - side) / 2.0))
+        img = img.crop((left, top, left + side, top + side))
+    else:
+        max_side = max(width, height)
+        new_img = Image.new('RGB', (max_side, max_side), (0, 0, 0))
+        new_img.paste(img, ((max_side - width) // 2, (max_side - height) // 2))
+        img = new_img
+
+    return img.resize((target_size, target_size))
+
+def open_reduced(path: str, target_size: int = 224):
+    """
+    큰 JPEG 는 draft() 로 축소 디코딩 (두 변 모두 target_size 이상인 가장 작은 1/2, 1/4, 1/8 크기)
+    JPEG 가 아니면 그대로 디코딩합니다.
+    Returns: (RGB 이미지, 원본 (가로, 세로))
+    """
+    with Image.open(path) as img:
+        size = img.size
+        img.draft('RGB', (target_size, target_size))
+        return img.convert('RGB'), size
+
+def normalize_image(img: Image.Image, target_size: int = 224, method: str = "make_square") -> Image.Image:
+    """
+    정사각형화 + 학습 해상도로 리사이즈
+    - method="make_square" : make_square (비율 1.2 이상 중앙 크롭, 아니면 회색 패딩)
+    - method="notebook"    : custom_crop_and_resize (학습 노트북 Lambda 와 동일)
+    """
+    if method == "make_square":
+        return make_square(img).resize((target_size, target_size), Image.BICUBIC)
+    if method == "notebook":
+        return custom_crop_and_resize(img, target_size)
+    raise ValueError("method must be 'make_square' or 'notebook'")
+
+def get_image_transforms(target_size=224):
+    """
+    학습 노트북과 같은 이미지 변환 파이프라인 (크롭/패딩 -> 리사이즈 -> 텐서 -> ImageNet 정규화)
+    """
+    from torchvision.transforms import Compose, Lambda, Normalize, ToTensor
+
+    # lambda 대신 partial - DataLoader 워커(spawn)로 넘길 수 있게
+    return Compose([
+        Lambda(partial(custom_crop_and_resize, target_size=target_size)),
+        ToTensor(),
+        Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
+    ])
+
+def first_image_path(image_root: str, image_id: str) -> str | None:
+    """
+    id 폴더에서 이름순 첫 이미지 경로 (없으면 None)
+    """
+    folder = os.path.join(image_root, str(image_id))
+    if not os.path.isdir(folder):
+        return None
+
+    files = sorted(f for f in os.listdir(folder) if f.lower().endswith(IMAGE_EXTS))
+    return os.path.join(folder, files[0]) if files else None
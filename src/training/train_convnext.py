@@ -0,0 +1,310 @@
+"""
+stroller_price_regression_clean_convnext_tuning.ipynb 학습 루프의 스크립트 버전 (+ CPU 처리량 옵션)
+
+- --channels-last   : 모델/입력을 channels_last 메모리 형식으로 (CPU oneDNN 합성곱이 빠름)
+- --bf16            : bfloat16 autocast (CPU 도 지원, GradScaler 불필요)
+- --compile         : torch.compile (첫 에폭은 컴파일 시간 포함, 동결 해제 시 한 번 더 컴파일)
+- --threads         : intra-op 스레드 수 (torch.set_num_threads)
+- --freeze-epochs N : 처음 N 에폭은 백본 동결 (헤드만 학습, 백본 역전파 없음)
+- 에폭마다 samples/sec, 데이터 대기 시간, 스텝 시간을 SummaryWriter(Perf/*)에 기록
+  -> data_wait 비율이 높으면 로더, 낮으면 모델이 병목
+- 최고 검증 손실 가중치는 --out (기본 model/convnext_best.pt), 전처리 규칙은 같은 폴더의 preprocess.json
+  (체크포인트에 backbone / tab_scale / img_scale / target="log1p" 를 함께 저장 -> 앱이 같은 스케일로 만들고 expm1 로 원 단위 복원)
+
+실행 예시 (src/training 에서)
+    python train_convnext.py --epochs 30 --freeze-epochs 3 --channels-last --bf16 --threads 8
+    python train_convnext.py --cache-dir ../../data/image_cache --num-workers 4 --compile
+    python train_convnext.py --synthetic 256 --epochs 2 --max-steps 10 --no-pretrained   # 처리량만 측정
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+import torch
+import torch.nn as nn
+from sklearn.model_selection import train_test_split
+from tensorboardX import SummaryWriter
+from torch.utils.data import DataLoader, Dataset
+from PIL import Image
+
+from tools.csv_preprocessed_util import TRAIN_CONFIG, PreprocessPipeline
+from tools.dataset_io import load_dataset
+from tools.feature_store import BACKBONES, build_backbone
+from tools.image_dataset import CachedImageDataset, build_image_cache
+from tools.image_preprocessed_util import first_image_path, get_image_transforms
+
+# 노트북과 같은 탭 입력 순서
+TRAIN_IDS = ['is_completed', 'location', 'model', 'model_type', 'condition']
+
+class CombinedModel(nn.Module):
+    """
+    노트북 CombinedModel 과 같은 구조/레이어 이름 (앱 price_model.CombinedModel 로 그대로 로드)
+    """
+    def __init__(self, backbone, tabular_data_size, tab_scale=1.0, img_scale=1.0, img_dim=64, tab_dim=256):
+        super().__init__()
+        self.tab_scale = tab_scale
+        self.img_scale = img_scale
+        self.conv_part = backbone
+
+        with torch.no_grad():
+            conv_out_size = self.conv_part(torch.randn(1, 3, 224, 224)).numel()
+
+        self.img_head = nn.Sequential(nn.Linear(conv_out_size, img_dim), nn.ReLU())
+        self.tab_head = nn.Sequential(nn.Linear(tabular_data_size, tab_dim), nn.ReLU())
+        self.reg_part = nn.Sequential(
+            nn.Linear(img_dim + tab_dim, 512),
+            nn.ReLU(),
+            nn.Linear(512, 128),
+            nn.ReLU(),
+            nn.Linear(128, 1)
+        )
+
+    def forward(self, images, tabular_data):
+        image_features = self.img_head(self.conv_part(images) * self.img_scale)
+        tab_features = self.tab_head(tabular_data * self.tab_scale)
+        return self.reg_part(torch.cat((image_features, tab_features), dim=1))
+
+class ImagePathDataset(Dataset):
+    """
+    노트북 CombinedDataset 과 같은 방식 (샘플마다 첫 이미지 디코딩 + 변환), 경로는 미리 확정
+    """
+    def __init__(self, df, image_root, target_id, train_ids, transform):
+        self.paths = [first_image_path(image_root, i) for i in df["id"].astype(str)]
+        keep = np.array([p is not None for p in self.paths])
+        self.paths = [p for p in self.paths if p is not None]
+        self.tabular = torch.tensor(df[train_ids].to_numpy(dtype=np.float32)[keep])
+        self.labels = torch.tensor(df[target_id].to_numpy(dtype=np.float32)[keep])
+        self.transform = transform
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __getitem__(self, idx):
+        with Image.open(self.paths[idx]) as img:
+            image = self.transform(img.convert('RGB'))
+        return image, self.tabular[idx], self.labels[idx]
+
+def set_seed(seed: int):
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+
+def set_backbone_trainable(model: CombinedModel, trainable: bool):
+    for p in model.conv_part.parameters():
+        p.requires_grad_(trainable)
+
+def load_frame(args):
+    """
+    (전처리된 df, 학습된 PreprocessPipeline, 이미지 루트)
+    """
+    columns = ["id"] + TRAIN_IDS + ["price"]
+    if args.synthetic:
+        from bench_image_dataset import make_synthetic
+        image_root = os.path.join(tempfile.mkdtemp(), "images")
+        df = make_synthetic(args.synthetic, image_root)
+    else:
+        image_root = args.image_root
+        df = load_dataset(args.csv, columns=columns)
+
+    pipeline = PreprocessPipeline(TRAIN_CONFIG)
+    df = pipeline.fit_transform(df.dropna(subset=["price"]))
+    # 모델 탭 입력 순서도 preprocess.json 에 저장 (앱 인코더 / transform_one 이 같은 순서를 씀)
+    pipeline.model_inputs = list(TRAIN_IDS)
+    return df, pipeline, image_root
+
+def make_loaders(df, image_root, args):
+    # 노트북과 같은 분할
+    train_df, val_df = train_test_split(df, test_size=0.2, random_state=42)
+    train_df, val_df = train_df.reset_index(drop=True), val_df.reset_index(drop=True)
+
+    if args.cache_dir:
+        if not os.path.exists(os.path.join(args.cache_dir, "meta.json")):
+            build_image_cache(df["id"].tolist(), image_root, args.cache_dir, num_workers=args.num_workers)
+        train_ds = CachedImageDataset(args.cache_dir, train_df, "price", TRAIN_IDS)
+        val_ds = CachedImageDataset(args.cache_dir, val_df, "price", TRAIN_IDS)
+    else:
+        transform = get_image_transforms()
+        train_ds = ImagePathDataset(train_df, image_root, "price", TRAIN_IDS, transform)
+        val_ds = ImagePathDataset(val_df, image_root, "price", TRAIN_IDS, transform)
+
+    common = {"batch_size": args.batch_size, "num_workers": args.num_workers,
+              "persistent_workers": args.num_workers > 0}
+    return DataLoader(train_ds, shuffle=True, **common), DataLoader(val_ds, shuffle=False, **common)
+
+def train(args, on_epoch=None) -> dict:
+    """
+    on_epoch(epoch, record) 가 False 를 반환하면 그 에폭에서 중단합니다 (스윕 가지치기용).
+    record: train_loss, val_loss, val_mae(원래 가격 단위), Perf 값
+    """
+    set_seed(args.seed)
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    device = args.device or ('cuda' if torch.cuda.is_available() else 'cpu')
+
+    df, pipeline, image_root = load_frame(args)
+    train_loader, val_loader = make_loaders(df, image_root, args)
+
+    model = CombinedModel(build_backbone(args.backbone, pretrained=not args.no_pretrained), len(TRAIN_IDS),
+                          tab_scale=args.tab_scale, img_scale=args.img_scale,
+                          img_dim=args.img_dim, tab_dim=args.tab_dim).to(device)
+    memory_format = torch.channels_last if args.channels_last else torch.contiguous_format
+    model = model.to(memory_format=memory_format)
+    raw_model = model
+    if args.compile:
+        model = torch.compile(model)
+
+    criterion = nn.SmoothL1Loss()
+    optimizer = torch.optim.AdamW(raw_model.parameters(), lr=args.lr, weight_decay=args.weight_decay)
+    writer = SummaryWriter(args.log_dir)
+
+    def autocast():
+        return torch.autocast(device_type=device, dtype=torch.bfloat16, enabled=args.bf16)
+
+    def to_device(images, tabular_data, labels):
+        images = images.to(device, non_blocking=True).contiguous(memory_format=memory_format)
+        return images, tabular_data.to(device), torch.log1p(labels.float()).to(device)  # 타깃 로그화
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    preprocess_path = os.path.join(os.path.dirname(args.out) or ".", "preprocess.json")
+    pipeline.save(preprocess_path)
+
+    best_val, patience_cnt, step, pruned = float("inf"), 0, 0, False
+    history = []
+    print(f"학습 시작: train {len(train_loader.dataset)} / val {len(val_loader.dataset)} | device={device} "
+          f"threads={torch.get_num_threads()} channels_last={args.channels_last} bf16={args.bf16} "
+          f"compile={args.compile} freeze_epochs={args.freeze_epochs}")
+
+    for epoch in range(args.epochs):
+        # ---------------------- Train ----------------------
+        frozen = epoch < args.freeze_epochs
+        set_backbone_trainable(raw_model, not frozen)
+        model.train()
+
+        running_loss, n_samples, n_steps = 0.0, 0, 0
+        data_wait = step_time = 0.0
+        epoch_start = end = time.perf_counter()
+        for images, tabular_data, labels in train_loader:
+            fetched = time.perf_counter()
+            data_wait += fetched - end
+
+            images, tabular_data, labels = to_device(images, tabular_data, labels)
+            optimizer.zero_grad(set_to_none=True)
+            with autocast():
+                outputs = model(images, tabular_data).squeeze(1)
+            loss = criterion(outputs.float(), labels.view(-1))
+            loss.backward()
+            optimizer.step()
+            loss_value = loss.item()  # 동기화 지점 (스텝 시간에 포함)
+
+            end = time.perf_counter()
+            step_time += end - fetched
+            running_loss += loss_value
+            n_samples += len(images)
+            n_steps += 1
+            writer.add_scalar('Loss/train', loss_value, step)
+            step += 1
+            if args.max_steps and n_steps >= args.max_steps:
+                break
+
+        epoch_sec = time.perf_counter() - epoch_start
+        perf = {
+            "samples_per_sec": n_samples / epoch_sec,
+            "data_wait_sec": data_wait,
+            "step_sec": step_time,
+            "data_wait_ratio": data_wait / epoch_sec,
+            "ms_per_step": step_time / max(1, n_steps) * 1000,
+        }
+        train_epoch_loss = running_loss / max(1, n_steps)
+        writer.add_scalar('Loss/train_epoch', train_epoch_loss, epoch)
+        for k, v in perf.items():
+            writer.add_scalar(f'Perf/{k}', v, epoch)
+
+        # ---------------------- Validate ----------------------
+        model.eval()
+        val_running, val_steps, abs_err, n_val = 0.0, 0, 0.0, 0
+        with torch.inference_mode(), autocast():
+            for images, tabular_data, labels in val_loader:
+                images, tabular_data, labels = to_device(images, tabular_data, labels)
+                outputs = model(images, tabular_data).squeeze(1).float()
+                val_running += criterion(outputs, labels.view(-1)).item()
+                abs_err += (torch.expm1(outputs) - torch.expm1(labels.view(-1))).abs().sum().item()
+                n_val += len(labels)
+                val_steps += 1
+                if args.max_steps and val_steps >= args.max_steps:
+                    break
+        val_loss = val_running / max(1, val_steps)
+        val_mae = abs_err / max(1, n_val)
+        writer.add_scalar('Loss/val', val_loss, epoch)
+        writer.add_scalar('MAE/val', val_mae, epoch)
+
+        record = {"epoch": epoch, "frozen": frozen, "train_loss": train_epoch_loss, "val_loss": val_loss,
+                  "val_mae": val_mae, **perf}
+        history.append(record)
+        print(f"[{epoch+1}/{args.epochs}] train_loss: {train_epoch_loss:.4f} | val_loss: {val_loss:.4f} | "
+              f"val_mae: {val_mae:,.0f} | "
+              f"{perf['samples_per_sec']:.1f} samples/s | step {perf['ms_per_step']:.0f} ms | "
+              f"data wait {perf['data_wait_ratio'] * 100:.0f}%{' (백본 동결)' if frozen else ''}")
+
+        # ---------------------- Early Stopping ----------------------
+        if val_loss < best_val - args.min_delta:
+            best_val = val_loss
+            patience_cnt = 0
+            # 앱 read_checkpoint 가 "state_dict" 키를 읽고, 아래 메타데이터로 같은 스케일 / 타깃 역변환을 복원함
+            torch.save({"state_dict": raw_model.state_dict(), "train_ids": TRAIN_IDS, "epoch": epoch,
+                        "val_loss": val_loss, "args": vars(args),
+                        "backbone": args.backbone, "tab_scale": args.tab_scale, "img_scale": args.img_scale,
+                        "target": "log1p"}, args.out)
+        else:
+            patience_cnt += 1
+            if patience_cnt >= args.patience:
+                print(f"조기 종료: 검증 성능 개선 없음({args.patience} epochs).")
+                break
+
+        if on_epoch is not None and on_epoch(epoch, record) is False:
+            pruned = True
+            print(f"가지치기: {epoch+1} 에폭에서 중단")
+            break
+
+    writer.close()
+    print(f"학습 종료. best val_loss {best_val:.4f} -> {args.out}, 전처리 규칙 -> {preprocess_path}")
+    return {"best_val": best_val, "history": history, "out": args.out, "pruned": pruned}
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="ConvNeXt 가격 회귀 학습")
+    parser.add_argument("--csv", default="../../csv/data_regression_clean.csv")
+    parser.add_argument("--image-root", default="../../data/total_images")
+    parser.add_argument("--cache-dir", default=None, help="uint8 이미지 캐시 사용 (없으면 먼저 생성)")
+    parser.add_argument("--synthetic", type=int, default=0, help="N 개 임의 이미지로 실행 (처리량 측정용)")
+    parser.add_argument("--out", default="model/convnext_best.pt")
+    parser.add_argument("--log-dir", default=None, help="SummaryWriter 경로 (기본 runs/...)")
+
+    parser.add_argument("--backbone", default="convnext_small", choices=list(BACKBONES))
+    parser.add_argument("--no-pretrained", action="store_true", help="ImageNet 가중치 없이 (다운로드 없음)")
+    parser.add_argument("--tab-scale", type=float, default=5.0)
+    parser.add_argument("--img-scale", type=float, default=0.2)
+    parser.add_argument("--img-dim", type=int, default=32)
+    parser.add_argument("--tab-dim", type=int, default=256)
+
+    parser.add_argument("--epochs", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--lr", type=float, default=1e-3)
+    parser.add_argument("--weight-decay", type=float, default=1e-4)
+    parser.add_argument("--patience", type=int, default=7)
+    parser.add_argument("--min-delta", type=float, default=1e-4)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--max-steps", type=int, default=0, help="에폭당 최대 스텝 (0 = 전체)")
+
+    parser.add_argument("--device", default=None)
+    parser.add_argument("--num-workers", type=int, default=0)
+    parser.add_argument("--threads", type=int, default=0, help="intra-op 스레드 수 (0 = 기본값)")
+    parser.add_argument("--channels-last", action="store_true")
+    parser.add_argument("--bf16", action="store_true")
+    parser.add_argument("--compile", action="store_true")
+    parser.add_argument("--freeze-epochs", type=int, default=0, help="처음 N 에폭 백본 동결")
+    return parser
+
+if __name__ == "__main__":
+    train(build_parser().parse_args())
@@ -0,0 +1,101 @@
+"""
+사진 없이 탭 칼럼만으로 가격을 예측하는 LightGBM 기준 모델 (서빙 fallback 계층)
+
+- convnext 와 같은 TRAIN_CONFIG / PreprocessPipeline 으로 인코딩하고 같은 분할(test_size=0.2, random_state=42) 사용
+- 입력: condition, is_completed, location, model, model_type (라벨 코드를 범주형 특징으로)
+- 결과는 JSON 파일 하나 (--out, 기본 model/tabular_lgbm.json)
+    {"features", "pipeline"(PreprocessPipeline.to_dict), "booster"(model_to_string), "params", "metrics"}
+  앱(src/app/tabular_model.py)은 이 파일만으로 모든 범주 조합의 가격표를 미리 계산합니다.
+
+실행 예시 (src/training 에서)
+    python train_tabular.py
+    python train_tabular.py --csv ../../csv/data_regression_clean.csv --num-leaves 31 --learning-rate 0.03
+"""
+import argparse
+import json
+import os
+import time
+
+import lightgbm as lgb
+import numpy as np
+from sklearn.model_selection import train_test_split
+
+from tools.csv_preprocessed_util import TRAIN_CONFIG, PreprocessPipeline
+from tools.dataset_io import load_dataset
+
+def train_tabular(df, params: dict, num_boost_round: int = 1000, early_stopping: int = 50, seed: int = 42):
+    """
+    원본 df -> (booster, pipeline, metrics)
+    """
+    # 1) convnext 학습과 같은 전처리 / 분할
+    pipeline = PreprocessPipeline(TRAIN_CONFIG)
+    df = pipeline.fit_transform(df.dropna(subset=["price"]))
+    features = pipeline.feature_cols
+    train_df, val_df = train_test_split(df, test_size=0.2, random_state=42)
+
+    # 2) 라벨 코드는 범주형 특징으로 (순서 의미 없음)
+    train_set = lgb.Dataset(train_df[features], train_df["price"], categorical_feature=features,
+                            free_raw_data=False)
+    val_set = lgb.Dataset(val_df[features], val_df["price"], reference=train_set)
+
+    start = time.perf_counter()
+    booster = lgb.train(
+        {**params, "seed": seed, "verbose": -1}, train_set, num_boost_round=num_boost_round,
+        valid_sets=[val_set], callbacks=[lgb.early_stopping(early_stopping, verbose=False)],
+    )
+    seconds = time.perf_counter() - start
+
+    # 3) 검증 MAE (가격 단위)
+    pred = booster.predict(val_df[features], num_iteration=booster.best_iteration)
+    metrics = {
+        "val_mae": float(np.mean(np.abs(pred - val_df["price"].to_numpy()))),
+        "train_rows": len(train_df), "val_rows": len(val_df),
+        "best_iteration": int(booster.best_iteration), "train_seconds": seconds,
+    }
+    return booster, pipeline, metrics
+
+def save_tabular_model(path: str, booster, pipeline: PreprocessPipeline, params: dict, metrics: dict):
+    artifact = {
+        "version": 1,
+        "features": pipeline.feature_cols,
+        "pipeline": pipeline.to_dict(),
+        "booster": booster.model_to_string(num_iteration=booster.best_iteration),
+        "params": params,
+        "metrics": metrics,
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(artifact, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="탭 전용 LightGBM 가격 모델 학습")
+    parser.add_argument("--csv", default="../../csv/data_regression_clean.csv")
+    parser.add_argument("--out", default="model/tabular_lgbm.json")
+    parser.add_argument("--objective", default="regression_l1", help="LightGBM objective (기본은 MAE 직접 최소화)")
+    parser.add_argument("--num-leaves", type=int, default=15)
+    parser.add_argument("--learning-rate", type=float, default=0.05)
+    parser.add_argument("--min-child-samples", type=int, default=10)
+    parser.add_argument("--num-boost-round", type=int, default=1000)
+    parser.add_argument("--early-stopping", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    return parser
+
+def main():
+    args = build_parser().parse_args()
+    params = {
+        "objective": args.objective, "metric": "l1", "num_leaves": args.num_leaves,
+        "learning_rate": args.learning_rate, "min_child_samples": args.min_child_samples,
+        "min_data_per_group": args.min_child_samples, "cat_smooth": 10,
+    }
+
+    df = load_dataset(args.csv, columns=["id"] + TRAIN_CONFIG["label_encode"]["cols"] + ["price"])
+    booster, pipeline, metrics = train_tabular(df, params, args.num_boost_round, args.early_stopping, args.seed)
+    save_tabular_model(args.out, booster, pipeline, params, metrics)
+
+    print(f"학습 {metrics['train_rows']} / 검증 {metrics['val_rows']} | best_iteration {metrics['best_iteration']}"
+          f" | val MAE {metrics['val_mae']:,.0f} 원 | {metrics['train_seconds']:.2f}s -> {args.out}")
+
+if __name__ == "__main__":
+    main()